@@ -1,30 +1,54 @@
-from fastapi import FastAPI, Form, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from qdrant_client import QdrantClient
+from starlette.background import BackgroundTask
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models
-from langchain_qdrant import QdrantVectorStore
-from langchain_huggingface import HuggingFaceEmbeddings
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import json
+import logging
 import os
 import glob
-import numpy as np
-import re
-from sentence_transformers import CrossEncoder, SentenceTransformer
-from transformers import pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import traceback
-import nltk
-nltk.download('punkt')
-nltk.download('stopwords')
+import threading
+from document_store import DocumentStore
+from bm25_index import BM25Index
+from embedding_cache import EmbeddingCache
+import generation
+import hybrid_retrieval
+import metrics
+from ingestion import IngestionCheckpoint, ingest_pdfs
+from jobs import IngestionJobQueue
+from startup import StartupProfile, LazyResource, ensure_nltk_data, load_embeddings, load_reranker
+
+metrics.configure_logging()
+logger = logging.getLogger(__name__)
+
+startup_profile = StartupProfile(started_at=_import_started)
+startup_profile.record("imports", time.perf_counter() - _import_started)
+
+# Set once the background warm-up has loaded the corpus, indexes and models
+app_ready = threading.Event()
+startup_error = None
+
+@asynccontextmanager
+async def lifespan(app):
+    # Accept connections immediately; heavy loading happens off the event loop
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+    await generation.aclose()
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -34,29 +58,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request trace: stage timings are collected while the request runs and, when
+# tracing is on (TRACE_HEADERS=1 or an X-Trace request header), returned as headers
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    trace, token = metrics.start_trace(request.headers.get("x-request-id"))
+    try:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - trace.started_at, request.method,
+                                        getattr(route, "path", "unmatched"), str(response.status_code))
+        if metrics.TRACE_HEADERS or "x-trace" in request.headers:
+            response.headers["X-Request-ID"] = trace.request_id
+            response.headers["Server-Timing"] = trace.server_timing()
+        return response
+    finally:
+        metrics.end_trace(token)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-# Initialize models
-reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
-semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
-query_rewriter = SentenceTransformer('paraphrase-MiniLM-L6-v2')
-
-# Check if rank_bm25 is available
-try:
-    from rank_bm25 import BM25Okapi
-    USE_BM25 = True
-    print("Using BM25 for keyword search")
-except ImportError:
-    USE_BM25 = False
-    print("rank_bm25 not found, using TF-IDF instead")
-
-# Initialize embeddings and Qdrant
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
-qdrant_client = QdrantClient("http://localhost:6333")
+# Initialize models lazily: loaded by the warm-up thread or on first use
+reranker = LazyResource("reranker_model", load_reranker, startup_profile)
+embeddings = LazyResource("embedding_model", load_embeddings, startup_profile)
+
+# Initialize Qdrant: the sync client serves startup/ingestion, the async one serves requests
+QDRANT_URL = "http://localhost:6333"
+qdrant_client = QdrantClient(QDRANT_URL)
+async_qdrant_client = AsyncQdrantClient(QDRANT_URL)
 COLLECTION_NAME = "pdf_chunks"
 
+# CPU-bound request work (embedding, BM25, cross-encoder) runs on a bounded pool so the
+# event loop stays free. Threads suffice: torch and numpy release the GIL in their kernels.
+RETRIEVAL_WORKERS = int(os.getenv("RETRIEVAL_WORKERS", "2"))
+# Requests admitted at once (running + waiting); beyond this /ask/ answers 503
+RETRIEVAL_MAX_PENDING = int(os.getenv("RETRIEVAL_MAX_PENDING", "16"))
+retrieval_executor = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval")
+pending_requests = 0
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the retrieval pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(retrieval_executor, functools.partial(func, *args, **kwargs))
+
 # Ensure collection exists
 def ensure_collection_exists():
     collections = [col.name for col in qdrant_client.get_collections().collections]
@@ -66,181 +111,165 @@ def ensure_collection_exists():
             vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE),
         )
 
-ensure_collection_exists()
-
-# Initialize qdrant_store
-qdrant_store = QdrantVectorStore(
-    client=qdrant_client,
-    collection_name=COLLECTION_NAME,
-    embedding=embeddings,
-)
-
-# Clean PDF text
-def clean_text(text):
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    # Remove special characters except basic punctuation
-    text = re.sub(r'[^\w\s.,;:!?\-]', '', text)
-    # Remove page numbers, headers, footers (customize based on your PDFs)
-    text = re.sub(r'\d+\s*\n', '', text)  # Remove page numbers
-    text = re.sub(r'[Hh]ttp[s]?://\S+', '', text)  # Remove URLs
-    return text.strip()
+# Resident, ID-aligned copy of the chunk texts used to resolve keyword hits
+doc_store = DocumentStore()
+# Stored chunk vectors, reused for deduplication instead of re-encoding
+embedding_cache = EmbeddingCache(qdrant_client, COLLECTION_NAME, async_qdrant_client)
+# Which PDFs are already in the collection, so restarts only ingest new files
+ingestion_checkpoint = IngestionCheckpoint()
+
+# Where startup looks for PDFs and where uploads are saved
+PDF_DIR = os.getenv("PDF_DIR", ".")
+# Uploads larger than this are rejected with 413
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "50"))
+UPLOAD_CHUNK_BYTES = 1 << 20
+# Guards the keyword index and document store: ingestion mutates them while /ask/ reads.
+# Each batch update is small, so queries wait at most one batch of index inserts.
+index_lock = threading.Lock()
 
 # Load PDFs into Qdrant
-def load_pdfs_to_qdrant():
-    pdf_files = glob.glob("*.pdf")
+def index_new_chunks(ids, texts, metadatas):
+    """Make freshly upserted chunks visible to keyword search and the document store"""
+    # Re-ingested ids may have new text, so their cached vectors are stale
+    embedding_cache.discard(ids)
+    with index_lock:
+        doc_store.add(ids, texts, metadatas)
+        keyword_index.add_documents(ids, texts)
+
+def remove_chunks(ids):
+    """Forget chunks deleted from Qdrant by ingestion (stale or untracked)"""
+    embedding_cache.discard(ids)
+    with index_lock:
+        doc_store.remove(ids)
+        for chunk_id in ids:
+            keyword_index.remove(chunk_id)
+
+def load_pdfs_to_qdrant(pdf_files=None, on_batch=None, on_progress=None):
+    """Ingest every PDF that is not yet recorded in the ingestion checkpoint"""
+    pdf_files = pdf_files if pdf_files is not None else glob.glob(os.path.join(PDF_DIR, "*.pdf"))
     if not pdf_files:
-        print("No PDF files found!")
-        return
+        logger.info("No PDF files found in %s", PDF_DIR)
+        return None
+
+    def handle_batch(ids, texts, metadatas):
+        index_new_chunks(ids, texts, metadatas)
+        if on_batch:
+            on_batch(ids, texts, metadatas)
+
+    stats = ingest_pdfs(
+        pdf_files,
+        embeddings.get().embed_documents,
+        qdrant_client,
+        COLLECTION_NAME,
+        checkpoint=ingestion_checkpoint,
+        on_batch=handle_batch,
+        on_remove=remove_chunks,
+        on_progress=on_progress,
+    )
+    if stats["chunks"]:
+        with index_lock:
+            keyword_index.save(BM25_INDEX_PATH)
+    return stats
+
+def ingest_uploaded_pdf(path, job):
+    """Job worker: ingest one uploaded PDF, reporting progress on the job record"""
+    def count_chunks(ids, texts, metadatas):
+        job["chunks"] += len(ids)
+
+    def record_pages(pdf_file, pages_done, chunks_done):
+        job["pages"] += pages_done
+
+    load_pdfs_to_qdrant([path], on_batch=count_chunks, on_progress=record_pages)
+
+# Uploaded PDFs are ingested one at a time in the background; /ask/ keeps serving meanwhile
+job_queue = IngestionJobQueue(ingest_uploaded_pdf)
+
+# Initialize keyword search: persistent BM25 inverted index keyed by Qdrant point id
+BM25_INDEX_PATH = os.getenv("BM25_INDEX_PATH", "bm25_index.json")
+keyword_index = None
+
+def sync_keyword_index():
+    """Apply only the chunks added or removed since the index was last saved"""
+    added, removed = keyword_index.sync(doc_store.ids, doc_store.texts)
+    if added or removed:
+        keyword_index.save(BM25_INDEX_PATH)
+    logger.info("BM25 index: %d chunks (%d added, %d removed)", len(keyword_index), added, removed)
+
+def warm_up():
+    """Load the corpus, indexes and models in the background, then mark the app ready"""
+    global keyword_index, startup_error
+    try:
+        with startup_profile.step("nltk_data"):
+            ensure_nltk_data()
+        with startup_profile.step("bm25_load"):
+            keyword_index = BM25Index.load_or_create(BM25_INDEX_PATH)
+        with startup_profile.step("qdrant_collection"):
+            ensure_collection_exists()
+
+        # Load the existing chunks once, then ingest any PDFs not ingested yet
+        with startup_profile.step("document_store"):
+            collection_info = qdrant_client.get_collection(COLLECTION_NAME)
+            if collection_info.points_count == 0:
+                # A fresh collection invalidates whatever the checkpoint remembers
+                ingestion_checkpoint.reset()
+            else:
+                logger.info("Collection has %d points", collection_info.points_count)
+                doc_store.load_from_qdrant(qdrant_client, COLLECTION_NAME)
+        with startup_profile.step("bm25_sync"):
+            sync_keyword_index()
+        with startup_profile.step("ingestion"):
+            load_pdfs_to_qdrant()
+
+        # First inference initializes kernels/threads; pay that cost before serving
+        with startup_profile.step("model_warmup"):
+            embeddings.get().embed_query("warm up")
+            reranker.get().model.predict([("warm up", "warm up")], show_progress_bar=False)
+        app_ready.set()
+        startup_profile.log_report()
+        # Uploads queued during warm-up start ingesting only now, so they never
+        # race the startup ingestion for the checkpoint
+        job_queue.start()
+    except Exception as e:
+        startup_error = str(e)
+        logger.exception("Startup failed: %s", e)
 
-    all_chunks = []
-    for pdf_file in pdf_files:
-        print(f"\nProcessing {pdf_file}...")
-        loader = PyPDFLoader(pdf_file)
-        documents = loader.load()
-
-        # Clean documents
-        for doc in documents:
-            doc.page_content = clean_text(doc.page_content)
-            # Skip very short documents
-            if len(doc.page_content.split()) < 20:
-                continue
-
-        # Split documents into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,       # Smaller chunks for better precision
-            chunk_overlap=100,    # More overlap for context
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]  # Split by paragraphs first
-        )
-        chunks = text_splitter.split_documents(documents)
-
-        for chunk in chunks:
-            chunk.metadata["source"] = pdf_file
-            print(f"Sample chunk: {chunk.page_content[:100]}...")  # Debug
-        all_chunks.extend(chunks)
-
-    if all_chunks:
-        print(f"Adding {len(all_chunks)} chunks to Qdrant...")
-        qdrant_store.add_documents(all_chunks)
-        print(f"Successfully loaded {len(all_chunks)} chunks into Qdrant!")
-    else:
-        print("No valid chunks to load!")
-
-# Load PDFs if collection is empty
-collection_info = qdrant_client.get_collection(COLLECTION_NAME)
-if collection_info.points_count == 0:
-    load_pdfs_to_qdrant()
-else:
-    print(f"Collection has {collection_info.points_count} points.")
-
-# Initialize keyword search
-if USE_BM25:
-    def init_keyword_search():
-        docs = qdrant_store.client.scroll(
-            collection_name=COLLECTION_NAME,
-            limit=10000,
-            with_payload=True,
-        )[0]
-        corpus = [doc.payload["page_content"] for doc in docs]
-        tokenized_corpus = [doc.split(" ") for doc in corpus]
-        return BM25Okapi(tokenized_corpus)
-
-    keyword_search = init_keyword_search()
-else:
-    def init_tfidf_search():
-        docs = qdrant_store.client.scroll(
+async def batched_semantic_search(queries, timings, k=10):
+    """Embed all queries in one batch and run them as a single Qdrant batch search"""
+    with metrics.stage("embed", timings):
+        query_vectors = await run_blocking(embeddings.get().embed_documents, queries)
+
+    with metrics.stage("vector_search", timings):
+        responses = await async_qdrant_client.query_batch_points(
             collection_name=COLLECTION_NAME,
-            limit=10000,
-            with_payload=True,
-        )[0]
-        corpus = [doc.payload["page_content"] for doc in docs]
-        vectorizer = TfidfVectorizer()
-        tfidf_matrix = vectorizer.fit_transform(corpus)
-        return vectorizer, tfidf_matrix
-
-    tfidf_vectorizer, tfidf_matrix = init_tfidf_search()
-
-# Query expansion
-def expand_query(question):
-    """Generate alternative phrasings of the question"""
-    # Simple expansion with different question formats
-    return [
-        question,
-        f"What is {question}",
-        f"Explain {question}",
-        f"Define {question}",
-        f"How does {question} work",
-        f"Process of {question}",
-        f"Information about {question}",
-        f"Details on {question}"
-    ]
-
-# Query expansion with DistilGPT2
-try:
-    query_expander = pipeline('text-generation', model='distilgpt2')
-except:
-    query_expander = None
+            requests=[
+                models.QueryRequest(query=vector, limit=k, with_payload=True)
+                for vector in query_vectors
+            ],
+        )
+
+    return [response.points for response in responses]
 
 # Helper functions
-def rerank_with_cross_encoder(question, documents_with_scores, top_k=10):
-    """Re-rank documents using cross-encoder for better relevance"""
-    doc_pairs = [(question, doc.page_content if hasattr(doc, 'page_content') else doc)
-                for doc, _ in documents_with_scores]
-
-    reranked_scores = reranker.predict(doc_pairs)
-    combined_scores = [(doc, 0.7 * score + 0.3 * original_score)
-                      for (doc, original_score), score
-                      in zip(documents_with_scores, reranked_scores)]
-
-    combined_scores.sort(key=lambda x: x[1], reverse=True)
-    return combined_scores[:top_k]
-
-def semantic_deduplication(documents_with_scores, threshold=0.85):
-    """Remove semantically similar documents"""
-    if not documents_with_scores:
-        return []
-
-    seen_embeddings = []
-    unique_docs = []
-
-    for doc, score in documents_with_scores:
-        content = doc.page_content if hasattr(doc, 'page_content') else doc
-        embedding = semantic_model.encode(content)
-
-        # Check for duplicates
-        is_duplicate = False
-        for seen_emb in seen_embeddings:
-            similarity = np.dot(embedding, seen_emb) / (
-                np.linalg.norm(embedding) * np.linalg.norm(seen_emb)
-            )
-            if similarity > threshold:
-                is_duplicate = True
-                break
-
-        if not is_duplicate:
-            unique_docs.append((doc, score))
-            seen_embeddings.append(embedding)
-
-    return unique_docs
-
-def filter_by_score(documents_with_scores, min_score=0.3):
-    """Filter documents by minimum score"""
-    if not documents_with_scores:
-        return []
-
-    return [(doc, score) for doc, score in documents_with_scores if score >= min_score]
+def keyword_search(question, k=10):
+    """BM25 hits resolved against the local document store"""
+    keyword_docs = []
+    with index_lock:
+        for chunk_id, bm25_score in keyword_index.search(question, k=k):
+            doc = doc_store.get_by_id(chunk_id)
+            if doc is not None:
+                keyword_docs.append((doc, bm25_score))
+    return keyword_docs
 
 # Debug endpoint to check stored documents
 @app.get("/debug/docs")
 async def debug_docs():
     try:
-        docs = qdrant_store.client.scroll(
+        docs = (await async_qdrant_client.scroll(
             collection_name=COLLECTION_NAME,
             limit=20,
             with_payload=True,
             with_vectors=False
-        )[0]
+        ))[0]
 
         result = []
         for i, doc in enumerate(docs):
@@ -255,140 +284,272 @@ async def debug_docs():
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
+# Prometheus scrape endpoint
+metrics.REGISTRY.register(metrics.Gauge(
+    "rag_ready", "1 once warm-up has finished", lambda: 1 if app_ready.is_set() else 0))
+metrics.REGISTRY.register(metrics.Gauge(
+    "rag_pending_requests", "Retrieval requests admitted and not yet finished", lambda: pending_requests))
+metrics.REGISTRY.register(metrics.Gauge(
+    "rag_ingestion_queue_depth", "Uploaded PDFs waiting for ingestion", lambda: job_queue.queue_depth()))
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+# Liveness and readiness
+@app.get("/health")
+async def health():
+    return JSONResponse({"status": "ok"})
+
+@app.get("/ready")
+async def ready():
+    body = {"ready": app_ready.is_set(), "startup": startup_profile.report()}
+    if startup_error:
+        body["error"] = startup_error
+    return JSONResponse(body, status_code=200 if app_ready.is_set() else 503)
+
+def save_upload(source, tmp_path, max_bytes):
+    """Copy an upload to ``tmp_path`` in chunks; returns "ok", "not_pdf" or "too_large"
+
+    Nothing is left on disk unless the result is "ok".
+    """
+    written = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if written == 0 and not chunk.startswith(b"%PDF"):
+                    raise ValueError("not_pdf")
+                written += len(chunk)
+                if written > max_bytes:
+                    raise ValueError("too_large")
+                f.write(chunk)
+        if written == 0:
+            raise ValueError("not_pdf")
+        return "ok"
+    except ValueError as e:
+        os.remove(tmp_path)
+        return str(e)
+
+# Document upload: saved to PDF_DIR and ingested by the background job queue
+@app.post("/documents", status_code=202)
+async def upload_document(file: UploadFile = File(...)):
+    filename = os.path.basename(file.filename or "")
+    if not filename.lower().endswith(".pdf"):
+        return JSONResponse({"error": "Only .pdf files are accepted."}, status_code=400)
+
+    # Write then rename, so a startup glob never sees a half-written file
+    path = os.path.join(PDF_DIR, filename)
+    tmp_path = f"{path}.upload"
+    # Streamed to disk off the event loop, never held in memory whole
+    outcome = await run_in_threadpool(save_upload, file.file, tmp_path, int(MAX_UPLOAD_MB * 2**20))
+    if outcome == "too_large":
+        return JSONResponse({"error": f"{filename} is larger than {MAX_UPLOAD_MB:g} MB."}, status_code=413)
+    if outcome == "not_pdf":
+        return JSONResponse({"error": f"{filename} is not a PDF file."}, status_code=400)
+    os.replace(tmp_path, path)
+
+    job = job_queue.submit(path, filename)
+    return JSONResponse({**job, "queue_depth": job_queue.queue_depth()}, status_code=202)
+
+@app.get("/documents/jobs")
+async def list_jobs():
+    return JSONResponse({"jobs": job_queue.list(), "queue_depth": job_queue.queue_depth()})
+
+@app.get("/documents/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        return JSONResponse({"error": f"Unknown job {job_id}"}, status_code=404)
+    return JSONResponse(job)
+
 # Main endpoint
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     return templates.TemplateResponse("chatbot.html", {"request": request})
 
+def reject_if_unavailable():
+    """503 response while warming up or when admission control is saturated, else None"""
+    if not app_ready.is_set():
+        return JSONResponse({"error": "The service is still starting up, please retry shortly."},
+                            status_code=503, headers={"Retry-After": "5"})
+    # Admission control: shed load instead of queueing without bound
+    if pending_requests >= RETRIEVAL_MAX_PENDING:
+        return JSONResponse({"error": "The service is busy, please retry shortly."},
+                            status_code=503, headers={"Retry-After": "1"})
+    return None
+
+def admit_request():
+    """Count an admitted request as pending; returns an idempotent release()"""
+    global pending_requests
+    pending_requests += 1
+    released = False
+
+    def release():
+        global pending_requests
+        nonlocal released
+        if not released:
+            released = True
+            pending_requests -= 1
+    return release
+
 @app.post("/ask/")
 async def ask_question(question: str = Form(...)):
-    try:
-        print(f"\n\n=== New Question: {question} ===\n")
+    global pending_requests
+    rejection = reject_if_unavailable()
+    if rejection:
+        return rejection
 
-        # Step 1: Try expanded queries
-        expanded_queries = expand_query(question)
-        all_results = []
+    pending_requests += 1
+    try:
+        return await answer_question(question)
+    finally:
+        pending_requests -= 1
 
-        for eq in expanded_queries:
-            print(f"Trying expanded query: {eq}")
-            results = qdrant_store.similarity_search_with_score(eq, k=10)
-            all_results.extend(results)
+async def timed_keyword_search(question, timings, k=10):
+    with metrics.stage("keyword_search", timings):
+        return await run_blocking(keyword_search, question, k)
 
-        # Sort all results by score
-        semantic_docs = sorted(all_results, key=lambda x: x[1], reverse=True)[:20]
-        print(f"Found {len(semantic_docs)} semantic documents after query expansion")
+async def rerank_candidates(question, candidates, top_k):
+    return await run_blocking(reranker.get().rerank, question, candidates, top_k=top_k)
 
-        # Debug: Print top semantic results
-        for i, (doc, score) in enumerate(semantic_docs[:3]):
+async def retrieve_documents(question):
+    """Hybrid retrieval, rerank and dedup; returns ``(unique_docs, confident_docs, stage_timings)``"""
+    stage_timings = {}
+    result = await hybrid_retrieval.retrieve(
+        question,
+        semantic_search=batched_semantic_search,
+        keyword_search=timed_keyword_search,
+        rerank=rerank_candidates,
+        chunk_vectors=embedding_cache.aget_many,
+        timings=stage_timings,
+    )
+    unique_docs, confident_docs = result["unique_docs"], result["confident_docs"]
+
+    # One record per question; chunk snippets only at DEBUG, off the default hot path
+    logger.info("retrieval", extra={
+        "question": question,
+        "query_variants": len(result["queries"]),
+        "semantic_docs": len(result["semantic_docs"]),
+        "keyword_docs": len(result["keyword_docs"]),
+        "candidates": len(result["candidates"]),
+        "unique_docs": len(unique_docs),
+        "confident_docs": len(confident_docs),
+        "stage_ms": {name: round(seconds * 1000, 2) for name, seconds in stage_timings.items()},
+    })
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, (doc, score) in enumerate(result["reranked_docs"][:3]):
             content = doc.page_content if hasattr(doc, 'page_content') else doc
-            print(f"Top Semantic Doc {i+1} (Score: {score:.3f}): {content[:200]}...")
-
-        if not semantic_docs:
-            return JSONResponse({"answer": "No information found in semantic search."})
-
-        # Step 2: Keyword search
-        keyword_docs = []
-        if USE_BM25:
-            tokenized_question = question.lower().split()
-            bm25_scores = keyword_search.get_scores(tokenized_question)
-            top_bm25_indices = np.argsort(bm25_scores)[-10:][::-1]
-
-            docs = qdrant_store.client.scroll(
-                collection_name=COLLECTION_NAME,
-                limit=10000,
-                with_payload=True,
-            )[0]
-            for idx in top_bm25_indices:
-                doc = docs[idx]
-                keyword_docs.append((doc.payload["page_content"], bm25_scores[idx]))
-        else:
-            question_tfidf = tfidf_vectorizer.transform([question])
-            cosine_similarities = cosine_similarity(question_tfidf, tfidf_matrix).flatten()
-            top_tfidf_indices = np.argsort(cosine_similarities)[-10:][::-1]
-
-            docs = qdrant_store.client.scroll(
-                collection_name=COLLECTION_NAME,
-                limit=10000,
-                with_payload=True,
-            )[0]
-            for idx in top_tfidf_indices:
-                doc = docs[idx]
-                keyword_docs.append((doc.payload["page_content"], cosine_similarities[idx]))
-
-        # Step 3: Combine and re-rank results
-        combined_docs = semantic_docs + keyword_docs
-        if combined_docs:
-            reranked_docs = rerank_with_cross_encoder(question, combined_docs, top_k=15)
-
-            # Debug: Print reranked results
-            print("\n--- Top Reranked Results ---")
-            for i, (doc, score) in enumerate(reranked_docs[:3]):
-                content = doc.page_content if hasattr(doc, 'page_content') else doc
-                print(f"Reranked Doc {i+1} (Score: {score:.3f}): {content[:200]}...")
-
-            # Step 4: Deduplicate results
-            unique_docs = semantic_deduplication(reranked_docs, threshold=0.85)
-
-            # Step 5: Score-based filtering with lower threshold
-            filtered_docs = filter_by_score(unique_docs, min_score=0.25)
-
-            # Debug: Print filtered results
-            print(f"\nFound {len(filtered_docs)} filtered documents:")
-            for i, (doc, score) in enumerate(filtered_docs[:3]):
-                content = doc.page_content if hasattr(doc, 'page_content') else doc
-                print(f"Filtered Doc {i+1} (Score: {score:.3f}): {content[:200]}...")
-
-            if not filtered_docs:
-                # Try more permissive filtering
-                permissive_docs = filter_by_score(reranked_docs, min_score=0.1)
-                if permissive_docs:
-                    permissive_docs.sort(key=lambda x: x[1], reverse=True)
-                    top_docs = permissive_docs[:5]
-                    answer_content = []
-                    for doc, _ in top_docs:
-                        content = doc.page_content if hasattr(doc, 'page_content') else doc
-                        answer_content.append(content)
-                    answer = "\n\n---\n\n".join(answer_content)
-                    return JSONResponse({
-                        "answer": answer,
-                        "warning": "Some information was found but with low confidence. Here are the most relevant parts:"
-                    })
-                else:
-                    return JSONResponse({"answer": "No relevant information found in the documents."})
-
-            # Prepare final answer from filtered docs
-            filtered_docs.sort(key=lambda x: x[1], reverse=True)
-            top_docs = filtered_docs[:3]
-
-            answer_content = []
-            for doc, _ in top_docs:
-                content = doc.page_content if hasattr(doc, 'page_content') else doc
-                answer_content.append(content)
-
-            answer = "\n\n---\n\n".join(answer_content)
-
-            # If answer is empty, try to get at least something
-            if not answer.strip():
-                if reranked_docs:
-                    top_docs = reranked_docs[:3]
-                    answer_content = []
-                    for doc, _ in top_docs:
-                        content = doc.page_content if hasattr(doc, 'page_content') else doc
-                        answer_content.append(content)
-                    answer = "\n\n---\n\n".join(answer_content)
-                    return JSONResponse({
-                        "answer": answer,
-                        "warning": "The answer might contain some less relevant information."
-                    })
-
-            return JSONResponse({"answer": answer})
-        else:
-            return JSONResponse({"answer": "No documents found after all processing steps."})
+            logger.debug("Reranked doc %d (score %.3f): %s...", i + 1, score, content[:200])
+    return unique_docs, confident_docs, stage_timings
+
+async def answer_question(question):
+    try:
+        unique_docs, confident_docs, _ = await retrieve_documents(question)
+        if not unique_docs:
+            return JSONResponse({"answer": "No relevant information found in the documents."})
+
+        top_docs = (confident_docs or unique_docs)[:3]
+        answer = "\n\n---\n\n".join(
+            doc.page_content if hasattr(doc, 'page_content') else doc for doc, _ in top_docs)
+
+        if not answer.strip():
+            return JSONResponse({"answer": "No relevant information found in the documents."})
+        if not confident_docs:
+            return JSONResponse({
+                "answer": answer,
+                "warning": "Some information was found but with low confidence. Here are the most relevant parts:"
+            })
+        return JSONResponse({"answer": answer})
 
     except Exception as e:
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Answering failed: %s", e)
         return JSONResponse({"error": str(e)}, status_code=500)
 
+# Streaming endpoint: newline-delimited JSON events, in order
+#   {"type": "sources", ...}  as soon as retrieval is done
+#   {"type": "token", ...}    for every piece of the generated answer
+#   {"type": "done", ...}     with time to first token and total time
+#   {"type": "error", ...}    instead of done if anything fails
+@app.post("/ask/stream")
+async def ask_question_stream(question: str = Form(...)):
+    rejection = reject_if_unavailable()
+    if rejection:
+        return rejection
+    # Counted on admission, not when the body starts streaming, so a burst cannot
+    # all pass the check first. Released after retrieval, or when the response
+    # ends (including a disconnect) if the generator never got that far.
+    release = admit_request()
+    return StreamingResponse(stream_answer_events(question, release), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                             background=BackgroundTask(release))
+
+def ndjson(event):
+    return json.dumps(event) + "\n"
+
+def source_summary(doc, score):
+    metadata = doc.metadata if hasattr(doc, 'metadata') else {}
+    return {
+        "text": doc.page_content if hasattr(doc, 'page_content') else doc,
+        "source": os.path.basename(str(metadata.get("source", "unknown"))),
+        "page": metadata.get("page"),
+        "score": round(float(score), 4),
+    }
+
+async def stream_answer_events(question, release_admission):
+    start = time.perf_counter()
+    # Only retrieval counts against admission control; generation runs in Ollama
+    try:
+        unique_docs, confident_docs, _ = await retrieve_documents(question)
+    except Exception as e:
+        logger.exception("Retrieval failed: %s", e)
+        yield ndjson({"type": "error", "error": str(e)})
+        return
+    finally:
+        release_admission()
+
+    retrieval_ms = (time.perf_counter() - start) * 1000
+    top_docs = (confident_docs or unique_docs)[:3]
+    sources_event = {"type": "sources", "sources": [source_summary(doc, score) for doc, score in top_docs],
+                     "retrieval_ms": round(retrieval_ms, 1)}
+    if top_docs and not confident_docs:
+        sources_event["warning"] = "Some information was found but with low confidence."
+    yield ndjson(sources_event)
+
+    if not top_docs:
+        yield ndjson({"type": "token", "text": "No relevant information found in the documents."})
+        yield ndjson({"type": "done", "retrieval_ms": round(retrieval_ms, 1), "ttft_ms": None,
+                      "total_ms": round((time.perf_counter() - start) * 1000, 1)})
+        return
+
+    prompt = generation.build_prompt(question, [source["text"] for source in sources_event["sources"]])
+    ttft_ms = None
+    tokens = 0
+    try:
+        with metrics.stage("llm"):
+            async for token in generation.stream_answer(prompt):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - start) * 1000
+                    metrics.LLM_TTFT_SECONDS.observe(ttft_ms / 1000)
+                tokens += 1
+                yield ndjson({"type": "token", "text": token})
+    except Exception as e:
+        logger.error("Generation failed: %s", e)
+        yield ndjson({"type": "error", "error": f"Answer generation failed: {e}"})
+        return
+
+    total_ms = (time.perf_counter() - start) * 1000
+    logger.info("streamed answer", extra={
+        "retrieval_ms": round(retrieval_ms, 1),
+        "ttft_ms": None if ttft_ms is None else round(ttft_ms, 1),
+        "total_ms": round(total_ms, 1),
+        "tokens": tokens,
+    })
+    yield ndjson({"type": "done", "retrieval_ms": round(retrieval_ms, 1),
+                  "ttft_ms": None if ttft_ms is None else round(ttft_ms, 1),
+                  "total_ms": round(total_ms, 1), "tokens": tokens})
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,86 @@
+"""Compare the inverted-index BM25 engine against rank_bm25.BM25Okapi.
+
+Run from the 08 directory:  python benchmarks/bench_bm25.py --docs 20000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bm25_index import BM25Index, Tokenizer
+
+
+def synthetic_corpus(n_docs, vocab_size, seed):
+    """Zipf-distributed documents of 40-120 words, roughly the size of a 500 char chunk"""
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocab_size)]
+    docs = [" ".join(rng.choices(vocab, weights=weights, k=rng.randint(40, 120)))
+            for _ in range(n_docs)]
+    queries = [" ".join(rng.choices(vocab, k=rng.randint(2, 6))) for _ in range(200)]
+    return docs, queries
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--vocab", type=int, default=20000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    docs, queries = synthetic_corpus(args.docs, args.vocab, args.seed)
+    tokenizer = Tokenizer(stem=False, remove_stopwords=False)
+
+    start = time.perf_counter()
+    index = BM25Index(tokenizer=tokenizer)
+    index.add_documents(range(len(docs)), docs)
+    build_index = time.perf_counter() - start
+
+    index_latencies, index_results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        index_results.append([doc_id for doc_id, _ in index.search(query, k=args.k)])
+        index_latencies.append(time.perf_counter() - start)
+
+    print(f"Corpus: {len(docs)} docs, {len(queries)} queries, k={args.k}")
+    print(f"BM25Index     build {build_index:.2f}s  "
+          f"p50 {percentile(index_latencies, 50):.2f}ms  p95 {percentile(index_latencies, 95):.2f}ms")
+
+    try:
+        from rank_bm25 import BM25Okapi
+    except ImportError:
+        print("rank_bm25 not installed, skipping the baseline")
+        return
+
+    start = time.perf_counter()
+    baseline = BM25Okapi([tokenizer(doc) for doc in docs])
+    build_baseline = time.perf_counter() - start
+
+    baseline_latencies, overlaps = [], []
+    for query, index_top in zip(queries, index_results):
+        start = time.perf_counter()
+        scores = baseline.get_scores(tokenizer(query))
+        baseline_top = np.argsort(scores)[-args.k:][::-1].tolist()
+        baseline_latencies.append(time.perf_counter() - start)
+        overlaps.append(len(set(baseline_top) & set(index_top)) / args.k)
+
+    print(f"rank_bm25     build {build_baseline:.2f}s  "
+          f"p50 {percentile(baseline_latencies, 50):.2f}ms  p95 {percentile(baseline_latencies, 95):.2f}ms")
+    print(f"Speedup (p50): {statistics.median(baseline_latencies) / statistics.median(index_latencies):.1f}x")
+    # The two engines use slightly different IDF formulas, so overlap is high but not exact
+    print(f"Mean top-{args.k} overlap: {statistics.mean(overlaps):.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Cold start and memory of the 08 app: time to accept connections, time to ready, RSS.
+
+Run from the 08 directory (Qdrant must be running):  python benchmarks/bench_cold_start.py --runs 3
+With --importtime, instead imports app under ``python -X importtime`` and lists the
+slowest modules (cumulative and self time); that needs no server.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, None
+
+
+def rss_mb(pid):
+    """Resident set size of a process in MB (Linux /proc)"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def one_run(port, timeout):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    listening = ready = None
+    try:
+        while time.perf_counter() - start < timeout:
+            if listening is None and get(f"{base}/health")[0] == 200:
+                listening = time.perf_counter() - start
+            status, body = get(f"{base}/ready")
+            if status == 200:
+                ready = time.perf_counter() - start
+                profile = json.loads(body)["startup"]
+                return listening, ready, rss_mb(process.pid), profile
+            time.sleep(0.1)
+        raise TimeoutError(f"app was not ready after {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def import_profile(module="app"):
+    """``[(name, self_us, cumulative_us, depth)]`` from ``python -X importtime -c 'import module'``"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        error = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"import {module} failed:\n{error}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Nesting shows as two extra spaces of indentation per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == "site":
+            # Everything up to here is interpreter start-up, not the module's imports
+            entries = []
+            continue
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def print_import_profile(entries, top, module="app"):
+    total = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+    print(f"import {module}: {total / 1e6:.2f}s over {len(entries)} modules")
+    for label, column in (("cumulative", 2), ("self", 1)):
+        print(f"\nslowest {top} by {label} time:")
+        for entry in sorted(entries, key=lambda entry: entry[column], reverse=True)[:top]:
+            print(f"  {entry[column] / 1000:9.1f}ms  {entry[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--importtime", action="store_true", help="profile imports instead of starting the app")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    if args.importtime:
+        print_import_profile(import_profile(), args.top)
+        return
+
+    results = [one_run(args.port, args.timeout) for _ in range(args.runs)]
+    for i, (listening, ready, rss, profile) in enumerate(results, 1):
+        print(f"run {i}: listening {listening:.2f}s  ready {ready:.2f}s  RSS {rss:.0f}MB")
+        print(f"       steps: {profile['steps_seconds']}")
+    print(f"median time to ready: {statistics.median(r[1] for r in results):.2f}s, "
+          f"median RSS: {statistics.median(r[2] for r in results):.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
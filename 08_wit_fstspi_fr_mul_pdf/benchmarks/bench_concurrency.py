@@ -0,0 +1,79 @@
+"""Check that the event loop stays responsive while /ask/ is under concurrent load.
+
+Start the app first (uvicorn app:app --port 8000), then run from the 08 directory:
+    python benchmarks/bench_concurrency.py --clients 16 --requests 64
+While the load runs, /health is probed every 50ms. Its latency should stay in the
+low milliseconds; before retrieval was moved off the event loop it tracked /ask/ latency.
+"""
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+QUESTIONS = [
+    "What is the free look period?",
+    "How is the premium calculated?",
+    "What happens when a policy lapses?",
+    "Who can be a nominee?",
+    "What is the surrender value?",
+]
+
+
+def ask(base_url, question):
+    body = urllib.parse.urlencode({"question": question}).encode()
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(f"{base_url}/ask/", data=body, timeout=120) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def probe_health(base_url, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        with urllib.request.urlopen(f"{base_url}/health", timeout=30) as response:
+            response.read()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=64)
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    health_latencies = []
+    prober = threading.Thread(target=probe_health, args=(args.url, stop, health_latencies))
+    prober.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        results = list(pool.map(lambda i: ask(args.url, QUESTIONS[i % len(QUESTIONS)]),
+                                range(args.requests)))
+    wall = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    ok = [seconds for status, seconds in results if status == 200]
+    shed = sum(1 for status, _ in results if status == 503)
+    health_ms = np.array(health_latencies) * 1000
+    ask_ms = np.array(ok) * 1000 if ok else np.array([np.nan])
+
+    print(f"/ask/: {len(ok)} ok, {shed} rejected with 503, {len(ok) / wall:.2f} req/s")
+    print(f"/ask/ latency    p50 {np.percentile(ask_ms, 50):8.1f}ms  p95 {np.percentile(ask_ms, 95):8.1f}ms")
+    print(f"/health latency  p50 {np.percentile(health_ms, 50):8.1f}ms  p95 {np.percentile(health_ms, 95):8.1f}ms  "
+          f"max {health_ms.max():8.1f}ms  ({len(health_ms)} probes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measure ingestion throughput and /ask/ latency while uploads are being ingested.
+
+Start the app first (uvicorn app:app --port 8000), then run from the 08 directory:
+    python benchmarks/bench_ingest_under_load.py --pdf story.pdf --pdf file-sample_150kB.pdf
+Each PDF is uploaded to POST /documents under a fresh name (so it is always ingested),
+its job is polled until done, and /ask/ is called continuously meanwhile. /ask/ latency
+is reported separately for requests that overlapped a running job and for idle ones.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+
+from bench_concurrency import QUESTIONS, ask
+
+
+def upload(base_url, pdf_path):
+    """POST a PDF as multipart/form-data under a unique file name; return the job"""
+    boundary = uuid.uuid4().hex
+    stem, _ = os.path.splitext(os.path.basename(pdf_path))
+    filename = f"{stem}-bench-{boundary[:8]}.pdf"
+    with open(pdf_path, "rb") as f:
+        content = f.read()
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(
+        f"{base_url}/documents", data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return json.load(response)
+
+
+def wait_for_job(base_url, job_id, poll_seconds=0.2):
+    while True:
+        with urllib.request.urlopen(f"{base_url}/documents/jobs/{job_id}", timeout=30) as response:
+            job = json.load(response)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(poll_seconds)
+
+
+def ask_loop(base_url, stop, ingesting, samples):
+    i = 0
+    while not stop.is_set():
+        busy = ingesting.is_set()
+        status, seconds = ask(base_url, QUESTIONS[i % len(QUESTIONS)])
+        # Only count a request as "during ingestion" if ingestion ran for its whole duration
+        if status == 200:
+            samples.append((busy and ingesting.is_set(), seconds))
+        i += 1
+
+
+def report(label, seconds):
+    if not seconds:
+        print(f"{label:28s} no samples")
+        return
+    ms = np.array(seconds) * 1000
+    print(f"{label:28s} p50 {np.percentile(ms, 50):8.1f}ms  p95 {np.percentile(ms, 95):8.1f}ms  "
+          f"({len(ms)} requests)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--pdf", action="append", required=True, help="PDF to upload (repeatable)")
+    parser.add_argument("--clients", type=int, default=2, help="concurrent /ask/ loops")
+    parser.add_argument("--baseline-seconds", type=float, default=10.0,
+                        help="idle /ask/ sampling before and after the uploads")
+    args = parser.parse_args()
+
+    stop, ingesting = threading.Event(), threading.Event()
+    samples = []
+    askers = [threading.Thread(target=ask_loop, args=(args.url, stop, ingesting, samples))
+              for _ in range(args.clients)]
+    for asker in askers:
+        asker.start()
+
+    time.sleep(args.baseline_seconds)
+    ingesting.set()
+    jobs = []
+    start = time.perf_counter()
+    for pdf_path in args.pdf:
+        job = upload(args.url, pdf_path)
+        jobs.append(wait_for_job(args.url, job["id"]))
+    wall = time.perf_counter() - start
+    ingesting.clear()
+    time.sleep(args.baseline_seconds)
+    stop.set()
+    for asker in askers:
+        asker.join()
+
+    for job in jobs:
+        print(f"{job['filename']}: {job['status']}, {job['pages']} pages, {job['chunks']} chunks, "
+              f"{job['pages_per_sec'] or 0:.2f} pages/sec" + (f" ({job['error']})" if job["error"] else ""))
+    total_pages = sum(job["pages"] for job in jobs)
+    print(f"Ingestion: {total_pages} pages in {wall:.1f}s ({total_pages / wall:.2f} pages/sec incl. upload)")
+    report("/ask/ idle", [seconds for busy, seconds in samples if not busy])
+    report("/ask/ during ingestion", [seconds for busy, seconds in samples if busy])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure the cost of the instrumentation layer (metrics.py) per request.
+
+Run from the 08 directory:  python benchmarks/bench_metrics_overhead.py --iterations 200000
+A request records about ten stages and writes one structured log line, so the
+per-request overhead is roughly 10 * stage + 1 * log; compare it with /ask/ latency.
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+STAGES_PER_REQUEST = 10
+
+
+def per_call_ns(func, iterations):
+    start = time.perf_counter()
+    func(iterations)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def bare_loop(iterations):
+    for _ in range(iterations):
+        pass
+
+
+def stage_without_trace(iterations):
+    for _ in range(iterations):
+        with metrics.stage("bench"):
+            pass
+
+
+def stage_with_trace(iterations):
+    trace, token = metrics.start_trace()
+    try:
+        for _ in range(iterations):
+            with metrics.stage("bench", {}):
+                pass
+    finally:
+        metrics.end_trace(token)
+
+
+def contended_stage(iterations, threads=4):
+    """Same stage from several threads at once, sharing one histogram lock"""
+    workers = [threading.Thread(target=stage_without_trace, args=(iterations // threads,))
+               for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def json_log_line(iterations):
+    logger = logging.getLogger("bench")
+    for _ in range(iterations):
+        logger.info("retrieval", extra={"candidates": 20, "stage_ms": {"embed": 12.5, "rerank": 40.1}})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    # Log into memory so terminal speed does not dominate
+    metrics.configure_logging("INFO", "json")
+    logging.getLogger().handlers[0].stream = io.StringIO()
+
+    baseline = per_call_ns(bare_loop, args.iterations)
+    results = {
+        "stage (no trace)": per_call_ns(stage_without_trace, args.iterations) - baseline,
+        "stage (with trace)": per_call_ns(stage_with_trace, args.iterations) - baseline,
+        "stage (4 threads)": per_call_ns(contended_stage, args.iterations) - baseline,
+        "json log line": per_call_ns(json_log_line, args.iterations // 10) - baseline,
+    }
+    for label, ns in results.items():
+        print(f"{label:20s} {ns:10.0f} ns/call")
+
+    per_request_us = (STAGES_PER_REQUEST * results["stage (with trace)"] + results["json log line"]) / 1000
+    print(f"\nEstimated overhead per request: {per_request_us:.1f} us "
+          f"({per_request_us / 50_000 * 100:.3f}% of a 50 ms retrieval)")
+
+    for i in range(20):
+        metrics.STAGE_SECONDS.observe(0.01 * i, f"stage{i}")
+    start = time.perf_counter()
+    body = metrics.REGISTRY.render()
+    print(f"/metrics render: {(time.perf_counter() - start) * 1000:.2f} ms for {len(body.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""p50/p95 reranking latency: plain CrossEncoder.predict vs the cached, budgeted Reranker.
+
+Run from the 08 directory:  python benchmarks/bench_rerank.py --requests 200 --backend onnx
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+from reranker import Reranker, load_cross_encoder
+
+QUESTIONS = [
+    "What is a life insurance policy?",
+    "What is the free look period?",
+    "How is the premium calculated?",
+    "What happens when a policy lapses?",
+    "Who can be a nominee?",
+    "What is a unit linked insurance plan?",
+    "What are the tax benefits of life insurance?",
+    "How do I file a claim?",
+    "What is the surrender value?",
+    "What is a term plan?",
+]
+
+
+def load_passages(chunk_size=500):
+    passages = []
+    for pdf_file in sorted(glob.glob("*.pdf")):
+        text = " ".join(page.extract_text() or "" for page in PdfReader(pdf_file).pages)
+        text = " ".join(text.split())
+        passages.extend(text[i:i + chunk_size] for i in range(0, len(text), chunk_size))
+    return [Document(page_content=p, metadata={"_id": i}) for i, p in enumerate(passages) if p.strip()]
+
+
+def candidates_for(question, passages, n_candidates):
+    # Retrieval is deterministic, so a repeated question brings back the same chunks
+    rng = random.Random(question)
+    return [(doc, rng.random()) for doc in rng.sample(passages, min(n_candidates, len(passages)))]
+
+
+def report(name, latencies):
+    ms = np.array(latencies) * 1000
+    print(f"{name:<28} p50 {np.percentile(ms, 50):7.1f}ms  p95 {np.percentile(ms, 95):7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=30)
+    parser.add_argument("--max-candidates", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backend", choices=["torch", "onnx"], default="torch")
+    args = parser.parse_args()
+
+    passages = load_passages()
+    rng = random.Random(0)
+    # Skewed traffic: popular questions come up again and again
+    traffic = rng.choices(QUESTIONS, weights=[1.0 / (i + 1) for i in range(len(QUESTIONS))], k=args.requests)
+    print(f"{len(passages)} passages, {args.requests} requests, {args.candidates} candidates each")
+
+    baseline_model = load_cross_encoder(backend="torch")
+    baseline = []
+    for question in traffic:
+        candidates = candidates_for(question, passages, args.candidates)
+        start = time.perf_counter()
+        baseline_model.predict([(question, doc.page_content) for doc, _ in candidates])
+        baseline.append(time.perf_counter() - start)
+    report("before (predict all, torch)", baseline)
+
+    reranker = Reranker(model=load_cross_encoder(backend=args.backend),
+                        max_candidates=args.max_candidates, batch_size=args.batch_size)
+    tuned = []
+    for question in traffic:
+        candidates = candidates_for(question, passages, args.candidates)
+        start = time.perf_counter()
+        reranker.rerank(question, candidates, top_k=15)
+        tuned.append(time.perf_counter() - start)
+    report(f"after ({args.backend}, cache+budget)", tuned)
+
+    cache = reranker.cache
+    print(f"Score cache: {len(cache)} entries, hit rate {cache.hits / max(1, cache.hits + cache.misses):.1%}")
+
+
+if __name__ == "__main__":
+    main()
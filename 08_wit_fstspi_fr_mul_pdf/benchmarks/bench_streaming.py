@@ -0,0 +1,59 @@
+"""Measure perceived latency of the streaming answer endpoint.
+
+Start the app (uvicorn app:app --port 8000) and Ollama, then run from the 08 directory:
+    python benchmarks/bench_streaming.py --requests 10
+Client-side times are reported for the first byte (sources), the first answer token
+and the complete answer, next to the server-side TTFT from the final "done" event.
+"""
+import argparse
+import json
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+from bench_concurrency import QUESTIONS
+
+
+def stream_question(base_url, question):
+    body = urllib.parse.urlencode({"question": question}).encode()
+    start = time.perf_counter()
+    timings = {"sources": None, "first_token": None, "total": None, "server_ttft": None}
+    with urllib.request.urlopen(f"{base_url}/ask/stream", data=body, timeout=300) as response:
+        for line in response:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            elapsed = time.perf_counter() - start
+            if event["type"] == "sources":
+                timings["sources"] = elapsed
+            elif event["type"] == "token" and timings["first_token"] is None:
+                timings["first_token"] = elapsed
+            elif event["type"] == "done":
+                timings["server_ttft"] = event["ttft_ms"] / 1000 if event["ttft_ms"] is not None else None
+            elif event["type"] == "error":
+                print(f"error: {event['error']}")
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    results = [stream_question(args.url, QUESTIONS[i % len(QUESTIONS)]) for i in range(args.requests)]
+    for key, label in (("sources", "sources (retrieval)"), ("first_token", "first token"),
+                       ("server_ttft", "server TTFT"), ("total", "full answer")):
+        values = [r[key] for r in results if r[key] is not None]
+        if not values:
+            print(f"{label:22s} no samples")
+            continue
+        ms = np.array(values) * 1000
+        print(f"{label:22s} p50 {np.percentile(ms, 50):8.1f}ms  p95 {np.percentile(ms, 95):8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
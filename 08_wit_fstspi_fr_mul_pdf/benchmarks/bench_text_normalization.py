@@ -0,0 +1,67 @@
+"""Compare the previous four-pass clean_text with text_normalization on the bundled PDFs.
+
+Run from the 08 directory:  python benchmarks/bench_text_normalization.py --repeat 20
+Pages are extracted once up front, so only the cleaning itself is timed.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader
+
+from text_normalization import clean_pages, clean_text
+
+
+def legacy_clean_text(text):
+    """clean_text as it was in ingestion.py before text_normalization"""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s.,;:!?\-]', '', text)
+    text = re.sub(r'\d+\s*\n', '', text)
+    text = re.sub(r'[Hh]ttp[s]?://\S+', '', text)
+    return text.strip()
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", action="append", help="PDF to use (repeatable); default: *.pdf")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for pdf_file in args.pdf or sorted(glob.glob("*.pdf")):
+        pages = [page.extract_text() or "" for page in PdfReader(pdf_file).pages]
+        raw_chars = sum(len(page) for page in pages)
+
+        legacy_seconds = best_of(lambda: [legacy_clean_text(page) for page in pages], args.repeat)
+        page_seconds = best_of(lambda: [clean_text(page) for page in pages], args.repeat)
+        document_seconds = best_of(lambda: clean_pages(pages), args.repeat)
+
+        legacy_chars = sum(len(legacy_clean_text(page)) for page in pages)
+        page_chars = sum(len(clean_text(page)) for page in pages)
+        document_chars = sum(len(page) for page in clean_pages(pages))
+
+        print(f"{pdf_file}: {len(pages)} pages, {raw_chars} chars extracted")
+        for label, seconds, chars in (
+            ("legacy clean_text", legacy_seconds, legacy_chars),
+            ("clean_text (per page)", page_seconds, page_chars),
+            ("clean_pages (+headers)", document_seconds, document_chars),
+        ):
+            print(f"  {label:24s} {seconds * 1000:8.2f}ms  {len(pages) / seconds:10.0f} pages/s  "
+                  f"{chars:9d} chars kept")
+
+
+if __name__ == "__main__":
+    main()
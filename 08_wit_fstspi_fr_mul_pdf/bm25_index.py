@@ -0,0 +1,243 @@
+import heapq
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+
+from nltk.stem import PorterStemmer
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _load_stopwords():
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words("english"))
+    except LookupError:
+        logger.warning("NLTK stopwords not available, keeping all tokens")
+        return frozenset()
+
+
+class Tokenizer:
+    """Lowercase word tokenizer with English stopword removal and Porter stemming"""
+
+    def __init__(self, stem=True, remove_stopwords=True):
+        self.stemmer = PorterStemmer() if stem else None
+        self.stopwords = _load_stopwords() if remove_stopwords else frozenset()
+        # Stemming is the slow part; the vocabulary is small so cache per word
+        self._stems = {}
+
+    def __call__(self, text):
+        tokens = []
+        for word in _WORD_RE.findall(text.lower()):
+            if word in self.stopwords:
+                continue
+            stem = self._stems.get(word)
+            if stem is None:
+                stem = self.stemmer.stem(word) if self.stemmer else word
+                self._stems[word] = stem
+            tokens.append(stem)
+        return tokens
+
+
+class BM25Index:
+    """Inverted-index BM25 with incremental add/remove and on-disk persistence.
+
+    Postings map ``term -> {doc_id: term frequency}``. Queries are evaluated
+    term-at-a-time in decreasing order of each term's score upper bound
+    (MaxScore): once the remaining terms cannot lift an unseen document into
+    the current top-k, only documents already in the accumulator are scored,
+    and accumulators that can no longer reach the top-k are dropped.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, k1=1.5, b=0.75, tokenizer=None):
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer or Tokenizer()
+        self.postings = {}
+        self.max_tf = {}
+        self.doc_len = {}
+        self.doc_terms = {}
+        self.total_len = 0
+        # Lower bound on document length, used for score upper bounds. It may
+        # go stale (too low) after removals, which keeps the bound valid.
+        self.min_len = None
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_len
+
+    # ---------- updates ----------
+    def add(self, doc_id, text):
+        """Index one document, replacing any previous version with the same id"""
+        if doc_id in self.doc_len:
+            self.remove(doc_id)
+
+        term_freqs = Counter(self.tokenizer(text))
+        length = sum(term_freqs.values())
+        for term, tf in term_freqs.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+            if tf > self.max_tf.get(term, 0):
+                self.max_tf[term] = tf
+
+        self.doc_terms[doc_id] = list(term_freqs)
+        self.doc_len[doc_id] = length
+        self.total_len += length
+        if self.min_len is None or length < self.min_len:
+            self.min_len = length
+
+    def add_documents(self, ids, texts):
+        for doc_id, text in zip(ids, texts):
+            self.add(doc_id, text)
+
+    def remove(self, doc_id):
+        """Drop a document from the index; unknown ids are ignored"""
+        if doc_id not in self.doc_len:
+            return
+        for term in self.doc_terms.pop(doc_id):
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+                del self.max_tf[term]
+        self.total_len -= self.doc_len.pop(doc_id)
+        if not self.doc_len:
+            self.min_len = None
+
+    def sync(self, ids, texts):
+        """Bring the index in line with the current corpus, returning (added, removed)"""
+        current = set(ids)
+        stale = [doc_id for doc_id in self.doc_len if doc_id not in current]
+        for doc_id in stale:
+            self.remove(doc_id)
+
+        added = 0
+        for doc_id, text in zip(ids, texts):
+            if doc_id not in self.doc_len:
+                self.add(doc_id, text)
+                added += 1
+        return added, len(stale)
+
+    # ---------- scoring ----------
+    def idf(self, doc_freq):
+        n_docs = len(self.doc_len)
+        return math.log(1.0 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, query, k=10):
+        """Return the top-k ``(doc_id, score)`` pairs for a query"""
+        if not self.doc_len or k <= 0:
+            return []
+
+        k1, b = self.k1, self.b
+        avgdl = self.total_len / len(self.doc_len) or 1.0
+        doc_len = self.doc_len
+        min_norm = k1 * (1 - b + b * self.min_len / avgdl)
+
+        terms = []
+        for term, query_tf in Counter(self.tokenizer(query)).items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            weight = query_tf * self.idf(len(postings))
+            tf_max = self.max_tf[term]
+            upper_bound = weight * tf_max * (k1 + 1) / (tf_max + min_norm)
+            terms.append((upper_bound, weight, postings))
+        terms.sort(key=lambda t: t[0], reverse=True)
+
+        # remaining_bounds[i] = sum of the upper bounds of the terms after term i
+        remaining_bounds = [0.0] * len(terms)
+        for i in range(len(terms) - 2, -1, -1):
+            remaining_bounds[i] = remaining_bounds[i + 1] + terms[i + 1][0]
+
+        scores = {}
+        # Running top-k and the k-th best score (0 until there are k documents).
+        # Scores only grow, so after each term the new top-k is among the old one
+        # and the documents that rose above the old threshold; nothing else is rescanned.
+        top_ids = []
+        threshold = 0.0
+        for (upper_bound, weight, postings), remaining in zip(terms, remaining_bounds):
+            # An unseen document can score at most this term's bound plus the rest
+            admit_new = len(top_ids) < k or upper_bound + remaining > threshold
+
+            risen = []
+            if admit_new:
+                for doc_id, tf in postings.items():
+                    norm = k1 * (1 - b + b * doc_len[doc_id] / avgdl)
+                    score = scores.get(doc_id, 0.0) + weight * tf * (k1 + 1) / (tf + norm)
+                    scores[doc_id] = score
+                    if score > threshold:
+                        risen.append(doc_id)
+            else:
+                # Only documents already in the running; walk whichever side is shorter
+                if len(postings) < len(scores):
+                    matches = [(doc_id, tf) for doc_id, tf in postings.items() if doc_id in scores]
+                else:
+                    matches = [(doc_id, postings[doc_id]) for doc_id in scores if doc_id in postings]
+                for doc_id, tf in matches:
+                    norm = k1 * (1 - b + b * doc_len[doc_id] / avgdl)
+                    score = scores[doc_id] + weight * tf * (k1 + 1) / (tf + norm)
+                    scores[doc_id] = score
+                    if score > threshold:
+                        risen.append(doc_id)
+
+            if risen:
+                top_ids = heapq.nlargest(k, set(top_ids).union(risen), key=scores.__getitem__)
+                if len(top_ids) == k:
+                    threshold = scores[top_ids[-1]]
+            if not admit_new and len(scores) > k:
+                scores = {d: s for d, s in scores.items() if s + remaining >= threshold}
+
+        return [(doc_id, scores[doc_id]) for doc_id in top_ids]
+
+    # ---------- persistence ----------
+    def save(self, path):
+        """Write the index to disk atomically"""
+        state = {
+            "version": self.FORMAT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "doc_len": [[doc_id, length] for doc_id, length in self.doc_len.items()],
+            "postings": {term: [[doc_id, tf] for doc_id, tf in postings.items()]
+                         for term, postings in self.postings.items()},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, tokenizer=None):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported BM25 index format in {path}")
+
+        index = cls(k1=state["k1"], b=state["b"], tokenizer=tokenizer)
+        index.doc_len = {doc_id: length for doc_id, length in state["doc_len"]}
+        index.total_len = sum(index.doc_len.values())
+        index.min_len = min(index.doc_len.values()) if index.doc_len else None
+        index.doc_terms = {doc_id: [] for doc_id in index.doc_len}
+        for term, entries in state["postings"].items():
+            postings = {doc_id: tf for doc_id, tf in entries}
+            index.postings[term] = postings
+            index.max_tf[term] = max(postings.values())
+            for doc_id in postings:
+                index.doc_terms[doc_id].append(term)
+        return index
+
+    @classmethod
+    def load_or_create(cls, path, **kwargs):
+        if path and os.path.exists(path):
+            try:
+                return cls.load(path)
+            except (ValueError, KeyError, json.JSONDecodeError) as e:
+                logger.warning("Ignoring unreadable BM25 index at %s: %s", path, e)
+        return cls(**kwargs)
@@ -0,0 +1,84 @@
+import logging
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentStore:
+    """In-memory copy of the chunk texts in Qdrant, looked up by point id.
+
+    The keyword index returns Qdrant point ids; ``get_by_id`` resolves each one
+    through ``id_to_index`` to its text and metadata without any network round
+    trip, whatever order the points were scrolled or ingested in.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.texts = []
+        self.metadatas = []
+        self.id_to_index = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def load_from_qdrant(self, client, collection_name, page_size=1000):
+        """Page through the whole collection once and rebuild the store"""
+        self.ids, self.texts, self.metadatas = [], [], []
+        self.id_to_index = {}
+
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for point in points:
+                payload = point.payload or {}
+                self._append(point.id, payload.get("page_content", ""), payload.get("metadata") or {})
+            if offset is None:
+                break
+
+        logger.info("Document store loaded with %d chunks", len(self))
+        return self
+
+    def add(self, ids, texts, metadatas=None):
+        """Add (or replace) chunks after ingestion"""
+        metadatas = metadatas or [{} for _ in ids]
+        for point_id, text, metadata in zip(ids, texts, metadatas):
+            index = self.id_to_index.get(point_id)
+            if index is None:
+                self._append(point_id, text, metadata)
+            else:
+                self.texts[index] = text
+                self.metadatas[index] = dict(metadata)
+
+    def remove(self, ids):
+        """Drop chunks by point id (rebuilds the arrays; ingestion-time only)"""
+        ids = set(ids)
+        if not ids & self.id_to_index.keys():
+            return
+        kept = [i for i, point_id in enumerate(self.ids) if point_id not in ids]
+        self.ids = [self.ids[i] for i in kept]
+        self.texts = [self.texts[i] for i in kept]
+        self.metadatas = [self.metadatas[i] for i in kept]
+        self.id_to_index = {point_id: i for i, point_id in enumerate(self.ids)}
+
+    def _append(self, point_id, text, metadata):
+        self.id_to_index[point_id] = len(self.ids)
+        self.ids.append(point_id)
+        self.texts.append(text)
+        self.metadatas.append(dict(metadata))
+
+    def get(self, index):
+        """Return the chunk at a store position as a Document"""
+        metadata = dict(self.metadatas[index])
+        metadata["_id"] = self.ids[index]
+        return Document(page_content=self.texts[index], metadata=metadata)
+
+    def get_by_id(self, point_id):
+        index = self.id_to_index.get(point_id)
+        return None if index is None else self.get(index)
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class EmbeddingCache:
+    """Chunk-id keyed cache of the unit-normalized vectors already stored in Qdrant.
+
+    Chunks never change once ingested, so each vector is fetched at most once
+    (in a single batched ``retrieve``) and reused for every later question.
+    """
+
+    def __init__(self, client, collection_name, async_client=None):
+        self.client = client
+        self.async_client = async_client
+        self.collection_name = collection_name
+        self.vectors = {}
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def put(self, chunk_id, vector):
+        if isinstance(vector, dict):
+            # Named vectors: the store writes a single unnamed/default vector
+            vector = next(iter(vector.values()))
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        self.vectors[chunk_id] = vector / norm if norm > 0 else vector
+
+    def _missing(self, chunk_ids):
+        return [c for c in dict.fromkeys(chunk_ids) if c is not None and c not in self.vectors]
+
+    def _matrix(self, chunk_ids):
+        if not self.vectors:
+            return np.zeros((len(chunk_ids), 0), dtype=np.float32)
+        dim = len(next(iter(self.vectors.values())))
+        matrix = np.zeros((len(chunk_ids), dim), dtype=np.float32)
+        for row, chunk_id in enumerate(chunk_ids):
+            vector = self.vectors.get(chunk_id)
+            if vector is not None:
+                matrix[row] = vector
+        return matrix
+
+    def get_many(self, chunk_ids):
+        """Return an ``(n, dim)`` matrix of normalized vectors; unknown ids get a zero row"""
+        missing = self._missing(chunk_ids)
+        if missing:
+            points = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=missing,
+                with_payload=False,
+                with_vectors=True,
+            )
+            for point in points:
+                self.put(point.id, point.vector)
+        return self._matrix(chunk_ids)
+
+    async def aget_many(self, chunk_ids):
+        """Same as ``get_many`` but fetches misses through the async client"""
+        missing = self._missing(chunk_ids)
+        if missing:
+            points = await self.async_client.retrieve(
+                collection_name=self.collection_name,
+                ids=missing,
+                with_payload=False,
+                with_vectors=True,
+            )
+            for point in points:
+                self.put(point.id, point.vector)
+        return self._matrix(chunk_ids)
+
+    def discard(self, chunk_ids):
+        for chunk_id in chunk_ids:
+            self.vectors.pop(chunk_id, None)
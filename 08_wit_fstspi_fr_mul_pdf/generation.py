@@ -0,0 +1,68 @@
+"""Streaming answer generation with Ollama for the 08 app.
+
+Uses the same local Ollama model as the 06/07 bots, but with ``"stream": true``:
+Ollama then answers with one JSON object per line, each carrying the next piece of
+the response, so tokens can be forwarded to the browser as they are produced.
+"""
+import json
+import os
+
+import httpx
+
+OLLAMA_SERVER_URL = os.getenv("OLLAMA_SERVER_URL", "http://localhost:11434/api/generate")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "gemma3:1b")
+OLLAMA_TEMPERATURE = float(os.getenv("OLLAMA_TEMPERATURE", "0.1"))
+# Seconds to wait for the connection and between streamed lines (not for the whole answer)
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "60"))
+
+# One client for the whole process, so requests reuse the connection to Ollama
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=httpx.Timeout(OLLAMA_TIMEOUT))
+    return _client
+
+
+async def aclose():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def build_prompt(question, contexts):
+    context = "\n\n---\n\n".join(contexts)
+    return f"""Answer the question using ONLY the context.
+If the context is not relevant, say "Data not found in PDF."
+
+Context:
+{context}
+
+Question: {question}
+Answer:
+"""
+
+
+async def stream_answer(prompt):
+    """Yield response tokens from Ollama as they arrive"""
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": True,
+        "options": {"temperature": OLLAMA_TEMPERATURE},
+    }
+    async with get_client().stream("POST", OLLAMA_SERVER_URL, json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            message = json.loads(line)
+            if message.get("error"):
+                raise RuntimeError(message["error"])
+            if message.get("response"):
+                yield message["response"]
+            if message.get("done"):
+                break
@@ -0,0 +1,178 @@
+"""Fusion of the semantic and keyword retrievers into one deduplicated candidate list.
+
+Retrievers score on unrelated scales (cosine similarity vs. unbounded BM25), so raw
+scores are never compared directly: lists are merged either by reciprocal rank
+fusion or after per-retriever min-max normalization. The only absolute threshold in
+the pipeline is ``RERANK_MIN_SCORE``, applied to the cross-encoder probability.
+
+``retrieve`` runs the whole path (expand, search, fuse, rerank, dedup, cutoff) on
+search, rerank and vector-lookup callables, so the app and the benchmark harness
+share it step for step.
+"""
+import asyncio
+import os
+
+from langchain_core.documents import Document
+
+import metrics
+
+# "rrf" (reciprocal rank fusion) or "minmax" (weighted sum of min-max normalized scores)
+HYBRID_FUSION = os.getenv("HYBRID_FUSION", "rrf")
+# Damping constant for reciprocal rank fusion
+RRF_K = int(os.getenv("RRF_K", "60"))
+SEMANTIC_WEIGHT = float(os.getenv("SEMANTIC_WEIGHT", "1.0"))
+KEYWORD_WEIGHT = float(os.getenv("KEYWORD_WEIGHT", "1.0"))
+# Minimum cross-encoder relevance probability for a chunk to count as an answer
+RERANK_MIN_SCORE = float(os.getenv("RERANK_MIN_SCORE", "0.2"))
+# Number of phrasings sent to the vector search per question (1 = original question only)
+NUM_QUERY_VARIANTS = int(os.getenv("NUM_QUERY_VARIANTS", "3"))
+
+
+def expand_query(question, num_variants=NUM_QUERY_VARIANTS):
+    """Generate alternative phrasings of the question"""
+    # Simple expansion with different question formats
+    variants = [
+        question,
+        f"Explain {question}",
+        f"What is {question}",
+        f"Define {question}",
+        f"How does {question} work",
+        f"Process of {question}",
+        f"Information about {question}",
+        f"Details on {question}"
+    ]
+    return variants[:max(1, num_variants)]
+
+
+def point_to_document(point):
+    """Convert a Qdrant point written by QdrantVectorStore back into a Document"""
+    payload = point.payload or {}
+    metadata = dict(payload.get("metadata") or {})
+    metadata["_id"] = point.id
+    return Document(page_content=payload.get("page_content", ""), metadata=metadata)
+
+
+def chunk_id(doc):
+    """Stable identity of a candidate: its Qdrant point id, or its text as a fallback"""
+    metadata = getattr(doc, "metadata", None) or {}
+    if metadata.get("_id") is not None:
+        return metadata["_id"]
+    return doc.page_content if hasattr(doc, "page_content") else doc
+
+
+def min_max_normalize(scores):
+    """Scale scores to [0, 1]; a list of identical scores maps to all ones"""
+    if not scores:
+        return []
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def reciprocal_rank_fusion(ranked_lists, weights=None, k=RRF_K):
+    """Merge ranked ``(doc, score)`` lists by weighted RRF, one entry per chunk id"""
+    weights = weights or [1.0] * len(ranked_lists)
+    fused = {}
+    for results, weight in zip(ranked_lists, weights):
+        for rank, (doc, _) in enumerate(results):
+            entry = fused.setdefault(chunk_id(doc), [doc, 0.0])
+            entry[1] += weight / (k + rank + 1)
+    return sorted(((doc, score) for doc, score in fused.values()), key=lambda x: x[1], reverse=True)
+
+
+def normalized_score_fusion(ranked_lists, weights=None):
+    """Merge ``(doc, score)`` lists by a weighted sum of per-list min-max normalized scores"""
+    weights = weights or [1.0] * len(ranked_lists)
+    total_weight = sum(weights) or 1.0
+    fused = {}
+    for results, weight in zip(ranked_lists, weights):
+        normalized = min_max_normalize([score for _, score in results])
+        for (doc, _), score in zip(results, normalized):
+            entry = fused.setdefault(chunk_id(doc), [doc, 0.0])
+            entry[1] += weight * score / total_weight
+    return sorted(((doc, score) for doc, score in fused.values()), key=lambda x: x[1], reverse=True)
+
+
+def fuse(semantic_docs, keyword_docs, method=HYBRID_FUSION, top_n=None):
+    """Deduplicated hybrid candidate list, best first, ready for reranking"""
+    ranked_lists = [semantic_docs, keyword_docs]
+    weights = [SEMANTIC_WEIGHT, KEYWORD_WEIGHT]
+    if method == "minmax":
+        candidates = normalized_score_fusion(ranked_lists, weights)
+    else:
+        candidates = reciprocal_rank_fusion(ranked_lists, weights)
+    return candidates[:top_n] if top_n else candidates
+
+
+def apply_cutoff(documents_with_scores, min_score=RERANK_MIN_SCORE):
+    """Keep documents whose reranker probability reaches the cutoff"""
+    return [(doc, score) for doc, score in documents_with_scores if score >= min_score]
+
+
+def deduplicate(documents_with_scores, vectors, threshold=0.85):
+    """Drop near-duplicates given unit-normalized ``vectors`` aligned with the documents"""
+    if not documents_with_scores:
+        return []
+    similarities = vectors @ vectors.T
+
+    # Greedy pass in rank order: keep a document unless it is too close to one already kept
+    kept = []
+    for i in range(len(documents_with_scores)):
+        if not kept or similarities[i, kept].max() <= threshold:
+            kept.append(i)
+    return [documents_with_scores[i] for i in kept]
+
+
+async def retrieve(question, semantic_search, keyword_search, rerank, chunk_vectors, timings,
+                   k=10, semantic_top_n=20, rerank_top_k=15, dedup_threshold=0.85):
+    """Hybrid retrieval, rerank, dedup and cutoff for one question.
+
+    The callables are coroutines: ``semantic_search(queries, timings, k)`` returns one
+    list of Qdrant points per query, ``keyword_search(question, timings, k)`` returns
+    ``(doc, score)`` pairs, ``rerank(question, candidates, top_k)`` returns
+    ``(reranked, {stage: seconds})`` and ``chunk_vectors(chunk_ids)`` returns their
+    unit-normalized vectors. Stage durations are recorded and stored in ``timings``.
+    Returns a dict with the intermediate lists, ending in ``unique_docs`` and
+    ``confident_docs``.
+    """
+    # Step 1: Batched semantic search over the expanded queries, with the
+    # keyword search (step 2) running concurrently
+    queries = expand_query(question)
+    result_lists, keyword_docs = await asyncio.gather(
+        semantic_search(queries, timings, k),
+        keyword_search(question, timings, k),
+    )
+
+    # Step 3: Fuse the query variants, then the two retrievers, deduplicated by chunk id
+    with metrics.stage("fusion", timings):
+        semantic_docs = reciprocal_rank_fusion(
+            [[(point_to_document(point), point.score) for point in points] for points in result_lists]
+        )[:semantic_top_n]
+        candidates = fuse(semantic_docs, keyword_docs)
+
+    reranked_docs, unique_docs, confident_docs = [], [], []
+    if candidates:
+        # Step 4: One rerank pass over the best fused candidates
+        reranked_docs, rerank_timings = await rerank(question, candidates, rerank_top_k)
+        metrics.record_stages(rerank_timings)
+        timings.update(rerank_timings)
+
+        # Step 5: Deduplicate near-identical chunks using their stored vectors
+        with metrics.stage("dedup", timings):
+            if reranked_docs:
+                vectors = await chunk_vectors([doc.metadata.get("_id") for doc, _ in reranked_docs])
+                unique_docs = deduplicate(reranked_docs, vectors, dedup_threshold)
+
+        # Step 6: Single relevance cutoff on the reranker probability
+        confident_docs = apply_cutoff(unique_docs)
+
+    return {
+        "queries": queries,
+        "semantic_docs": semantic_docs,
+        "keyword_docs": keyword_docs,
+        "candidates": candidates,
+        "reranked_docs": reranked_docs,
+        "unique_docs": unique_docs,
+        "confident_docs": confident_docs,
+    }
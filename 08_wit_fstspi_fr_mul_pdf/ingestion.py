@@ -0,0 +1,238 @@
+"""Pipelined PDF ingestion into Qdrant.
+
+Stages overlap instead of running one after another:
+  1. a process pool reads and cleans PDFs in parallel (one file per task),
+  2. pages are split into chunks as they arrive (one shared splitter),
+  3. chunks are embedded in fixed-size batches,
+  4. each embedded batch is upserted on a background thread while the next one embeds.
+
+Every finished file is recorded in a checkpoint, and point ids are derived from
+(file, chunk number), so an interrupted run can be restarted without duplicates.
+Points of a file with no checkpoint entry (e.g. written by the earlier
+QdrantVectorStore ingestion, under random ids) are deleted before it is ingested.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from qdrant_client.http import models
+
+from text_normalization import clean_pages
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+CHECKPOINT_PATH = os.getenv("INGEST_CHECKPOINT_PATH", "ingestion_checkpoint.json")
+# Pages with fewer words than this (covers, blank pages, separators) are skipped
+MIN_PAGE_WORDS = 20
+CHUNK_SIZE = 500       # Smaller chunks for better precision
+CHUNK_OVERLAP = 100    # More overlap for context
+
+
+def load_and_clean_pdf(pdf_file):
+    """Worker task: return ``(pages_read, [(page_number, cleaned_text), ...])`` for one PDF"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_file)
+    # The whole document is cleaned at once so running headers/footers can be detected
+    cleaned = clean_pages([page.extract_text() or "" for page in reader.pages])
+    pages = []
+    for page_number, text in enumerate(cleaned):
+        # Skip very short pages
+        if len(text.split()) >= MIN_PAGE_WORDS:
+            pages.append((page_number, text))
+    return len(reader.pages), pages
+
+
+def make_splitter():
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]  # Split by paragraphs first
+    )
+
+
+def chunk_point_id(pdf_file, chunk_number):
+    """Deterministic point id, so re-ingesting a file overwrites instead of duplicating"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{os.path.basename(pdf_file)}#{chunk_number}"))
+
+
+def iter_chunk_batches(pdf_file, pages, splitter, batch_size):
+    """Split pages lazily and yield ``(ids, texts, metadatas)`` batches"""
+    ids, texts, metadatas = [], [], []
+    chunk_number = 0
+    for page_number, text in pages:
+        for chunk in splitter.split_text(text):
+            ids.append(chunk_point_id(pdf_file, chunk_number))
+            texts.append(chunk)
+            metadatas.append({"source": pdf_file, "page": page_number})
+            chunk_number += 1
+            if len(ids) == batch_size:
+                yield ids, texts, metadatas
+                ids, texts, metadatas = [], [], []
+    if ids:
+        yield ids, texts, metadatas
+
+
+def upsert_batch(client, collection_name, ids, texts, metadatas, vectors):
+    # Same payload layout as langchain's QdrantVectorStore
+    client.upsert(
+        collection_name=collection_name,
+        points=[
+            models.PointStruct(
+                id=point_id,
+                vector=list(vector),
+                payload={"page_content": text, "metadata": metadata},
+            )
+            for point_id, text, metadata, vector in zip(ids, texts, metadatas, vectors)
+        ],
+        wait=True,
+    )
+
+
+class IngestionCheckpoint:
+    """Per-file record of completed ingestion, keyed by file name, size and mtime"""
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.files = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.files = json.load(f)
+
+    @staticmethod
+    def _fingerprint(pdf_file):
+        stat = os.stat(pdf_file)
+        return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+    def is_done(self, pdf_file):
+        entry = self.files.get(os.path.basename(pdf_file))
+        return entry is not None and {k: entry.get(k) for k in ("size", "mtime")} == self._fingerprint(pdf_file)
+
+    def has_entry(self, pdf_file):
+        return os.path.basename(pdf_file) in self.files
+
+    def chunk_ids(self, pdf_file):
+        return self.files.get(os.path.basename(pdf_file), {}).get("ids", [])
+
+    def mark_done(self, pdf_file, ids, pages):
+        self.files[os.path.basename(pdf_file)] = {**self._fingerprint(pdf_file), "pages": pages, "ids": ids}
+        self.save()
+
+    def reset(self):
+        self.files = {}
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.files, f)
+        os.replace(tmp_path, self.path)
+
+
+def delete_points(client, collection_name, ids):
+    client.delete(
+        collection_name=collection_name,
+        points_selector=models.PointIdsList(points=list(ids)),
+        wait=True,
+    )
+
+
+def source_point_ids(client, collection_name, pdf_file):
+    """Ids of every point whose ``metadata.source`` is ``pdf_file`` (by path or file name)"""
+    sources = list(dict.fromkeys([pdf_file, os.path.basename(pdf_file)]))
+    source_filter = models.Filter(must=[
+        models.FieldCondition(key="metadata.source", match=models.MatchAny(any=sources))])
+    ids, offset = [], None
+    while True:
+        points, offset = client.scroll(collection_name=collection_name, scroll_filter=source_filter,
+                                       limit=1000, offset=offset, with_payload=False, with_vectors=False)
+        ids.extend(point.id for point in points)
+        if offset is None:
+            return ids
+
+
+def ingest_pdfs(pdf_files, embed_documents, client, collection_name, checkpoint=None,
+                on_batch=None, on_remove=None, on_progress=None,
+                workers=INGEST_WORKERS, batch_size=EMBED_BATCH_SIZE):
+    """Ingest PDFs not yet in the checkpoint and return throughput stats.
+
+    ``on_batch(ids, texts, metadatas)`` runs after each batch is stored in Qdrant;
+    ``on_remove(ids)`` runs when points are deleted (chunks a changed file no longer
+    produces, or untracked points of a file about to be ingested);
+    ``on_progress(pdf_file, pages_done, chunks_done)`` runs after each file.
+    """
+    checkpoint = checkpoint if checkpoint is not None else IngestionCheckpoint()
+    todo = [pdf_file for pdf_file in pdf_files if not checkpoint.is_done(pdf_file)]
+    stats = {"files": 0, "pages": 0, "chunks": 0, "seconds": 0.0, "pages_per_sec": 0.0}
+    if not todo:
+        logger.info("All PDFs already ingested")
+        return stats
+
+    start = time.perf_counter()
+    splitter = make_splitter()
+    # spawn: the parent already holds torch threads, which do not survive fork safely
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(todo))), mp_context=context) as pool, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="qdrant-upsert") as upserter:
+        pending = None
+
+        def finish_pending():
+            future, batch = pending
+            future.result()
+            if on_batch:
+                on_batch(*batch)
+
+        for pdf_file, (pages_read, pages) in zip(todo, pool.map(load_and_clean_pdf, todo)):
+            logger.info("Processing %s (%d pages, %d with text)", pdf_file, pages_read, len(pages))
+            if not checkpoint.has_entry(pdf_file):
+                # Untracked points of this file would otherwise stay next to the new ones
+                untracked_ids = source_point_ids(client, collection_name, pdf_file)
+                if untracked_ids:
+                    logger.info("Replacing %d untracked points of %s", len(untracked_ids), pdf_file)
+                    delete_points(client, collection_name, untracked_ids)
+                    if on_remove:
+                        on_remove(untracked_ids)
+            file_ids = []
+            for ids, texts, metadatas in iter_chunk_batches(pdf_file, pages, splitter, batch_size):
+                vectors = embed_documents(texts)
+                # Upsert of the previous batch ran while this one was embedding
+                if pending:
+                    finish_pending()
+                pending = (upserter.submit(upsert_batch, client, collection_name, ids, texts, metadatas, vectors),
+                           (ids, texts, metadatas))
+                file_ids.extend(ids)
+
+            if pending:
+                finish_pending()
+                pending = None
+
+            # A changed file may now produce fewer chunks than its previous version
+            stale_ids = set(checkpoint.chunk_ids(pdf_file)) - set(file_ids)
+            if stale_ids:
+                delete_points(client, collection_name, stale_ids)
+                if on_remove:
+                    on_remove(stale_ids)
+            checkpoint.mark_done(pdf_file, file_ids, pages_read)
+
+            stats["files"] += 1
+            stats["pages"] += pages_read
+            stats["chunks"] += len(file_ids)
+            if on_progress:
+                on_progress(pdf_file, pages_read, len(file_ids))
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["pages_per_sec"] = stats["pages"] / stats["seconds"] if stats["seconds"] else 0.0
+    logger.info("Ingested %d files, %d pages, %d chunks in %.1fs (%.1f pages/sec)",
+                stats["files"], stats["pages"], stats["chunks"], stats["seconds"], stats["pages_per_sec"])
+    return stats
@@ -0,0 +1,84 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionJobQueue:
+    """In-process FIFO of ingestion jobs served by one background worker thread.
+
+    ``ingest_fn(path, job)`` does the work and may update ``job["chunks"]`` and
+    ``job["pages"]`` as it goes; the queue tracks status and timing around it.
+    """
+
+    def __init__(self, ingest_fn, max_finished_jobs=200):
+        self.ingest_fn = ingest_fn
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.worker = None
+
+    def start(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run, name="ingestion-worker", daemon=True)
+            self.worker.start()
+
+    def submit(self, path, filename):
+        job = {
+            "id": uuid.uuid4().hex,
+            "filename": filename,
+            "status": "queued",
+            "pages": 0,
+            "chunks": 0,
+            "error": None,
+            "queued_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "pages_per_sec": None,
+        }
+        with self.lock:
+            self.jobs[job["id"]] = job
+            self._evict_finished()
+        self.pending.put((job["id"], path))
+        return dict(job)
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self):
+        with self.lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def queue_depth(self):
+        return self.pending.qsize()
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    def _run(self):
+        while True:
+            job_id, path = self.pending.get()
+            job = self.jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            try:
+                self.ingest_fn(path, job)
+                job["status"] = "done"
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = str(e)
+                logger.exception("Ingestion job %s (%s) failed", job_id, job["filename"])
+            finally:
+                job["finished_at"] = time.time()
+                elapsed = job["finished_at"] - job["started_at"]
+                if job["pages"] and elapsed > 0:
+                    job["pages_per_sec"] = round(job["pages"] / elapsed, 2)
+                self.pending.task_done()
@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+# "torch" or "onnx" (quantized ONNX runs noticeably faster on CPU)
+RERANK_BACKEND = os.getenv("RERANK_BACKEND", "torch")
+RERANK_ONNX_FILE = os.getenv("RERANK_ONNX_FILE", "onnx/model_qint8_avx512.onnx")
+# Only the strongest first-stage candidates are sent to the cross-encoder
+RERANK_MAX_CANDIDATES = int(os.getenv("RERANK_MAX_CANDIDATES", "20"))
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "20000"))
+
+
+def normalize_question(question):
+    return " ".join(question.lower().split())
+
+
+def sigmoid(logit):
+    """Map a cross-encoder logit to a relevance probability in (0, 1)"""
+    if logit >= 0:
+        return 1.0 / (1.0 + math.exp(-logit))
+    z = math.exp(logit)
+    return z / (1.0 + z)
+
+
+def load_cross_encoder(model_name=RERANK_MODEL, backend=RERANK_BACKEND, onnx_file=RERANK_ONNX_FILE,
+                       cache_folder=None):
+    """Load the cross-encoder, falling back to PyTorch if ONNX inference is unavailable"""
+    # Imported here so importing this module does not pull in torch
+    from sentence_transformers import CrossEncoder
+
+    if backend == "onnx":
+        try:
+            return CrossEncoder(model_name, backend="onnx", cache_folder=cache_folder,
+                                model_kwargs={"file_name": onnx_file})
+        except (TypeError, ValueError, ImportError, OSError) as e:
+            logger.warning("ONNX cross-encoder unavailable (%s), falling back to PyTorch", e)
+    return CrossEncoder(model_name, cache_folder=cache_folder)
+
+
+class ScoreCache:
+    """Bounded LRU of cross-encoder scores keyed by (normalized question, chunk id)"""
+
+    def __init__(self, max_size=RERANK_CACHE_SIZE):
+        self.max_size = max_size
+        self.scores = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Rerank calls run concurrently on the retrieval worker threads
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def get(self, key):
+        with self.lock:
+            score = self.scores.get(key)
+            if score is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.scores.move_to_end(key)
+            return score
+
+    def put(self, key, score):
+        with self.lock:
+            self.scores[key] = score
+            self.scores.move_to_end(key)
+            while len(self.scores) > self.max_size:
+                self.scores.popitem(last=False)
+
+
+class Reranker:
+    """Cross-encoder rerank stage with a score cache and a candidate budget"""
+
+    def __init__(self, model=None, max_candidates=RERANK_MAX_CANDIDATES,
+                 batch_size=RERANK_BATCH_SIZE, cache_size=RERANK_CACHE_SIZE):
+        self.model = model if model is not None else load_cross_encoder()
+        self.max_candidates = max_candidates
+        self.batch_size = batch_size
+        self.cache = ScoreCache(cache_size)
+
+    @staticmethod
+    def _chunk_key(doc):
+        metadata = getattr(doc, "metadata", None) or {}
+        chunk_id = metadata.get("_id")
+        if chunk_id is not None:
+            return chunk_id
+        content = doc.page_content if hasattr(doc, "page_content") else doc
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def score(self, question, documents):
+        """Return cross-encoder scores for the documents, predicting only cache misses"""
+        timings = {}
+        question_key = normalize_question(question)
+
+        start = time.perf_counter()
+        keys = [(question_key, self._chunk_key(doc)) for doc in documents]
+        scores = [self.cache.get(key) for key in keys]
+        pending = {}
+        for key, doc, score in zip(keys, documents, scores):
+            if score is None and key not in pending:
+                pending[key] = doc.page_content if hasattr(doc, "page_content") else doc
+        timings["rerank_cache"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fresh = {}
+        if pending:
+            predicted = self.model.predict(
+                [(question, content) for content in pending.values()],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+            for key, score in zip(pending, predicted):
+                fresh[key] = float(score)
+                self.cache.put(key, fresh[key])
+        timings["rerank_predict"] = time.perf_counter() - start
+
+        scores = [score if score is not None else fresh[key]
+                  for key, score in zip(keys, scores)]
+        return scores, len(pending), timings
+
+    def rerank(self, question, documents_with_scores, top_k=10):
+        """Re-rank candidates (given best first) by cross-encoder relevance probability"""
+        candidates = documents_with_scores[:self.max_candidates]
+        if not candidates:
+            return [], {}
+
+        cross_scores, n_predicted, timings = self.score(question, [doc for doc, _ in candidates])
+        logger.debug("Reranked %d of %d candidates (%d scored by the model, %d from cache)",
+                     len(candidates), len(documents_with_scores), n_predicted, len(candidates) - n_predicted)
+
+        # First-stage scores only decide who gets reranked; they live on other scales
+        reranked = [(doc, sigmoid(cross_score)) for (doc, _), cross_score in zip(candidates, cross_scores)]
+        reranked.sort(key=lambda x: x[1], reverse=True)
+        return reranked[:top_k], timings
@@ -0,0 +1,147 @@
+"""Lazy model loading, warm-up bookkeeping and the startup-time report for the 08 app.
+
+Pre-warm the model/artifact cache before deploying with:  python startup.py --prewarm
+For the slowest imports run:  python benchmarks/bench_cold_start.py --importtime
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Downloaded models live here so restarts and new workers never hit the network
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "model_cache")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")
+# Warn when warm-up takes longer than this many seconds
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "30"))
+
+
+class StartupProfile:
+    """Records how long each startup step took"""
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.steps = {}
+        self.lock = threading.Lock()
+
+    def record(self, step, seconds):
+        with self.lock:
+            self.steps[step] = seconds
+
+    def step(self, name):
+        return _TimedStep(self, name)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def report(self):
+        with self.lock:
+            steps = {name: round(seconds, 3) for name, seconds in self.steps.items()}
+        return {
+            "steps_seconds": steps,
+            "elapsed_seconds": round(self.elapsed(), 3),
+            "budget_seconds": STARTUP_BUDGET_SECONDS,
+        }
+
+    def log_report(self):
+        """Log the step timings (slowest first) and warn when over the startup budget"""
+        report = self.report()
+        steps = dict(sorted(report["steps_seconds"].items(), key=lambda item: item[1], reverse=True))
+        logger.info("startup profile: %.2fs (%s)", report["elapsed_seconds"],
+                    ", ".join(f"{name} {seconds:.2f}s" for name, seconds in steps.items()),
+                    extra={"steps_seconds": steps, "elapsed_seconds": report["elapsed_seconds"],
+                           "budget_seconds": report["budget_seconds"]})
+        if report["elapsed_seconds"] > STARTUP_BUDGET_SECONDS:
+            logger.warning("startup took %.1fs, over the %.0fs budget", report["elapsed_seconds"],
+                           STARTUP_BUDGET_SECONDS,
+                           extra={"elapsed_seconds": report["elapsed_seconds"],
+                                  "budget_seconds": report["budget_seconds"]})
+
+
+class _TimedStep:
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class LazyResource:
+    """Builds an expensive object on first use (thread-safe) and records the load time"""
+
+    def __init__(self, name, factory, profile=None):
+        self.name = name
+        self.factory = factory
+        self.profile = profile
+        self._value = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._value is not None
+
+    def get(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    start = time.perf_counter()
+                    value = self.factory()
+                    if self.profile is not None:
+                        self.profile.record(f"load:{self.name}", time.perf_counter() - start)
+                    self._value = value
+        return self._value
+
+
+def ensure_nltk_data(packages=("stopwords",)):
+    """Download NLTK corpora only when they are not already installed"""
+    import nltk
+
+    for package in packages:
+        try:
+            nltk.data.find(f"corpora/{package}")
+        except LookupError:
+            nltk.download(package, quiet=True)
+
+
+def load_embeddings():
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, cache_folder=MODEL_CACHE_DIR)
+
+
+def load_reranker():
+    from reranker import Reranker, load_cross_encoder
+
+    return Reranker(model=load_cross_encoder(cache_folder=MODEL_CACHE_DIR))
+
+
+def prewarm():
+    """Download every model and NLTK corpus the app needs into the local caches"""
+    profile = StartupProfile()
+    with profile.step("nltk_data"):
+        ensure_nltk_data()
+    with profile.step("embedding_model"):
+        load_embeddings().embed_query("warm up")
+    with profile.step("reranker_model"):
+        load_reranker().model.predict([("warm up", "warm up")])
+    profile.log_report()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prewarm", action="store_true", help="download models into MODEL_CACHE_DIR")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.prewarm:
+        prewarm()
+    else:
+        parser.print_help()
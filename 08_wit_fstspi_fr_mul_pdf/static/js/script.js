@@ -1,9 +1,54 @@
 document.addEventListener('DOMContentLoaded', function() {
     const askButton = document.getElementById('ask-button');
-    alert(askButton);
     const questionInput = document.getElementById('question-input');
     const answerBox = document.getElementById('answer-box');
 
+    // Sources arrive first, then the answer grows token by token
+    function renderSources(event) {
+        answerBox.innerHTML = '';
+        if (event.warning) {
+            const warning = document.createElement('p');
+            warning.className = 'warning';
+            warning.textContent = event.warning;
+            answerBox.appendChild(warning);
+        }
+
+        const answer = document.createElement('p');
+        answer.className = 'answer';
+        answerBox.appendChild(answer);
+
+        if (event.sources.length > 0) {
+            const details = document.createElement('details');
+            details.className = 'sources';
+            const summary = document.createElement('summary');
+            summary.textContent = `Sources (${event.sources.length})`;
+            details.appendChild(summary);
+            event.sources.forEach(function(source) {
+                const item = document.createElement('p');
+                const page = source.page === null || source.page === undefined ? '' : `, page ${source.page + 1}`;
+                item.textContent = `${source.source}${page}: ${source.text}`;
+                details.appendChild(item);
+            });
+            answerBox.appendChild(details);
+        }
+        return answer;
+    }
+
+    function handleEvent(event, state) {
+        if (event.type === 'sources') {
+            state.answer = renderSources(event);
+        } else if (event.type === 'token') {
+            state.answer.textContent += event.text;
+        } else if (event.type === 'done') {
+            console.log('retrieval ms:', event.retrieval_ms, 'ttft ms:', event.ttft_ms, 'total ms:', event.total_ms);
+        } else if (event.type === 'error') {
+            const error = document.createElement('p');
+            error.className = 'error';
+            error.textContent = event.error;
+            answerBox.appendChild(error);
+        }
+    }
+
     // Ask a question
     askButton.addEventListener('click', async function() {
         const question = questionInput.value.trim();
@@ -13,8 +58,10 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
+        askButton.disabled = true;
+        answerBox.innerHTML = '<p>Searching the documents...</p>';
         try {
-            const response = await fetch('/ask/', {
+            const response = await fetch('/ask/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/x-www-form-urlencoded',
@@ -22,11 +69,36 @@ document.addEventListener('DOMContentLoaded', function() {
                 body: `question=${encodeURIComponent(question)}`,
             });
 
-            const result = await response.json();
-            answerBox.innerHTML = `<p>${result.answer}</p>`;
+            if (!response.ok) {
+                const result = await response.json();
+                answerBox.innerHTML = '';
+                handleEvent({type: 'error', error: result.error || `Request failed (${response.status})`}, {});
+                return;
+            }
+
+            // Newline-delimited JSON: parse each complete line as soon as it arrives
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            const state = {answer: null};
+            let buffer = '';
+            while (true) {
+                const {done, value} = await reader.read();
+                if (done) {
+                    break;
+                }
+                buffer += decoder.decode(value, {stream: true});
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.filter(line => line.trim() !== '').forEach(line => handleEvent(JSON.parse(line), state));
+            }
+            if (buffer.trim() !== '') {
+                handleEvent(JSON.parse(buffer), state);
+            }
         } catch (error) {
             console.error('Error asking question:', error);
             answerBox.innerHTML = `<p>Error asking question. Check the console for details.</p>`;
+        } finally {
+            askButton.disabled = false;
         }
     });
 });
@@ -0,0 +1,97 @@
+"""Normalization of text extracted from PDF pages before chunking.
+
+Line structure is only meaningful before whitespace is collapsed, so each page is
+handled in this order:
+  1. line-level filtering: bare page numbers ("12", "Page 3 of 40") near the top or
+     bottom of the page and the running headers/footers detected across the whole
+     document are dropped,
+  2. URLs are removed (before "/" and ":" are, or they stop looking like URLs),
+  3. characters outside letters, digits and basic punctuation are deleted in one pass:
+     bytes.translate for ASCII text (the common case once typographic dashes, quotes
+     and spaces are folded), a precompiled regex otherwise,
+  4. whitespace is collapsed with str.split/join.
+"""
+import re
+import string
+from collections import Counter
+
+# Typographic characters folded to ASCII so more pages take the bytes.translate path
+_TYPOGRAPHY = {
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2212": "-",
+    "\u2018": "", "\u2019": "", "\u201c": "", "\u201d": "",
+    "\u00a0": " ", "\u2009": " ", "\u200b": "", "\u00ad": "",
+    "\u2026": "...",
+}
+_TYPOGRAPHY_PATTERN = re.compile("[" + "".join(_TYPOGRAPHY) + "]")
+_URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_SPECIAL_CHARS_PATTERN = re.compile(r"[^\w\s.,;:!?\-]+")
+# ASCII equivalent of _SPECIAL_CHARS_PATTERN, for bytes.translate
+_KEPT_ASCII = set((string.ascii_letters + string.digits + "_" + string.whitespace + "\x1c\x1d\x1e\x1f.,;:!?-").encode())
+_SPECIAL_ASCII = bytes(b for b in range(128) if b not in _KEPT_ASCII)
+_PAGE_NUMBER_PATTERN = re.compile(r"(?:page\s*)?\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?", re.IGNORECASE)
+_DIGITS_PATTERN = re.compile(r"\d+")
+
+# Lines looked at for headers (top of page) and footers (bottom of page)
+EDGE_LINES = 3
+# A line counts as a running header/footer if it repeats on this share of pages...
+MIN_REPEAT_FRACTION = 0.5
+# ...and on at least this many pages, so short documents keep their content
+MIN_REPEAT_PAGES = 3
+
+
+def _line_key(line):
+    """Digits are wildcarded so "Chapter 2 - Page 14" matches "Chapter 2 - Page 15" """
+    return _DIGITS_PATTERN.sub("#", line)
+
+
+def find_repeated_lines(pages_lines, edge_lines=EDGE_LINES,
+                        min_fraction=MIN_REPEAT_FRACTION, min_pages=MIN_REPEAT_PAGES):
+    """Return the line keys that repeat at the top or bottom of many pages"""
+    counts = Counter()
+    for lines in pages_lines:
+        edges = lines[:edge_lines] + lines[-edge_lines:]
+        counts.update({_line_key(line) for line in edges})
+    threshold = max(min_pages, min_fraction * len(pages_lines))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def _content_lines(text):
+    """Non-empty lines, without bare page numbers among the first and last EDGE_LINES"""
+    lines = [line for line in (line.strip() for line in text.splitlines()) if line]
+    # Only the page edges: a line of digits in the body is a table cell or a figure
+    last = len(lines) - EDGE_LINES
+    return [line for i, line in enumerate(lines)
+            if not ((i < EDGE_LINES or i >= last) and _PAGE_NUMBER_PATTERN.fullmatch(line))]
+
+
+def _clean_lines(lines):
+    text = " ".join(lines)
+    if "://" in text or "www." in text:
+        text = _URL_PATTERN.sub(" ", text)
+    if not text.isascii():
+        text = _TYPOGRAPHY_PATTERN.sub(lambda match: _TYPOGRAPHY[match.group()], text)
+    if text.isascii():
+        text = text.encode("ascii").translate(None, _SPECIAL_ASCII).decode("ascii")
+    else:
+        text = _SPECIAL_CHARS_PATTERN.sub("", text)
+    return " ".join(text.split())
+
+
+def clean_text(text):
+    """Clean a single page: page numbers, URLs, special characters and whitespace"""
+    return _clean_lines(_content_lines(text))
+
+
+def clean_pages(page_texts):
+    """Clean all pages of one document, also stripping its running headers and footers"""
+    pages_lines = [_content_lines(text) for text in page_texts]
+    repeated = find_repeated_lines(pages_lines)
+    cleaned = []
+    for lines in pages_lines:
+        if repeated:
+            # Only the page edges are checked, so body text that happens to repeat stays
+            last = len(lines) - EDGE_LINES
+            lines = [line for i, line in enumerate(lines)
+                     if not ((i < EDGE_LINES or i >= last) and _line_key(line) in repeated)]
+        cleaned.append(_clean_lines(lines))
+    return cleaned
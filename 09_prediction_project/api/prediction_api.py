@@ -1,23 +1,59 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 import joblib
+import os
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
+from src.bulk_scoring import SUPPORTED_TYPES, iter_frames, media_type, score_frames
+from src.micro_batching import MicroBatcher
+from src.model_registry import LivePredictor, ModelRegistry
 from src.prediction import Predictor
 
+MODEL_PATH = os.getenv('MODEL_PATH', 'models/best_model.pkl')
+PREPROCESSOR_PATH = os.getenv('PREPROCESSOR_PATH', 'models/preprocessor.pkl')
+# When set, serve the current version of this model registry (memory-mapped) and
+# switch to a newly activated version without a restart; MODEL_PATH is then unused
+MODEL_REGISTRY = os.getenv('MODEL_REGISTRY')
+# How often each worker checks the registry for a new current version
+REGISTRY_CHECK_SECONDS = float(os.getenv('REGISTRY_CHECK_SECONDS', '2'))
+# Concurrent /predict requests are scored together: up to this many rows...
+PREDICT_MAX_BATCH_SIZE = int(os.getenv('PREDICT_MAX_BATCH_SIZE', '32'))
+# ...collected for at most this long (0 = only what is already waiting)
+PREDICT_MAX_WAIT_MS = float(os.getenv('PREDICT_MAX_WAIT_MS', '2'))
+MICRO_BATCHING = os.getenv('PREDICT_MICRO_BATCHING', '1') == '1'
+# Rows scored per model call by /predict_bulk
+BULK_CHUNK_ROWS = int(os.getenv('BULK_CHUNK_ROWS', '50000'))
+
 app = Flask(__name__)
 
-# Initialize predictor
-predictor = Predictor(
-    model_path='models/best_model.pkl',
-    preprocessor_path='models/preprocessor.pkl'
-)
+# Initialize predictor (at import, so a preloading server such as gunicorn --preload
+# loads it once and its forked workers share it)
+if MODEL_REGISTRY:
+    registry = ModelRegistry(MODEL_REGISTRY)
+    live_predictor = LivePredictor(registry, REGISTRY_CHECK_SECONDS)
+else:
+    registry = live_predictor = None
+    fixed_predictor = Predictor(
+        model_path=MODEL_PATH,
+        preprocessor_path=PREPROCESSOR_PATH
+    )
+
+def current_predictor():
+    """The Predictor to use for one request; call once and keep it for the whole request"""
+    return live_predictor.get() if live_predictor else fixed_predictor
+
+batcher = MicroBatcher(lambda records: current_predictor().predict_records(records),
+                       PREDICT_MAX_BATCH_SIZE, PREDICT_MAX_WAIT_MS)
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'message': 'Prediction API is running'
+        'message': 'Prediction API is running',
+        'model_version': current_predictor().version,
+        'micro_batching': batcher.stats() if MICRO_BATCHING else None
     })
 
 @app.route('/predict', methods=['POST'])
@@ -30,8 +66,11 @@ def predict():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Make prediction
-        prediction = predictor.predict_single(data)
+        # Make prediction (batched with concurrent requests when enabled)
+        if MICRO_BATCHING and isinstance(data, dict):
+            prediction = batcher.submit(data)
+        else:
+            prediction = current_predictor().predict_single(data)
         
         # Convert numpy types to Python types
         if isinstance(prediction, np.generic):
@@ -60,7 +99,7 @@ def predict_batch():
             return jsonify({'error': 'No inputs provided'}), 400
         
         # Make predictions
-        predictions = predictor.predict_batch(data['inputs'])
+        predictions = current_predictor().predict_batch(data['inputs'])
         
         # Convert numpy types to Python types
         predictions = [p.item() if isinstance(p, np.generic) else p for p in predictions]
@@ -78,15 +117,64 @@ def predict_batch():
             'error': str(e)
         }), 500
 
+@app.route('/predict_bulk', methods=['POST'])
+def predict_bulk():
+    """Score a whole file: CSV, Arrow IPC, Parquet or column-oriented JSON body
+    
+    The body is spooled to a temp file, read back BULK_CHUNK_ROWS rows at a time
+    and the predictions are streamed back as CSV, so memory stays flat however large
+    the file is. ``?id_column=<name>`` echoes that input column next to each prediction.
+    """
+    if media_type(request.content_type) not in SUPPORTED_TYPES:
+        return jsonify({
+            'success': False,
+            'error': f"Unsupported Content-Type; use one of: {', '.join(SUPPORTED_TYPES)}"
+        }), 415
+    id_column = request.args.get('id_column')
+    # The whole upload is scored by one model version, even if another is activated meanwhile
+    predictor = current_predictor()
+    
+    # Spool to disk first: answering while the client is still uploading can deadlock
+    # once both socket buffers are full, and Parquet needs a seekable file
+    spool = tempfile.NamedTemporaryFile(suffix='.upload', delete=False)
+    try:
+        with spool:
+            shutil.copyfileobj(request.stream, spool, 1 << 20)
+        frames = iter_frames(spool.name, request.content_type, BULK_CHUNK_ROWS)
+        # Parse and score the first chunk now, so a bad upload gets a 400 instead of a broken stream
+        first = next(frames, None)
+        if first is None:
+            raise ValueError("No rows in the upload")
+        if id_column and id_column not in first.columns:
+            raise ValueError(f"id_column {id_column!r} is not in the input")
+        missing = [column for column in predictor.get_feature_names() or [] if column not in first.columns]
+        if missing:
+            raise ValueError(f"Missing input features: {missing}")
+        first_predictions = predictor.predict_batch(first)
+    except Exception as e:
+        os.unlink(spool.name)
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    def generate():
+        try:
+            yield from score_frames(predictor.predict_batch, frames, id_column, (first, first_predictions))
+        finally:
+            frames.close()
+            os.unlink(spool.name)
+    
+    return Response(stream_with_context(generate()), mimetype='text/csv')
+
 @app.route('/model_info', methods=['GET'])
 def model_info():
     """Get model information"""
     try:
+        predictor = current_predictor()
         model = predictor.model
         
         info = {
+            'version': predictor.version,
             'model_type': type(model).__name__,
-            'features': predictor.preprocessor['scaler'].feature_names_in_.tolist() if predictor.preprocessor else None,
+            'features': predictor.get_feature_names(),
             'is_classifier': hasattr(model, 'predict_proba')
         }
         
@@ -101,5 +189,25 @@ def model_info():
             'error': str(e)
         }), 500
 
+@app.route('/admin/activate', methods=['POST'])
+def activate_version():
+    """Make a registry version current and serve it from this worker right away
+    
+    Other workers switch within REGISTRY_CHECK_SECONDS. In-flight requests finish on
+    the version they started with.
+    """
+    if registry is None:
+        return jsonify({'success': False, 'error': 'MODEL_REGISTRY is not configured'}), 404
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    try:
+        registry.activate(version)
+        live_predictor.reload(version)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e), 'versions': registry.versions()}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True, 'model_version': version})
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
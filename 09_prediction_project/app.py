@@ -1,3 +1,4 @@
+import io
 import streamlit as st
 import pandas as pd
 import requests
@@ -105,22 +106,21 @@ elif page == "Batch Prediction":
         
         if st.button("Run Batch Prediction", type="primary"):
             with st.spinner("Processing..."):
-                # Convert dataframe to list of dicts
-                inputs = df.to_dict('records')
-                
+                # Send the file as-is; the API scores it in chunks and streams CSV back
                 response = requests.post(
-                    f"{API_URL}/predict_batch",
-                    json={"inputs": inputs}
+                    f"{API_URL}/predict_bulk",
+                    data=uploaded_file.getvalue(),
+                    headers={'Content-Type': 'text/csv'}
                 )
                 
                 if response.status_code == 200:
-                    result = response.json()
+                    predictions = pd.read_csv(io.BytesIO(response.content))['prediction']
                     
                     # Add predictions to dataframe
-                    df['Prediction'] = result['predictions']
+                    df['Prediction'] = predictions.to_numpy()
                     
                     # Display results
-                    st.success(f"Batch prediction complete! {result['count']} predictions made.")
+                    st.success(f"Batch prediction complete! {len(predictions)} predictions made.")
                     
                     # Show results
                     st.subheader("Results with Predictions")
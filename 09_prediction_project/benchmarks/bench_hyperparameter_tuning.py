@@ -0,0 +1,73 @@
+"""Time-to-best-score of hyperparameter_tuning vs the previous exhaustive grid.
+
+Run from the 09 directory:  python benchmarks/bench_hyperparameter_tuning.py --rows 4000
+The previous version ran a 36-setting GridSearchCV (cv=5, 180 Random Forest fits,
+no parallelism); its best score is only known when it ends. The successive-halving
+search reports its best score after every rung.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import GridSearchCV
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import make_training_frame
+from src.data_preprocessing import DataPreprocessor
+from src.model_training import ModelTrainer
+from src.preprocessing_pipeline import PreprocessingPipeline
+
+
+def legacy_grid(X_train, y_train):
+    """hyperparameter_tuning's Random Forest grid as it was"""
+    param_grid = {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 10, 20, 30],
+        'min_samples_split': [2, 5, 10]
+    }
+    grid_search = GridSearchCV(RandomForestRegressor(random_state=42), param_grid, cv=5, scoring='r2')
+    return grid_search.fit(X_train, y_train)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=4000)
+    parser.add_argument("--n-candidates", type=int, default=32)
+    parser.add_argument("--time-budget", type=float)
+    parser.add_argument("--skip-grid", action="store_true")
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    df = make_training_frame(args.rows)
+    X_train, X_test, y_train, y_test = DataPreprocessor().split_data(df, 'price')
+    pipeline = PreprocessingPipeline()
+    X_train, X_test = pipeline.fit_transform(X_train), pipeline.transform(X_test)
+
+    trainer = ModelTrainer('regression')
+    start = time.perf_counter()
+    model, _ = trainer.hyperparameter_tuning(X_train, y_train, X_test, y_test, model_name='Random Forest',
+                                             n_candidates=args.n_candidates, time_budget=args.time_budget)
+    halving_seconds = time.perf_counter() - start
+    halving_test = r2_score(y_test, model.predict(X_test))
+
+    print(f"\n{args.rows} rows, {os.cpu_count()} cores")
+    if not args.skip_grid:
+        start = time.perf_counter()
+        grid = legacy_grid(X_train, y_train)
+        grid_seconds = time.perf_counter() - start
+        grid_test = r2_score(y_test, grid.predict(X_test))
+        print(f"  exhaustive grid      best CV {grid.best_score_:.4f} after {grid_seconds:7.1f}s  "
+              f"(36 settings, 180 fits)  test R2 {grid_test:.4f}")
+    for rung in trainer.tuning_history:
+        print(f"  successive halving   best CV {rung['best_score']:.4f} after {rung['elapsed']:7.1f}s  "
+              f"({rung['candidates']} candidates, {rung['resource']}={rung['amount']})")
+    print(f"  successive halving   total {halving_seconds:.1f}s with the final refit, test R2 {halving_test:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare DataPreprocessor.load_data modes on a synthetic listings CSV.
+
+Run from the 09 directory:  python benchmarks/bench_load_data.py --rows 2000000
+Modes: the default read_csv, compact dtypes read in chunks, and the Parquet cache
+(first run writes it, second run reads it). Each mode runs in a fresh process so
+peak RSS is its own.
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_prepare_mumbai_data import make_frame
+
+MODES = {
+    'default': {},
+    'compact dtypes, chunked': {'optimize_dtypes': True},
+    'parquet cache (cold)': {'optimize_dtypes': True, 'cache': True},
+    'parquet cache (warm)': {'optimize_dtypes': True, 'cache': True},
+}
+
+
+def write_csv(csv_path, rows):
+    make_frame(rows).to_csv(csv_path, index=False)
+
+
+def load(csv_path, cache_dir, options):
+    from src.data_preprocessing import DataPreprocessor
+
+    preprocessor = DataPreprocessor()
+    use_cache = options.pop('cache', False)
+    preprocessor.load_data(csv_path, cache_dir=cache_dir if use_cache else None, **options)
+    return preprocessor.load_stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_load_data_")
+    try:
+        csv_path = os.path.join(workdir, "listings.csv")
+        # Also in a child: a forked process inherits its parent's peak RSS, so this one stays small
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pool.submit(write_csv, csv_path, args.rows).result()
+        print(f"{args.rows} rows, {os.path.getsize(csv_path) / 2**20:.0f} MiB CSV\n")
+
+        results = {}
+        for mode, options in MODES.items():
+            if options.get('optimize_dtypes'):
+                options = {**options, 'chunksize': args.chunksize}
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results[mode] = pool.submit(load, csv_path, os.path.join(workdir, "cache"), dict(options)).result()
+
+        print(f"\n{'mode':26s}{'seconds':>9s}{'frame MiB':>11s}{'peak RSS MiB':>14s}")
+        for mode, stats in results.items():
+            print(f"{mode:26s}{stats['seconds']:9.2f}{stats['memory_mb']:11.1f}{stats['peak_rss_mb'] or 0:14.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Load time and per-worker memory of registry artifacts, and a hot-swap under load.
+
+Run from the 09 directory:  python benchmarks/bench_model_registry.py --workers 4 --train-rows 200000
+Publishes a Random Forest and a Hist Gradient Boosting model to a temp registry,
+then starts --workers processes that each load one of them (joblib.load copying,
+or mmap_mode='r') and predict, or that fork from one process that loaded it
+first (as gunicorn --preload does). RSS counts every resident page; PSS splits
+shared pages between the processes mapping them, so its sum is the real footprint.
+Finally the API is started on the registry and versions are activated while
+clients keep calling /predict; every request must succeed.
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from bench_predict_load import start_server
+from synthetic_data import make_training_frame
+from src.model_registry import ModelRegistry
+from src.preprocessing_pipeline import PreprocessingPipeline
+
+MODELS = {
+    'random_forest': lambda: RandomForestRegressor(n_estimators=100, min_samples_leaf=2, random_state=42),
+    'hist_gradient_boosting': lambda: HistGradientBoostingRegressor(max_iter=300, random_state=42),
+}
+
+
+def memory_mb():
+    """This process's RSS and PSS (MB), from /proc"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                values[key] = int(rest.split()[0]) / 1024
+    return values['Rss'], values['Pss']
+
+
+def worker(root, version, mmap_mode, rows, barrier, results):
+    start = time.perf_counter()
+    predictor = ModelRegistry(root).load_predictor(version, mmap_mode=mmap_mode)
+    load_seconds = time.perf_counter() - start
+    predictor.predict_batch(rows)
+    # Measure only once every worker has loaded, so shared pages are split between all of them
+    barrier.wait()
+    rss, pss = memory_mb()
+    results.put((load_seconds, rss, pss))
+    barrier.wait()
+
+
+def forked_worker(predictor, rows, barrier, results):
+    predictor.predict_batch(rows)
+    barrier.wait()
+    rss, pss = memory_mb()
+    results.put((0.0, rss, pss))
+    barrier.wait()
+
+
+def preloading_master(root, version, rows, workers, results):
+    """Load once, then fork the workers; the master's pages count towards the total too"""
+    start = time.perf_counter()
+    predictor = ModelRegistry(root).load_predictor(version, mmap_mode='r')
+    load_seconds = time.perf_counter() - start
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(workers + 1)
+    processes = [context.Process(target=forked_worker, args=(predictor, rows, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    rss, pss = memory_mb()
+    results.put((load_seconds, rss, pss))
+    barrier.wait()
+    for process in processes:
+        process.join()
+
+
+def measure(root, version, mode, rows, workers):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    if mode == 'preload':
+        processes = [context.Process(target=preloading_master, args=(root, version, rows, workers, results))]
+        expected = workers + 1
+    else:
+        barrier = context.Barrier(workers)
+        mmap_mode = 'r' if mode == 'mmap' else None
+        processes = [context.Process(target=worker, args=(root, version, mmap_mode, rows, barrier, results))
+                     for _ in range(workers)]
+        expected = workers
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in range(expected)]
+    for process in processes:
+        process.join()
+    loads, rss, pss = zip(*measured)
+    return max(loads), sum(rss) / expected, sum(pss) / expected, sum(pss)
+
+
+def hot_swap(root, versions, records, port, clients, seconds):
+    server, url = start_server(root, port, {'MODEL_REGISTRY': root, 'REGISTRY_CHECK_SECONDS': '0.5'})
+    stop = threading.Event()
+    outcomes = {'ok': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def client(i):
+        session = requests.Session()
+        while not stop.is_set():
+            try:
+                response = session.post(f"{url}/predict", json=records[i % len(records)], timeout=30)
+                outcome = 'ok' if response.ok and response.json().get('success') else 'failed'
+            except requests.RequestException:
+                outcome = 'failed'
+            with lock:
+                outcomes[outcome] += 1
+
+    registry = ModelRegistry(root)
+    served = []
+    try:
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            for i in range(clients):
+                pool.submit(client, i)
+            deadline = time.perf_counter() + seconds
+            swaps = 0
+            while time.perf_counter() < deadline:
+                version = versions[swaps % len(versions)]
+                if swaps % 2:
+                    # Pointer only: the server notices within REGISTRY_CHECK_SECONDS
+                    registry.activate(version)
+                else:
+                    requests.post(f"{url}/admin/activate", json={'version': version}, timeout=60).raise_for_status()
+                swaps += 1
+                time.sleep(1.0)
+                served.append(requests.get(f"{url}/health", timeout=30).json()['model_version'])
+            stop.set()
+    finally:
+        server.terminate()
+        server.wait()
+    return swaps, outcomes, served
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--train-rows", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--swap-seconds", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=5056)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_model_registry_")
+    try:
+        df = make_training_frame(args.train_rows)
+        X, y = df.drop(columns='price'), df['price']
+        pipeline = PreprocessingPipeline()
+        matrix = pipeline.fit_transform(X)
+        registry = ModelRegistry(root)
+        versions = {}
+        for name, factory in MODELS.items():
+            start = time.perf_counter()
+            model = factory().fit(matrix, y)
+            versions[name] = registry.publish(model, pipeline, metadata={'model_name': name})
+            size_mb = os.path.getsize(os.path.join(root, versions[name], 'model.joblib')) / 2**20
+            print(f"{name}: trained in {time.perf_counter() - start:.1f}s, artifact {size_mb:.0f} MB")
+        rows = X.head(1000).to_dict('records')
+
+        print(f"\n{args.workers} worker processes, {args.train_rows} training rows")
+        print("(preload: per-process figures include the master)")
+        print(f"{'model':24s}{'load':>8s}{'load s':>9s}{'RSS MB':>9s}{'PSS MB':>9s}{'total PSS':>11s}")
+        for name, version in versions.items():
+            for mode in ('copy', 'mmap', 'preload'):
+                load, rss, pss, total = measure(root, version, mode, rows, args.workers)
+                print(f"{name:24s}{mode:>8s}{load:9.2f}{rss:9.0f}{pss:9.0f}{total:11.0f}")
+
+        swaps, outcomes, served = hot_swap(root, list(versions.values()), rows, args.port, args.clients,
+                                           args.swap_seconds)
+        print(f"\nHot swap: {swaps} activations in {args.swap_seconds:.0f}s under {args.clients} clients; "
+              f"{outcomes['ok']} requests ok, {outcomes['failed']} failed")
+        print(f"  versions served after each activation: {' '.join(served)}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
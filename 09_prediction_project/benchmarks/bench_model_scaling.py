@@ -0,0 +1,73 @@
+"""Fit time vs rows for each model of ModelTrainer's default and large-data tiers.
+
+Run from the 09 directory:  python benchmarks/bench_model_scaling.py --rows 5000 20000 100000 400000
+The default tier is what get_models returned before (exact Gradient Boosting, SVR
+on every row); the large-data tier is what train_all_models now picks from
+LARGE_DATA_ROWS rows on. A model is skipped at a size once its previous fit time,
+scaled linearly by rows, already exceeds --max-seconds.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+from sklearn.metrics import r2_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import make_training_frame
+from src.data_preprocessing import DataPreprocessor
+from src.model_training import ModelTrainer, HIST_MAX_CATEGORIES
+from src.preprocessing_pipeline import PreprocessingPipeline
+
+
+def prepare(rows, large_data):
+    df = make_training_frame(rows)
+    X_train, X_test, y_train, y_test = DataPreprocessor().split_data(df, 'price')
+    pipeline = PreprocessingPipeline(scale_categoricals=not large_data)
+    X_train, X_test = pipeline.fit_transform(X_train), pipeline.transform(X_test)
+    if large_data:
+        trainer = ModelTrainer('regression', large_data_rows=0,
+                               categorical_features=pipeline.categorical_mask(HIST_MAX_CATEGORIES))
+    else:
+        trainer = ModelTrainer('regression', large_data_rows=float('inf'))
+    return trainer, X_train, X_test, y_train, y_test
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[5_000, 20_000, 100_000, 400_000])
+    parser.add_argument("--max-seconds", type=float, default=120.0)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    results = {}
+    last = {}
+    for rows in args.rows:
+        for tier, large_data in (("default", False), ("large-data", True)):
+            trainer, X_train, X_test, y_train, y_test = prepare(rows, large_data)
+            for model_name, model in trainer.get_models(len(X_train)).items():
+                key = (tier, model_name)
+                if key in last:
+                    previous_rows, previous_seconds = last[key]
+                    estimate = previous_seconds * rows / previous_rows
+                    if estimate > args.max_seconds:
+                        results[key, rows] = f"skip (>{estimate:.0f}s)"
+                        continue
+                start = time.perf_counter()
+                model.fit(X_train, y_train)
+                seconds = time.perf_counter() - start
+                test_r2 = r2_score(y_test, model.predict(X_test))
+                last[key] = (rows, seconds)
+                results[key, rows] = f"{seconds:7.2f}s {test_r2:6.3f}"
+                print(f"{rows:>8} rows  {tier:<10} {model_name:<24} {seconds:8.2f}s  test R2 {test_r2:.4f}")
+
+    print(f"\nFit seconds and test R2, {os.cpu_count()} cores")
+    print(f"{'tier':<11}{'model':<24}" + "".join(f"{rows:>18}" for rows in args.rows))
+    for key in dict.fromkeys(key for key, _ in results):
+        print(f"{key[0]:<11}{key[1]:<24}" + "".join(f"{results.get((key, rows), '-'):>18}" for rows in args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Throughput and server memory of /predict_bulk for each upload format.
+
+Run from the 09 directory:  python benchmarks/bench_predict_bulk.py --rows 1000000
+Trains a model on synthetic listings, writes a --rows file in each format, and
+uploads it to a fresh API process (so each format's peak RSS is its own, read from
+/proc on Linux). For comparison the old /predict_batch JSON-records endpoint is run
+with --records-rows rows.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_predict_load import start_server, train
+from bench_prepare_mumbai_data import make_frame
+
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'json columns': 'application/json',
+}
+
+
+def write_inputs(workdir, rows):
+    df = make_frame(rows).drop(columns=['price', 'price_unit'])
+    paths = {name: os.path.join(workdir, f"input.{name.replace(' ', '_')}") for name in FORMATS}
+    df.to_csv(paths['csv'], index=False)
+    df.to_parquet(paths['parquet'], index=False)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(paths['arrow'], 'wb') as sink, pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=100_000)
+    with open(paths['json columns'], 'w', encoding='utf-8') as f:
+        json.dump({'columns': df.to_dict('list')}, f)
+    return paths
+
+
+def peak_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float('nan')
+
+
+def upload(url, path, content_type):
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        response = requests.post(f"{url}/predict_bulk", data=f, headers={'Content-Type': content_type},
+                                 stream=True, timeout=600)
+        response.raise_for_status()
+        lines = sum(chunk.count(b'\n') for chunk in response.iter_content(1 << 16))
+    return lines - 1, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--records-rows", type=int, default=100_000)
+    parser.add_argument("--port", type=int, default=5056)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_predict_bulk_")
+    try:
+        train(workdir, 'random_forest', 20_000)
+        paths = write_inputs(workdir, args.rows)
+        print(f"\n{'input':22s}{'rows':>9s}{'MiB':>7s}{'seconds':>9s}{'rows/s':>10s}{'server peak MiB':>17s}")
+
+        for name, content_type in FORMATS.items():
+            server, url = start_server(workdir, args.port, {})
+            try:
+                rows, seconds = upload(url, paths[name], content_type)
+                peak = peak_rss_mb(server.pid)
+            finally:
+                server.terminate()
+                server.wait()
+            size = os.path.getsize(paths[name]) / 2**20
+            print(f"{'bulk ' + name:22s}{rows:9d}{size:7.0f}{seconds:9.2f}{rows / seconds:10.0f}{peak:17.0f}")
+
+        records = make_frame(args.records_rows).drop(columns=['price', 'price_unit']).to_dict('records')
+        server, url = start_server(workdir, args.port, {})
+        try:
+            start = time.perf_counter()
+            response = requests.post(f"{url}/predict_batch", json={'inputs': records}, timeout=600)
+            response.raise_for_status()
+            seconds = time.perf_counter() - start
+            peak = peak_rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{'predict_batch records':22s}{len(records):9d}{'':7s}{seconds:9.2f}{len(records) / seconds:10.0f}{peak:17.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Load test /predict with and without server-side micro-batching.
+
+Run from the 09 directory:  python benchmarks/bench_predict_load.py --concurrency 32 --requests 3000
+Trains a model on synthetic listings into a temp dir, starts the Flask API twice
+(PREDICT_MICRO_BATCHING=0 and 1) on a threaded server, and fires single-row
+requests from concurrent clients. Reports throughput and latency percentiles.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import requests
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from bench_prepare_mumbai_data import make_frame
+from src.preprocessing_pipeline import PreprocessingPipeline
+
+MODELS = {
+    'random_forest': lambda: RandomForestRegressor(n_estimators=100, max_depth=12, random_state=42, n_jobs=1),
+    'gradient_boosting': lambda: GradientBoostingRegressor(n_estimators=100, random_state=42),
+}
+
+SERVER = """
+from api.prediction_api import app
+app.run(host='127.0.0.1', port={port}, threaded=True)
+"""
+
+
+def train(workdir, model_name, rows):
+    df = make_frame(rows).drop(columns='price_unit')
+    X, y = df.drop(columns='price'), df['price']
+    pipeline = PreprocessingPipeline()
+    model = MODELS[model_name]().fit(pipeline.fit_transform(X), y)
+    pipeline.save(os.path.join(workdir, 'preprocessor.pkl'))
+    joblib.dump(model, os.path.join(workdir, 'model.pkl'))
+    return X.head(1000).to_dict('records')
+
+
+def start_server(workdir, port, env_overrides):
+    env = {**os.environ, 'MODEL_PATH': os.path.join(workdir, 'model.pkl'),
+           'PREPROCESSOR_PATH': os.path.join(workdir, 'preprocessor.pkl'), **env_overrides}
+    server = subprocess.Popen([sys.executable, '-c', SERVER.format(port=port)], cwd=PROJECT_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            requests.get(f"{url}/health", timeout=1)
+            return server, url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("API did not start")
+
+
+def load_test(url, records, concurrency, total):
+    sessions = {}
+
+    def call(i):
+        session = sessions.setdefault(i % concurrency, requests.Session())
+        start = time.perf_counter()
+        response = session.post(f"{url}/predict", json=records[i % len(records)], timeout=30)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(min(total, 200))))
+        start = time.perf_counter()
+        latencies = np.array(list(pool.map(call, range(total)))) * 1000
+        wall = time.perf_counter() - start
+    return total / wall, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", choices=sorted(MODELS), default='random_forest')
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--train-rows", type=int, default=20_000)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_predict_load_")
+    try:
+        records = train(workdir, args.model, args.train_rows)
+        modes = {
+            'unbatched': {'PREDICT_MICRO_BATCHING': '0'},
+            'micro-batched': {'PREDICT_MICRO_BATCHING': '1', 'PREDICT_MAX_BATCH_SIZE': str(args.max_batch_size),
+                              'PREDICT_MAX_WAIT_MS': str(args.max_wait_ms)},
+        }
+        print(f"{args.model}, {args.concurrency} concurrent clients, {args.requests} requests\n")
+        print(f"{'mode':15s}{'req/s':>9s}{'p50 ms':>9s}{'p95 ms':>9s}{'p99 ms':>9s}  batching")
+        for mode, env in modes.items():
+            server, url = start_server(workdir, args.port, env)
+            try:
+                throughput, latencies = load_test(url, records, args.concurrency, args.requests)
+                batching = requests.get(f"{url}/health", timeout=5).json().get('micro_batching')
+            finally:
+                server.terminate()
+                server.wait()
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            mean_batch = f"mean batch {batching['mean_batch_size']}" if batching else "-"
+            print(f"{mode:15s}{throughput:9.0f}{p50:9.1f}{p95:9.1f}{p99:9.1f}  {mean_batch}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
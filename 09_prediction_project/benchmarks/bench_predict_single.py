@@ -0,0 +1,96 @@
+"""Per-call latency of Predictor.predict_single: DataFrame path vs the NumPy fast path.
+
+Run from the 09 directory:  python benchmarks/bench_predict_single.py --calls 5000
+Models are trained on a small synthetic listings frame and saved to a temp dir, then
+loaded through Predictor exactly as the API does. Paths timed:
+  legacy artifact   label encoders + scaler dict, model fitted on a DataFrame
+  pipeline, pandas  PreprocessingPipeline applied through a one-row DataFrame
+  pipeline, numpy   RowVectorizer (what /predict uses now)
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_prepare_mumbai_data import make_frame
+from src.data_preprocessing import DataPreprocessor
+from src.prediction import Predictor
+from src.preprocessing_pipeline import PreprocessingPipeline
+
+MODELS = {
+    'LinearRegression': lambda: LinearRegression(),
+    'RandomForest(50)': lambda: RandomForestRegressor(n_estimators=50, max_depth=12, random_state=42, n_jobs=1),
+}
+
+
+def latencies(func, records, calls):
+    samples = np.empty(calls)
+    for i in range(calls):
+        record = records[i % len(records)]
+        start = time.perf_counter()
+        func(record)
+        samples[i] = time.perf_counter() - start
+    return samples * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--train-rows", type=int, default=20_000)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    df = make_frame(args.train_rows).drop(columns='price_unit')
+    df['area'] = df['area'].astype(float)
+    X, y = df.drop(columns='price'), df['price']
+    records = X.head(1000).to_dict('records')
+
+    workdir = tempfile.mkdtemp(prefix="bench_predict_single_")
+    try:
+        legacy = DataPreprocessor()
+        X_legacy = legacy.scale_features(legacy.encode_categorical(X))
+        legacy.save_preprocessor(os.path.join(workdir, 'legacy_preprocessor.pkl'))
+        pipeline = PreprocessingPipeline()
+        X_pipeline = pipeline.fit_transform(X)
+        pipeline.save(os.path.join(workdir, 'preprocessor.pkl'))
+
+        print(f"\n{'model':18s}{'path':20s}{'p50 us':>10s}{'p99 us':>10s}")
+        for model_name, make_model in MODELS.items():
+            joblib.dump(make_model().fit(X_legacy, y), os.path.join(workdir, 'legacy_model.pkl'))
+            joblib.dump(make_model().fit(X_pipeline, y), os.path.join(workdir, 'model.pkl'))
+            legacy_predictor = Predictor(os.path.join(workdir, 'legacy_model.pkl'),
+                                         os.path.join(workdir, 'legacy_preprocessor.pkl'))
+            predictor = Predictor(os.path.join(workdir, 'model.pkl'), os.path.join(workdir, 'preprocessor.pkl'))
+
+            # Same predictions from both pipeline paths
+            assert np.isclose(predictor.predict_single(records[0]), predictor.predict_batch([records[0]])[0])
+
+            paths = {
+                'legacy artifact': legacy_predictor.predict_single,
+                'pipeline, pandas': lambda record: predictor.predict_batch([record])[0],
+                'pipeline, numpy': predictor.predict_single,
+            }
+            for path, func in paths.items():
+                latencies(func, records, 200)
+                samples = latencies(func, records, args.calls)
+                print(f"{model_name:18s}{path:20s}{np.percentile(samples, 50):10.1f}{np.percentile(samples, 99):10.1f}")
+
+        samples = latencies(predictor.row_vectorizer.transform, records, args.calls)
+        print(f"\nRowVectorizer.transform alone: p50 {np.percentile(samples, 50):.1f}us, "
+              f"p99 {np.percentile(samples, 99):.1f}us")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
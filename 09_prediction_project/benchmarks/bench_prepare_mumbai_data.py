@@ -0,0 +1,93 @@
+"""Time DataPreprocessor.prepare_mumbai_data against the previous row-wise version.
+
+Run from the 09 directory:  python benchmarks/bench_prepare_mumbai_data.py --rows 5000000
+The frame is synthetic but shaped like the Mumbai listings dump (prices in Cr/L,
+six categorical columns). The row-wise version is slow; --legacy-rows times it on a
+prefix and extrapolates.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_preprocessing import DataPreprocessor
+
+
+def make_frame(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    localities = np.array([f"Locality {i}" for i in range(2000)], dtype=object)
+    return pd.DataFrame({
+        'price': np.round(rng.uniform(0.2, 20.0, rows), 2),
+        'price_unit': rng.choice(np.array(['Cr', 'L'], dtype=object), rows, p=[0.4, 0.6]),
+        'area': rng.integers(250, 5000, rows).astype(str),
+        'bhk': rng.integers(1, 6, rows),
+        'type': rng.choice(np.array(['Apartment', 'Villa', 'Independent House', 'Studio Apartment'],
+                                    dtype=object), rows),
+        'locality': rng.choice(localities, rows),
+        'region': rng.choice(np.array([f"Region {i}" for i in range(200)], dtype=object), rows),
+        'status': rng.choice(np.array(['Ready to move', 'Under Construction'], dtype=object), rows),
+        'age': rng.choice(np.array(['New', 'Resale', 'Unknown'], dtype=object), rows),
+    })
+
+
+def legacy_prepare_mumbai_data(df):
+    """prepare_mumbai_data as it was before vectorizing"""
+    df['price'] = df.apply(lambda row:
+        float(row['price']) * 10000000 if row['price_unit'] == 'Cr'
+        else float(row['price']), axis=1)
+    df['area'] = pd.to_numeric(df['area'], errors='coerce')
+    categorical_cols = ['bhk', 'type', 'locality', 'region', 'status', 'age']
+    for col in categorical_cols:
+        if col in df.columns:
+            df[col] = df[col].astype('category').cat.codes
+    df = df.drop(['price_unit'], axis=1)
+    return df
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=200_000,
+                        help="rows to time the row-wise version on (0 to skip it)")
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows)
+    print(f"Synthetic frame: {args.rows} rows, {frame.memory_usage(deep=True).sum() / 2**20:.0f} MiB")
+
+    preprocessor = DataPreprocessor()
+    prepared, seconds = timed(preprocessor.prepare_mumbai_data, frame.copy())
+    print(f"  vectorized          {seconds:8.2f}s  {args.rows / seconds:12.0f} rows/s")
+
+    # Reusing the fitted vocabularies (the inference path) must give identical codes
+    reused, reuse_seconds = timed(lambda df: preprocessor.prepare_mumbai_data(df, fit=False), frame.copy())
+    assert reused.equals(prepared)
+    print(f"  vectorized, fit=False {reuse_seconds:6.2f}s  {args.rows / reuse_seconds:12.0f} rows/s")
+
+    if args.legacy_rows:
+        sample = frame.iloc[:args.legacy_rows].copy()
+        legacy, legacy_seconds = timed(legacy_prepare_mumbai_data, sample.copy())
+        projected = legacy_seconds * args.rows / len(sample)
+        print(f"  row-wise (legacy)   {projected:8.2f}s  {len(sample) / legacy_seconds:12.0f} rows/s  "
+              f"(timed on {len(sample)} rows, {projected / seconds:.0f}x slower)")
+
+        # Same output apart from the L unit, which the legacy version left unscaled
+        current = DataPreprocessor().prepare_mumbai_data(sample.copy())
+        crore = (sample['price_unit'] == 'Cr').to_numpy()
+        assert np.allclose(current['price'].to_numpy()[crore], legacy['price'].to_numpy()[crore])
+        assert np.allclose(current['price'].to_numpy()[~crore], legacy['price'].to_numpy()[~crore] * 100_000)
+        assert current.drop(columns='price').equals(legacy.drop(columns='price'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare the separate DataPreprocessor passes with the fused PreprocessingPipeline.
+
+Run from the 09 directory:  python benchmarks/bench_preprocessing_pipeline.py --rows 1000000
+Both paths start from the same raw frame (with missing values) and end with scaled
+train/test features. Time is wall clock; memory is the tracemalloc peak over the raw
+frame, i.e. what the preprocessing itself allocates.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_prepare_mumbai_data import make_frame
+from src.data_preprocessing import DataPreprocessor
+from src.preprocessing_pipeline import PreprocessingPipeline
+
+TARGET_COLUMN = 'price'
+
+
+def separate_passes(df):
+    """main.py before the pipeline: four full-frame passes, then the split"""
+    preprocessor = DataPreprocessor()
+    df = preprocessor.handle_missing_values(df, strategy='mean')
+    df = preprocessor.encode_categorical(df)
+    df = preprocessor.scale_features(df, target_column=TARGET_COLUMN, scaler_type='standard')
+    return preprocessor.split_data(df, TARGET_COLUMN)
+
+
+def fused_pipeline(df):
+    X_train, X_test, y_train, y_test = DataPreprocessor().split_data(df, TARGET_COLUMN)
+    pipeline = PreprocessingPipeline(strategy='mean', scaler_type='standard')
+    return pipeline.fit_transform(X_train), pipeline.transform(X_test), y_train, y_test
+
+
+def measure(func, df):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(df)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    rng = np.random.default_rng(0)
+    df = make_frame(args.rows).drop(columns='price_unit')
+    df['area'] = df['area'].astype(float)
+    for column in ('area', 'locality', 'status'):
+        df.loc[rng.random(len(df)) < 0.05, column] = np.nan
+    print(f"{args.rows} rows, {df.memory_usage(deep=True).sum() / 2**20:.0f} MiB raw frame")
+
+    results = {}
+    for label, func in (("separate passes", separate_passes), ("fused pipeline", fused_pipeline)):
+        results[label] = measure(func, df)
+
+    print(f"\n{'path':18s}{'seconds':>9s}{'peak MiB':>10s}")
+    for label, (_, seconds, peak) in results.items():
+        print(f"{label:18s}{seconds:9.2f}{peak:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Wall time of ModelTrainer.train_all_models: sequential loop vs process pool.
+
+Run from the 09 directory:  python benchmarks/bench_train_all_models.py --rows 20000
+The speed-up is bounded by the core count and by the slowest candidate (SVR grows
+roughly quadratically with rows); pass --time-budget to see it cut off.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import make_training_frame
+from src.data_preprocessing import DataPreprocessor
+from src.model_training import ModelTrainer
+from src.preprocessing_pipeline import PreprocessingPipeline
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--time-budget", type=float, help="seconds per candidate (process pool only)")
+    parser.add_argument("--memory-budget-mb", type=float)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    df = make_training_frame(args.rows)
+    X_train, X_test, y_train, y_test = DataPreprocessor().split_data(df, 'price')
+    pipeline = PreprocessingPipeline()
+    X_train, X_test = pipeline.fit_transform(X_train), pipeline.transform(X_test)
+
+    timings = {}
+    for label, options in (("sequential", {'n_jobs': 1}),
+                           (f"process pool (n_jobs={args.n_jobs})",
+                            {'n_jobs': args.n_jobs, 'time_budget': args.time_budget,
+                             'memory_budget_mb': args.memory_budget_mb})):
+        start = time.perf_counter()
+        _, best_name, _ = ModelTrainer('regression').train_all_models(X_train, y_train, X_test, y_test, **options)
+        timings[label] = (time.perf_counter() - start, best_name)
+
+    print(f"\n{args.rows} rows, {os.cpu_count()} cores")
+    for label, (seconds, best_name) in timings.items():
+        print(f"  {label:28s} {seconds:8.1f}s  best: {best_name}")
+
+
+if __name__ == "__main__":
+    main()
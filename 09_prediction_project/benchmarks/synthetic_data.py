@@ -0,0 +1,25 @@
+"""Synthetic training frames shared by the model benchmarks.
+
+Every model benchmark trains on make_training_frame, so their scores stay
+comparable; change the price model here rather than in a benchmark.
+"""
+import numpy as np
+
+from bench_prepare_mumbai_data import make_frame
+
+
+def make_training_frame(rows, seed=42):
+    """make_frame without price_unit, with a price that depends on the features
+
+    Price grows with area, scaled by a per-region premium and a per-type premium,
+    plus small bhk and status terms and noise. Region and type have few levels, so
+    a held-out split still sees them all and test scores are meaningful.
+    """
+    df = make_frame(rows, seed).drop(columns='price_unit')
+    rng = np.random.default_rng(seed + 1)
+    region_premium = rng.uniform(0.5, 2.0, 200)[df['region'].str.slice(7).astype(int).to_numpy()]
+    type_premium = df['type'].map({'Apartment': 1.0, 'Villa': 2.5, 'Independent House': 1.8,
+                                   'Studio Apartment': 0.7}).to_numpy()
+    df['price'] = (df['area'].astype(float) / 1000 * region_premium * type_premium + df['bhk'] * 0.3
+                   + (df['status'] == 'Ready to move') * 0.5 + rng.normal(0, 0.5, rows))
+    return df
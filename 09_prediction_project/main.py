@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
 from src.data_preprocessing import DataPreprocessor
-from src.model_training import ModelTrainer
+from src.preprocessing_pipeline import PreprocessingPipeline
+from src.model_training import ModelTrainer, HIST_MAX_CATEGORIES
 from src.prediction import Predictor
+from src.model_registry import ModelRegistry
 from src.evaluation import ModelEvaluator
 import warnings
 warnings.filterwarnings('ignore')
@@ -21,30 +23,35 @@ def main():
     print("\n📊 STEP 1: Data Preprocessing")
     preprocessor = DataPreprocessor()
     
-    # Load data
-    df = preprocessor.load_data(DATA_PATH)
+    # Load data (compact dtypes, chunked read, Parquet cache for repeat runs)
+    df = preprocessor.load_data(DATA_PATH, optimize_dtypes=True, cache_dir='data/cache')
     
     # Explore data
     preprocessor.explore_data(df)
     
-    # Handle missing values
-    df = preprocessor.handle_missing_values(df, strategy='mean')
+    # Rows without a target cannot be used for training
+    df = df.dropna(subset=[TARGET_COLUMN])
     
-    # Encode categorical variables
-    df = preprocessor.encode_categorical(df)
+    # Split first, so no statistic from the test rows leaks into preprocessing
+    X_train, X_test, y_train, y_test = preprocessor.split_data(df, TARGET_COLUMN)
     
-    # Scale features
-    df_scaled = preprocessor.scale_features(df, target_column=TARGET_COLUMN, scaler_type='standard')
+    # Large data gets the large-data model tier, whose Hist Gradient Boosting
+    # handles categorical codes natively (so they are left unscaled)
+    trainer = ModelTrainer(problem_type=PROBLEM_TYPE)
+    large_data = trainer.is_large_data(len(X_train))
     
-    # Split data
-    X_train, X_test, y_train, y_test = preprocessor.split_data(df_scaled, TARGET_COLUMN)
+    # Imputation, encoding and scaling fitted on the training split in one pass
+    pipeline = PreprocessingPipeline(strategy='mean', scaler_type='standard', scale_categoricals=not large_data)
+    X_train = pipeline.fit_transform(X_train)
+    X_test = pipeline.transform(X_test)
     
-    # Save preprocessor
-    preprocessor.save_preprocessor('models/preprocessor.pkl')
+    # Save preprocessing pipeline (Predictor applies it as-is)
+    pipeline.save('models/preprocessor.pkl')
     
     # Step 2: Model Training
     print("\n🤖 STEP 2: Model Training")
-    trainer = ModelTrainer(problem_type=PROBLEM_TYPE)
+    if large_data:
+        trainer.categorical_features = pipeline.categorical_mask(max_categories=HIST_MAX_CATEGORIES)
     
     # Train all models
     best_model, best_model_name, history = trainer.train_all_models(X_train, y_train, X_test, y_test)
@@ -56,6 +63,12 @@ def main():
     # Save best model
     trainer.save_model(tuned_model, 'models/best_model.pkl')
     
+    # Publish as a new registry version; an API started with MODEL_REGISTRY=models/registry
+    # switches to it without a restart
+    ModelRegistry('models/registry').publish(
+        tuned_model, pipeline,
+        metadata={'model_name': best_model_name, 'params': best_params, 'metrics': history.get(best_model_name)})
+    
     # Step 3: Model Evaluation
     print("\n📈 STEP 3: Model Evaluation")
     evaluator = ModelEvaluator(tuned_model, X_test, y_test, problem_type=PROBLEM_TYPE)
@@ -74,7 +87,7 @@ def main():
         evaluator.plot_residuals()
     
     # Plot feature importance
-    feature_names = X_train.columns.tolist()
+    feature_names = pipeline.feature_columns
     evaluator.plot_feature_importance(feature_names)
     
     # Step 4: Make Predictions
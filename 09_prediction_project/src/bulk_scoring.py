@@ -0,0 +1,73 @@
+import json
+import numpy as np
+import pandas as pd
+
+CSV_TYPES = ('text/csv', 'application/csv')
+ARROW_STREAM_TYPES = ('application/vnd.apache.arrow.stream',)
+ARROW_FILE_TYPES = ('application/vnd.apache.arrow.file',)
+PARQUET_TYPES = ('application/vnd.apache.parquet', 'application/x-parquet', 'application/parquet')
+JSON_TYPES = ('application/json',)
+SUPPORTED_TYPES = CSV_TYPES + ARROW_STREAM_TYPES + ARROW_FILE_TYPES + PARQUET_TYPES + JSON_TYPES
+
+def media_type(content_type):
+    """'text/csv; charset=utf-8' -> 'text/csv'"""
+    return (content_type or '').split(';')[0].strip().lower()
+
+def iter_frames(path, content_type, chunk_rows=50_000):
+    """Yield the input file at ``path`` as DataFrames of at most ``chunk_rows`` rows
+
+    CSV, Arrow IPC (stream or file) and Parquet are read incrementally, so memory
+    depends on ``chunk_rows`` and not on the file size. Column-oriented JSON
+    (``{"column": [values, ...], ...}``) has to be parsed whole and is then scored
+    in chunks.
+    """
+    content_type = media_type(content_type)
+    if content_type in CSV_TYPES:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+    elif content_type in ARROW_STREAM_TYPES + ARROW_FILE_TYPES:
+        import pyarrow as pa
+        
+        with pa.memory_map(path) as source:
+            if content_type in ARROW_STREAM_TYPES:
+                batches = pa.ipc.open_stream(source)
+            else:
+                reader = pa.ipc.open_file(source)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            for batch in batches:
+                # A writer's batches can be any size; re-slice them to chunk_rows
+                for offset in range(0, batch.num_rows, chunk_rows):
+                    yield batch.slice(offset, chunk_rows).to_pandas()
+    elif content_type in PARQUET_TYPES:
+        import pyarrow.parquet as pq
+        
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    elif content_type in JSON_TYPES:
+        with open(path, encoding='utf-8') as f:
+            body = json.load(f)
+        columns = body.get('columns', body) if isinstance(body, dict) else None
+        if not isinstance(columns, dict):
+            raise ValueError('JSON input must be column-oriented: {"column": [values, ...], ...}')
+        df = pd.DataFrame(columns)
+        del body, columns
+        for offset in range(0, len(df), chunk_rows):
+            yield df.iloc[offset:offset + chunk_rows]
+    else:
+        raise ValueError(f"Unsupported content type {content_type!r}")
+
+def predictions_csv(frame, predictions, id_column=None):
+    """CSV lines (no header) for one scored frame; works for numbers and class labels alike"""
+    columns = {id_column: frame[id_column].to_numpy()} if id_column else {}
+    columns['prediction'] = np.asarray(predictions)
+    return pd.DataFrame(columns).to_csv(index=False, header=False, float_format='%.10g')
+
+def score_frames(predict_fn, frames, id_column=None, scored_first=None):
+    """Yield CSV text: a header, then one line per input row with its prediction
+    
+    ``scored_first`` is an already scored ``(frame, predictions)`` to emit first.
+    """
+    yield f"{id_column},prediction\n" if id_column else "prediction\n"
+    if scored_first is not None:
+        yield predictions_csv(*scored_first, id_column)
+    for frame in frames:
+        yield predictions_csv(frame, predict_fn(frame), id_column)
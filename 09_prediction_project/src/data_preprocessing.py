@@ -4,25 +4,118 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder, MinMaxScaler
 import joblib
 import os
+import hashlib
+import sys
+import time
+
+# Multiplier per price_unit value; prices with any other unit are taken as rupees
+PRICE_UNIT_MULTIPLIERS = {'Cr': 10_000_000, 'L': 100_000}
+MUMBAI_CATEGORICAL_COLUMNS = ['bhk', 'type', 'locality', 'region', 'status', 'age']
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
 
 class DataPreprocessor:
     def __init__(self):
         self.scaler = None
         self.label_encoders = {}
+        self.category_vocabularies = {}
         self.feature_columns = None
+        self.load_stats = None
         
-    def load_data(self, file_path):
-        """Load data from CSV or Excel"""
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        elif file_path.endswith('.xlsx'):
-            df = pd.read_excel(file_path)
-        else:
+    def load_data(self, file_path, optimize_dtypes=False, chunksize=500_000, sample_rows=100_000,
+                  cache_dir=None):
+        """Load data from CSV or Excel
+
+        With ``optimize_dtypes=True`` column types are inferred from the first
+        ``sample_rows`` rows (category, int32, float32, bool) and a CSV is read
+        ``chunksize`` rows at a time, so only one chunk is ever held with default dtypes.
+        With ``cache_dir`` the loaded frame is also kept there as Parquet, keyed by the
+        source file's hash and these load options, and later loads of the unchanged
+        file with the same options read that instead.
+        Timing and peak RSS of the load are kept in ``self.load_stats``.
+        """
+        if not file_path.endswith(('.csv', '.xlsx')):
             raise ValueError("Unsupported file format")
+        start = time.perf_counter()
+        source = 'file'
+        
+        load_options = {'optimize_dtypes': optimize_dtypes, 'chunksize': chunksize, 'sample_rows': sample_rows}
+        cache_path = self._cache_path(file_path, cache_dir, load_options) if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            df = pd.read_parquet(cache_path)
+            source = 'parquet cache'
+        elif file_path.endswith('.csv'):
+            if optimize_dtypes:
+                df = self._read_csv_chunked(file_path, self.infer_dtypes(file_path, sample_rows), chunksize)
+            else:
+                df = pd.read_csv(file_path)
+        else:
+            df = pd.read_excel(file_path)
+            if optimize_dtypes:
+                # Excel cannot be read in chunks; compact the types after the fact
+                df = compact_dtypes(df, infer_dtypes_from_sample(df.head(sample_rows)))
         
+        if cache_path and source == 'file':
+            self._write_cache(df, cache_path)
+        
+        self.load_stats = {
+            'source': source,
+            'seconds': round(time.perf_counter() - start, 3),
+            'memory_mb': round(df.memory_usage(deep=True).sum() / 2**20, 1),
+            'peak_rss_mb': peak_rss_mb()
+        }
         print(f"Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+        print(f"Loaded from {source} in {self.load_stats['seconds']:.2f}s, "
+              f"{self.load_stats['memory_mb']} MiB in memory, peak RSS {self.load_stats['peak_rss_mb']} MiB")
         return df
     
+    def infer_dtypes(self, file_path, sample_rows=100_000):
+        """Compact dtypes for a CSV's columns, judged from its first ``sample_rows`` rows"""
+        return infer_dtypes_from_sample(pd.read_csv(file_path, nrows=sample_rows))
+    
+    def _read_csv_chunked(self, file_path, dtypes, chunksize):
+        categorical = [column for column, dtype in dtypes.items() if dtype == 'category']
+        parts = []
+        # Category columns are parsed straight into categoricals; the rest are
+        # narrowed per chunk, where a value outside the sample's range can still widen them
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, dtype={column: 'category' for column in categorical}):
+            parts.append(compact_dtypes(chunk, dtypes))
+        if not parts:
+            return pd.read_csv(file_path)
+        
+        columns = parts[0].columns
+        # Chunks have different category sets; concatenating them as-is would fall back to object
+        combined = {column: pd.api.types.union_categoricals([part[column] for part in parts], sort_categories=True)
+                    for column in categorical}
+        df = pd.concat([part.drop(columns=categorical) for part in parts], ignore_index=True)
+        del parts
+        for column in categorical:
+            df[column] = combined.pop(column)
+        return df[columns]
+    
+    def _cache_path(self, file_path, cache_dir, load_options):
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        # The options decide the dtypes, so a cache is only reused with the same ones
+        if not load_options['optimize_dtypes']:
+            load_options = {'optimize_dtypes': False}
+        digest.update(repr(sorted(load_options.items())).encode())
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        return os.path.join(cache_dir, f"{stem}_{digest.hexdigest()[:16]}.parquet")
+    
+    def _write_cache(self, df, cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        try:
+            # Write beside the target and rename, so a crash never leaves a truncated cache
+            df.to_parquet(cache_path + '.tmp', index=False)
+        except ImportError as e:
+            print(f"Parquet cache skipped ({e})")
+            return
+        os.replace(cache_path + '.tmp', cache_path)
+        print(f"Cached a Parquet copy at {cache_path}")
+    
     def explore_data(self, df):
         """Basic data exploration"""
         print("\n=== DATA INFO ===")
@@ -49,16 +142,17 @@ class DataPreprocessor:
         
         for column in df_clean.columns:
             if df_clean[column].isnull().sum() > 0:
-                if df_clean[column].dtype in ['int64', 'float64']:
+                column_dtype = df_clean[column].dtype
+                if pd.api.types.is_numeric_dtype(column_dtype) and not pd.api.types.is_bool_dtype(column_dtype):
                     if strategy == 'mean':
-                        df_clean[column].fillna(df_clean[column].mean(), inplace=True)
+                        df_clean[column] = df_clean[column].fillna(df_clean[column].mean())
                     elif strategy == 'median':
-                        df_clean[column].fillna(df_clean[column].median(), inplace=True)
+                        df_clean[column] = df_clean[column].fillna(df_clean[column].median())
                     elif strategy == 'mode':
-                        df_clean[column].fillna(df_clean[column].mode()[0], inplace=True)
+                        df_clean[column] = df_clean[column].fillna(df_clean[column].mode()[0])
                 else:
                     # For categorical data, fill with mode
-                    df_clean[column].fillna(df_clean[column].mode()[0], inplace=True)
+                    df_clean[column] = df_clean[column].fillna(df_clean[column].mode()[0])
         
         print(f"Missing values handled using {strategy} strategy")
         return df_clean
@@ -68,7 +162,8 @@ class DataPreprocessor:
         df_encoded = df.copy()
         
         for column in df_encoded.columns:
-            if df_encoded[column].dtype == 'object':
+            # object, string and category columns
+            if not pd.api.types.is_numeric_dtype(df_encoded[column].dtype):
                 le = LabelEncoder()
                 df_encoded[column] = le.fit_transform(df_encoded[column].astype(str))
                 self.label_encoders[column] = le
@@ -117,7 +212,8 @@ class DataPreprocessor:
         """Save preprocessor objects"""
         preprocessor_objects = {
             'scaler': self.scaler,
-            'label_encoders': self.label_encoders
+            'label_encoders': self.label_encoders,
+            'category_vocabularies': self.category_vocabularies
         }
         joblib.dump(preprocessor_objects, path)
         print(f"Preprocessor saved to {path}")
@@ -127,27 +223,107 @@ class DataPreprocessor:
         preprocessor_objects = joblib.load(path)
         self.scaler = preprocessor_objects['scaler']
         self.label_encoders = preprocessor_objects['label_encoders']
+        self.category_vocabularies = preprocessor_objects.get('category_vocabularies', {})
         print(f"Preprocessor loaded from {path}")
 
-    def prepare_mumbai_data(self, df):
-        """Special handling for Mumbai house prices"""
-        
-        # Convert price from Crores to actual numbers
-        df['price'] = df.apply(lambda row: 
-            float(row['price']) * 10000000 if row['price_unit'] == 'Cr' 
-            else float(row['price']), axis=1)
+    def prepare_mumbai_data(self, df, fit=True):
+        """Special handling for Mumbai house prices
+
+        Works column-wise and modifies ``df`` in place (it is also returned).
+        With ``fit=True`` the category vocabularies are learned from ``df`` and kept
+        (and saved by save_preprocessor); with ``fit=False`` the stored ones are reused,
+        so a category gets the same code in every frame and unseen values become -1.
+        """
+        # Price units as a lookup array: unit code -> multiplier, unknown/raw (-1) -> 1
+        if 'price_unit' in df.columns:
+            unit_codes = encode_with_vocabulary(df['price_unit'], list(PRICE_UNIT_MULTIPLIERS))
+            multipliers = np.append(np.fromiter(PRICE_UNIT_MULTIPLIERS.values(), dtype=np.float64), 1.0)
+            prices = pd.to_numeric(df['price'], errors='coerce').to_numpy(dtype=np.float64)
+            df['price'] = prices * multipliers[unit_codes]
+            # We already used this
+            del df['price_unit']
         
         # Convert area to float (remove any commas or symbols)
         df['area'] = pd.to_numeric(df['area'], errors='coerce')
         
         # Handle categorical columns
-        categorical_cols = ['bhk', 'type', 'locality', 'region', 'status', 'age']
+        categorical_cols = [col for col in MUMBAI_CATEGORICAL_COLUMNS if col in df.columns]
+        if fit:
+            for col in categorical_cols:
+                # Sorted, as astype('category') orders them, so the codes are unchanged
+                self.category_vocabularies[col] = sorted(pd.unique(df[col].dropna()))
+        missing = [col for col in categorical_cols if col not in self.category_vocabularies]
+        if missing:
+            raise ValueError(f"No category vocabulary for {missing}; call with fit=True first")
         for col in categorical_cols:
-            if col in df.columns:
-                # Convert to category codes
-                df[col] = df[col].astype('category').cat.codes
+            # Convert to category codes
+            df[col] = encode_with_vocabulary(df[col], self.category_vocabularies[col])
         
-        # Drop unnecessary columns
-        df = df.drop(['price_unit'], axis=1)  # We already used this
-        
-        return df
\ No newline at end of file
+        return df
+
+
+def encode_with_vocabulary(values, vocabulary):
+    """Codes of ``values`` by position in ``vocabulary``; unknown values and NaN get -1
+
+    One hashing pass over the column: each distinct value is looked up once, then the
+    codes are gathered through a small mapping array.
+    """
+    codes, uniques = pd.factorize(values)
+    lookup = np.append(pd.Index(vocabulary).get_indexer(uniques), -1)
+    # Same compact integer width as Categorical codes
+    size = len(vocabulary)
+    dtype = np.int8 if size < 127 else np.int16 if size < 32767 else np.int32
+    return lookup.astype(dtype)[codes]
+
+
+def infer_dtypes_from_sample(sample, max_category_fraction=0.5):
+    """Map each column to the most compact dtype that holds the sample's values"""
+    dtypes = {}
+    for column in sample.columns:
+        series = sample[column]
+        if pd.api.types.is_bool_dtype(series):
+            dtypes[column] = 'bool'
+        elif pd.api.types.is_integer_dtype(series):
+            in_range = series.empty or (series.min() >= INT32_MIN and series.max() <= INT32_MAX)
+            dtypes[column] = 'int32' if in_range else 'int64'
+        elif pd.api.types.is_float_dtype(series):
+            dtypes[column] = 'float32'
+        elif series.nunique() <= max_category_fraction * len(series):
+            # Repeated strings (locality, type, ...) are stored once per distinct value
+            dtypes[column] = 'category'
+        else:
+            dtypes[column] = 'object'
+    return dtypes
+
+
+def compact_dtypes(df, dtypes):
+    """Cast ``df``'s columns to ``dtypes`` where the values allow it, leaving the rest as read"""
+    casts = {}
+    for column, dtype in dtypes.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        series = df[column]
+        if dtype == 'int32':
+            if pd.api.types.is_integer_dtype(series) and (series.empty or (
+                    series.min() >= INT32_MIN and series.max() <= INT32_MAX)):
+                casts[column] = 'int32'
+            elif pd.api.types.is_float_dtype(series):
+                # Missing values turned this chunk's integers into floats
+                casts[column] = 'float32'
+        elif dtype == 'float32':
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                casts[column] = 'float32'
+        elif dtype == 'category':
+            casts[column] = 'category'
+    return df.astype(casts, copy=False) if casts else df
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MiB (None where ``resource`` is unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB on Linux
+    return round(peak / 2**20 if sys.platform == 'darwin' else peak / 1024, 1)
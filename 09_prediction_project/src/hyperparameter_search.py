@@ -0,0 +1,123 @@
+import math
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import KFold, StratifiedKFold, ParameterGrid, ParameterSampler
+
+class SuccessiveHalvingSearch:
+    """Random search with successive halving
+
+    All ``n_candidates`` settings are first cross-validated with a small budget;
+    only the best 1/``eta`` go on to a budget ``eta`` times larger, until the
+    survivors get the full budget. The budget (``resource``) is either the number
+    of training rows ('n_samples': nested prefixes of one shuffled row order) or
+    an estimator parameter such as 'n_estimators', raised up to ``max_resources``
+    on all rows. CV folds are computed once per row count and shared by every
+    candidate. Fits within a rung run in parallel (``n_jobs``). Once
+    ``time_budget`` seconds have passed no new rung is started and the best
+    setting of the last completed rung wins.
+    """
+    
+    def __init__(self, estimator, param_space, scoring, n_candidates=32, eta=3, cv=5, resource='n_samples',
+                 min_resources=None, max_resources=None, n_jobs=-1, time_budget=None, classification=False,
+                 random_state=42):
+        self.estimator = estimator
+        self.param_space = param_space
+        self.scoring = scoring
+        self.n_candidates = n_candidates
+        self.eta = eta
+        self.cv = cv
+        self.resource = resource
+        self.min_resources = min_resources
+        self.max_resources = max_resources
+        self.n_jobs = n_jobs
+        self.time_budget = time_budget
+        self.classification = classification
+        self.random_state = random_state
+        self.best_params_ = None
+        self.best_score_ = None
+        self.best_estimator_ = None
+        # One entry per rung: resource amount, candidates, best score, elapsed seconds
+        self.history_ = []
+    
+    def _candidates(self):
+        space_is_grid = all(isinstance(values, list) for values in self.param_space.values())
+        if space_is_grid and len(ParameterGrid(self.param_space)) <= self.n_candidates:
+            return list(ParameterGrid(self.param_space))
+        return list(ParameterSampler(self.param_space, self.n_candidates, random_state=self.random_state))
+    
+    def _rung_sizes(self, maximum, n_candidates, floor):
+        n_rungs = 1 + int(math.floor(math.log(max(n_candidates, 1), self.eta)))
+        smallest = min(maximum, max(floor, maximum // self.eta ** (n_rungs - 1)))
+        sizes = [min(maximum, smallest * self.eta ** rung) for rung in range(n_rungs - 1)] + [maximum]
+        # With a small maximum several rungs collapse into it; keep one of them
+        return sorted(set(sizes))
+    
+    def _folds(self, X, y, rows):
+        if self.classification:
+            splitter = StratifiedKFold(self.cv, shuffle=False)
+        else:
+            splitter = KFold(self.cv, shuffle=False)
+        return [(rows[train], rows[test]) for train, test in splitter.split(X[rows], y[rows])]
+    
+    def fit(self, X, y):
+        X, y = np.asarray(X), np.asarray(y)
+        start = time.perf_counter()
+        scorer = get_scorer(self.scoring)
+        order = np.random.default_rng(self.random_state).permutation(len(X))
+        candidates = self._candidates()
+        self.history_ = []
+        
+        if self.resource == 'n_samples':
+            # Enough rows that every CV fold still has a handful of test samples
+            sizes = self._rung_sizes(len(X), len(candidates), self.min_resources or max(20 * self.cv, 100))
+        else:
+            sizes = self._rung_sizes(self.max_resources, len(candidates), self.min_resources or 1)
+            all_folds = self._folds(X, y, np.arange(len(X)))
+
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            for size in sizes:
+                if len(candidates) == 1 and self.history_:
+                    break
+                if self.time_budget and self.history_ and time.perf_counter() - start > self.time_budget:
+                    print(f"Time budget of {self.time_budget}s reached; keeping the best with "
+                          f"{self.history_[-1]['amount']} {self.resource}")
+                    break
+                if self.resource == 'n_samples':
+                    folds, budget = self._folds(X, y, np.sort(order[:size])), {}
+                else:
+                    folds, budget = all_folds, {self.resource: size}
+                scores = parallel(
+                    delayed(_fit_and_score)(self.estimator, {**params, **budget}, X, y, train, test, scorer)
+                    for params in candidates for train, test in folds)
+                mean_scores = np.asarray(scores, dtype=np.float64).reshape(len(candidates), len(folds)).mean(axis=1)
+                ranking = np.argsort(-np.nan_to_num(mean_scores, nan=-np.inf), kind='stable')
+
+                self.best_params_ = candidates[ranking[0]]
+                self.best_score_ = float(mean_scores[ranking[0]])
+                self.history_.append({'resource': self.resource, 'amount': size, 'candidates': len(candidates),
+                                      'best_score': self.best_score_, 'elapsed': time.perf_counter() - start})
+                print(f"  {size:>8} {self.resource:<12} {len(candidates):>3} candidates  "
+                      f"best CV {self.best_score_:.4f}  ({self.history_[-1]['elapsed']:.1f}s)")
+                candidates = [candidates[i] for i in ranking[:max(1, math.ceil(len(candidates) / self.eta))]]
+
+        if self.resource != 'n_samples':
+            # The final model always gets the full budget
+            self.best_params_ = {**self.best_params_, self.resource: self.max_resources}
+
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        return self
+    
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+
+def _fit_and_score(estimator, params, X, y, train, test, scorer):
+    try:
+        model = clone(estimator).set_params(**params).fit(X[train], y[train])
+        return scorer(model, X[test], y[test])
+    except Exception:
+        # A setting that cannot fit (e.g. invalid for this data) simply loses
+        return np.nan
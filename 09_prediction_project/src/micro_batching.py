@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into one vectorized predict call
+
+    Request threads call submit(record) and block on the result. One worker thread
+    takes the first waiting record, keeps collecting until ``max_batch_size``
+    records or ``max_wait_ms`` have passed, runs ``predict_fn`` once on the whole
+    list and hands each caller its own prediction. Collection also stops as soon as
+    every request in flight is in the batch, so a lone request is not held back;
+    under load, batches fill up and the per-call model overhead is paid once per
+    batch instead of once per request.
+    """
+    
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        # Requests submitted and not yet answered
+        self._in_flight = 0
+        self.batches = 0
+        self.rows = 0
+    
+    def start(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._worker.start()
+        return self
+    
+    def stop(self):
+        with self._lock:
+            if self._worker is not None:
+                self._queue.put(None)
+                self._worker.join()
+                self._worker = None
+    
+    def submit(self, record, timeout=None):
+        """Queue one record and wait for its prediction"""
+        if self._worker is None:
+            self.start()
+        future = Future()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            self._queue.put((record, future))
+            return future.result(timeout)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+    
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': round(self.rows / self.batches, 2) if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000
+        }
+    
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        # Nobody else is waiting once the batch holds every request in flight
+        while len(batch) < min(self.max_batch_size, self._in_flight):
+            remaining = deadline - time.perf_counter()
+            try:
+                # Whatever is already queued is taken without waiting
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+    
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            records = [record for record, _ in batch]
+            try:
+                predictions = self.predict_fn(records)
+            except Exception:
+                # One bad record must not fail its neighbours: retry them one by one
+                for record, future in batch:
+                    try:
+                        future.set_result(self.predict_fn([record])[0])
+                    except Exception as e:
+                        future.set_exception(e)
+            else:
+                for (_, future), prediction in zip(batch, predictions):
+                    future.set_result(prediction)
+            self.batches += 1
+            self.rows += len(batch)
@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import joblib
+
+from src.prediction import Predictor
+
+MODEL_FILE = 'model.joblib'
+PREPROCESSOR_FILE = 'preprocessor.joblib'
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+
+class ModelRegistry:
+    """A directory of versioned model artifacts and a pointer to the one being served
+    
+    Layout::
+    
+        <root>/v0001/model.joblib         joblib.dump, uncompressed
+        <root>/v0001/preprocessor.joblib
+        <root>/v0001/manifest.json        version, created_at and the caller's metadata
+        <root>/CURRENT                    name of the active version
+    
+    Artifacts are written uncompressed so their NumPy arrays can be loaded with
+    ``mmap_mode='r'``: every worker process that loads the same version maps the
+    same file, and the OS page cache holds one copy. That covers linear models,
+    SVMs and HistGradientBoosting; sklearn copies the nodes of RandomForest and
+    GradientBoosting trees out of the file on load, so for those, load in a master
+    process and fork the workers (gunicorn --preload) to share them copy-on-write.
+    Versions are built in a staging directory and renamed into place, and CURRENT
+    is replaced atomically, so readers only ever see complete versions.
+    """
+    
+    def __init__(self, root='models/registry'):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+    
+    def versions(self):
+        """Published versions, oldest first"""
+        return sorted(name for name in os.listdir(self.root)
+                      if name.startswith('v') and os.path.exists(os.path.join(self.root, name, MANIFEST_FILE)))
+    
+    def publish(self, model, preprocessor, metadata=None, activate=True):
+        """Save a new version and (by default) make it the current one; returns its name"""
+        while True:
+            versions = self.versions()
+            version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+            staging = os.path.join(self.root, f".staging-{version}-{os.getpid()}")
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            joblib.dump(model, os.path.join(staging, MODEL_FILE))
+            joblib.dump(preprocessor, os.path.join(staging, PREPROCESSOR_FILE))
+            manifest = {'version': version, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'model_type': type(model).__name__, **(metadata or {})}
+            with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2, default=str)
+            try:
+                # Fails if another publisher took this version name first
+                os.rename(staging, os.path.join(self.root, version))
+                break
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)
+        print(f"Published model version {version} to {self.root}")
+        if activate:
+            self.activate(version)
+        return version
+    
+    def activate(self, version):
+        """Point CURRENT at ``version``; servers pick it up without a restart"""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version: {version}")
+        pointer = os.path.join(self.root, CURRENT_FILE)
+        staging = f"{pointer}.{os.getpid()}.tmp"
+        with open(staging, 'w') as f:
+            f.write(version)
+        os.replace(staging, pointer)
+        print(f"Model version {version} is now current")
+    
+    def current_version(self):
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def manifest(self, version):
+        with open(os.path.join(self.root, version, MANIFEST_FILE)) as f:
+            return json.load(f)
+    
+    def load_predictor(self, version=None, mmap_mode='r'):
+        """A Predictor for ``version`` (default: the current one), arrays memory-mapped"""
+        version = version or self.current_version()
+        if version is None:
+            raise ValueError(f"No current model version in {self.root}")
+        directory = os.path.join(self.root, version)
+        predictor = Predictor(model_path=os.path.join(directory, MODEL_FILE),
+                              preprocessor_path=os.path.join(directory, PREPROCESSOR_FILE),
+                              mmap_mode=mmap_mode)
+        predictor.version = version
+        return predictor
+
+class LivePredictor:
+    """Serves the registry's current version and follows CURRENT without a restart
+    
+    get() returns the active Predictor. At most every ``check_interval`` seconds it
+    also compares CURRENT with the served version; on a change the new version is
+    loaded on a background thread while requests keep being answered by the old
+    one, then swapped in with a single reference assignment. A request keeps the
+    Predictor it got for its whole lifetime, so none is dropped or sees a mix of
+    versions. Each worker process follows CURRENT on its own.
+    """
+    
+    def __init__(self, registry, check_interval=2.0, mmap_mode='r'):
+        self.registry = registry
+        self.check_interval = check_interval
+        self.mmap_mode = mmap_mode
+        self._lock = threading.Lock()
+        self._loading = None
+        self._next_check = 0.0
+        self.predictor = registry.load_predictor(mmap_mode=mmap_mode)
+    
+    @property
+    def version(self):
+        return self.predictor.version
+    
+    def get(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            version = self.registry.current_version()
+            if version and version != self.predictor.version:
+                self._load_in_background(version)
+        return self.predictor
+    
+    def reload(self, version=None):
+        """Load ``version`` (default: current) now and swap it in; returns the version served"""
+        predictor = self.registry.load_predictor(version, mmap_mode=self.mmap_mode)
+        with self._lock:
+            self.predictor = predictor
+        print(f"Now serving model version {predictor.version}")
+        return predictor.version
+    
+    def _load_in_background(self, version):
+        with self._lock:
+            if self._loading is not None and self._loading.is_alive():
+                return
+            self._loading = threading.Thread(target=self._swap, args=(version,), name='model-reload', daemon=True)
+            self._loading.start()
+    
+    def _swap(self, version):
+        try:
+            self.reload(version)
+        except Exception as e:
+            # Keep serving the old version; the next check retries
+            print(f"Could not load model version {version}: {e}")
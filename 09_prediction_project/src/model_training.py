@@ -1,152 +1,349 @@
 import numpy as np
-import pandas as pd
 from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier, GradientBoostingRegressor
+from sklearn.ensemble import (RandomForestRegressor, RandomForestClassifier, GradientBoostingRegressor,
+                              HistGradientBoostingRegressor, HistGradientBoostingClassifier)
 from sklearn.svm import SVR, SVC
+from sklearn.base import BaseEstimator, clone
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score, accuracy_score, precision_score, recall_score, f1_score
 import joblib
 import os
+import multiprocessing
+import shutil
+import tempfile
+import time
+from multiprocessing.connection import wait
+
+from scipy.stats import loguniform
+
+from src.data_preprocessing import peak_rss_mb
+from src.hyperparameter_search import SuccessiveHalvingSearch
+
+# Train-set metrics are computed on at most this many rows; predicting the whole
+# training set again is as slow as the test prediction times the split ratio
+TRAIN_SCORE_MAX_ROWS = 20_000
+# Tree count that tuning works up to for ensembles (their search budget)
+MAX_ESTIMATORS = 300
+# From this many training rows on, get_models switches to the large-data tier
+LARGE_DATA_ROWS = 50_000
+# Kernel methods (SVR/SVC) are roughly quadratic in rows; past this they are fitted on a sample
+KERNEL_MAX_ROWS = 20_000
+# Rows each tree of a large-data forest is grown on (bounds its size and fit time)
+FOREST_MAX_SAMPLES = 100_000
+# HistGradientBoosting bins categories into at most this many values
+HIST_MAX_CATEGORIES = 255
 
 class ModelTrainer:
-    def __init__(self, problem_type='regression'):
+    def __init__(self, problem_type='regression', large_data_rows=LARGE_DATA_ROWS, categorical_features=None):
         """
         problem_type: 'regression' or 'classification'
+        large_data_rows: training rows from which the large-data model tier is used
+        categorical_features: boolean mask of integer-coded categorical columns, for
+            native categorical support in Hist Gradient Boosting
+            (see PreprocessingPipeline.categorical_mask)
         """
         self.problem_type = problem_type
+        self.large_data_rows = large_data_rows
+        self.categorical_features = categorical_features
         self.model = None
         self.best_model = None
         self.training_history = {}
         
-    def get_models(self):
-        """Get available models based on problem type"""
+    def get_models(self, n_rows=None):
+        """Get available models based on problem type (and, given ``n_rows``, data size)"""
+        return {name: factory() for name, factory in self._model_factories(n_rows).items()}
+    
+    def get_model(self, model_name, n_rows=None):
+        """A fresh instance of one available model"""
+        factories = self._model_factories(n_rows)
+        if model_name not in factories:
+            raise ValueError(f"Model {model_name} not available")
+        return factories[model_name]()
+    
+    def is_large_data(self, n_rows):
+        return n_rows is not None and n_rows >= self.large_data_rows
+    
+    def _model_factories(self, n_rows=None):
+        hist_options = dict(early_stopping=True, max_iter=500, n_iter_no_change=10, random_state=42,
+                            categorical_features=self.categorical_features)
+        if self.is_large_data(n_rows):
+            # Large-data tier: histogram boosting instead of exact boosting, forests grown on
+            # bounded samples and kernel methods fitted on a sample of KERNEL_MAX_ROWS rows
+            # A fraction rather than a row count, so it also fits the smaller CV folds of tuning
+            max_samples = FOREST_MAX_SAMPLES / n_rows if n_rows > FOREST_MAX_SAMPLES else None
+            forest_options = dict(n_estimators=100, max_samples=max_samples, random_state=42)
+            if self.problem_type == 'regression':
+                return {
+                    'Linear Regression': lambda: LinearRegression(),
+                    'Hist Gradient Boosting': lambda: HistGradientBoostingRegressor(**hist_options),
+                    'Random Forest': lambda: RandomForestRegressor(**forest_options),
+                    'SVR': lambda: RowSubsample(make_pipeline(StandardScaler(), SVR(kernel='rbf')), KERNEL_MAX_ROWS)
+                }
+            else:  # classification
+                return {
+                    'Logistic Regression': lambda: LogisticRegression(random_state=42),
+                    'Hist Gradient Boosting': lambda: HistGradientBoostingClassifier(**hist_options),
+                    'Random Forest': lambda: RandomForestClassifier(**forest_options),
+                    'SVC': lambda: RowSubsample(make_pipeline(StandardScaler(), SVC(kernel='rbf', random_state=42)),
+                                                KERNEL_MAX_ROWS)
+                }
+        
         if self.problem_type == 'regression':
-            models = {
-                'Linear Regression': LinearRegression(),
-                'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42),
-                'Gradient Boosting': GradientBoostingRegressor(n_estimators=100, random_state=42),
-                'SVR': SVR(kernel='rbf')
+            return {
+                'Linear Regression': lambda: LinearRegression(),
+                'Random Forest': lambda: RandomForestRegressor(n_estimators=100, random_state=42),
+                'Gradient Boosting': lambda: GradientBoostingRegressor(n_estimators=100, random_state=42),
+                'Hist Gradient Boosting': lambda: HistGradientBoostingRegressor(**hist_options),
+                'SVR': lambda: SVR(kernel='rbf')
             }
         else:  # classification
-            models = {
-                'Logistic Regression': LogisticRegression(random_state=42),
-                'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42),
-                'SVC': SVC(kernel='rbf', random_state=42)
+            return {
+                'Logistic Regression': lambda: LogisticRegression(random_state=42),
+                'Random Forest': lambda: RandomForestClassifier(n_estimators=100, random_state=42),
+                'Hist Gradient Boosting': lambda: HistGradientBoostingClassifier(**hist_options),
+                'SVC': lambda: SVC(kernel='rbf', random_state=42)
             }
-        return models
+    
+    def check_complexity(self, model_name, model, n_rows):
+        """Warn (and return the warning) when ``model`` is expected to struggle with ``n_rows`` rows"""
+        estimator = model.steps[-1][1] if hasattr(model, 'steps') else model
+        message = None
+        if isinstance(estimator, (SVR, SVC)) and n_rows > KERNEL_MAX_ROWS:
+            message = (f"kernel fit time grows roughly quadratically with rows; {n_rows} rows "
+                       f"is past the {KERNEL_MAX_ROWS} rows it is practical for")
+        elif isinstance(estimator, GradientBoostingRegressor) and n_rows > self.large_data_rows:
+            message = (f"exact gradient boosting sorts all {n_rows} rows for every split; "
+                       f"Hist Gradient Boosting bins them once")
+        elif isinstance(estimator, (RandomForestRegressor, RandomForestClassifier)):
+            # A fully grown tree has about 2 * rows / min_samples_leaf nodes of roughly 100 bytes
+            rows_per_tree = estimator.max_samples or n_rows
+            if isinstance(rows_per_tree, float):
+                rows_per_tree = int(rows_per_tree * n_rows)
+            size_mb = estimator.n_estimators * 2 * rows_per_tree / estimator.min_samples_leaf * 100 / 2**20
+            if size_mb > 2048:
+                message = (f"{estimator.n_estimators} fully grown trees on {rows_per_tree} rows each "
+                           f"need about {size_mb:,.0f} MB")
+        if message:
+            print(f"⚠️  {model_name}: {message}")
+        return message
     
     def train_model(self, model_name, X_train, y_train, X_test, y_test):
         """Train a specific model"""
-        models = self.get_models()
-        
-        if model_name not in models:
-            raise ValueError(f"Model {model_name} not available")
-        
-        model = models[model_name]
+        model = self.get_model(model_name, len(X_train))
+        self.check_complexity(model_name, model, len(X_train))
         
         # Train the model
         model.fit(X_train, y_train)
         
+        metrics = self.evaluate(model, X_train, y_train, X_test, y_test)
+        self.training_history[model_name] = metrics
+        print(f"\n=== {model_name} Results ===")
+        for key, value in metrics.items():
+            print(f"{key}: {value:.4f}")
+        
+        return model, metrics
+    
+    def evaluate(self, model, X_train, y_train, X_test, y_test):
+        """Train (on a sample of at most TRAIN_SCORE_MAX_ROWS rows) and test metrics"""
+        X_train_sample, y_train_sample = sample_rows(X_train, y_train, TRAIN_SCORE_MAX_ROWS)
+        
         # Make predictions
-        y_pred_train = model.predict(X_train)
+        y_pred_train = model.predict(X_train_sample)
         y_pred_test = model.predict(X_test)
         
         # Evaluate
         if self.problem_type == 'regression':
-            train_score = r2_score(y_train, y_pred_train)
+            train_score = r2_score(y_train_sample, y_pred_train)
             test_score = r2_score(y_test, y_pred_test)
-            train_rmse = np.sqrt(mean_squared_error(y_train, y_pred_train))
+            train_rmse = np.sqrt(mean_squared_error(y_train_sample, y_pred_train))
             test_rmse = np.sqrt(mean_squared_error(y_test, y_pred_test))
             
-            metrics = {
+            return {
                 'train_r2': train_score,
                 'test_r2': test_score,
                 'train_rmse': train_rmse,
                 'test_rmse': test_rmse
             }
         else:  # classification
-            train_accuracy = accuracy_score(y_train, y_pred_train)
+            train_accuracy = accuracy_score(y_train_sample, y_pred_train)
             test_accuracy = accuracy_score(y_test, y_pred_test)
             precision = precision_score(y_test, y_pred_test, average='weighted')
             recall = recall_score(y_test, y_pred_test, average='weighted')
             f1 = f1_score(y_test, y_pred_test, average='weighted')
             
-            metrics = {
+            return {
                 'train_accuracy': train_accuracy,
                 'test_accuracy': test_accuracy,
                 'precision': precision,
                 'recall': recall,
                 'f1_score': f1
             }
+    
+    def score_key(self):
+        return 'test_r2' if self.problem_type == 'regression' else 'test_accuracy'
+    
+    def train_all_models(self, X_train, y_train, X_test, y_test, n_jobs=-1, time_budget=None,
+                         memory_budget_mb=None):
+        """Train all available models and find the best one
         
-        self.training_history[model_name] = metrics
-        print(f"\n=== {model_name} Results ===")
-        for key, value in metrics.items():
-            print(f"{key}: {value:.4f}")
+        With ``n_jobs`` other than 1 every candidate is trained in its own process,
+        up to ``n_jobs`` at a time (negative values count back from the core count
+        as in joblib; -1: one per core). The data is written once as .npy files
+        that each process memory-maps, so it is shared through the page cache
+        instead of being copied per process. A candidate is stopped after
+        ``time_budget`` seconds, and its address space is capped at
+        ``memory_budget_mb`` where the OS allows it. The outcome of every candidate
+        is kept in ``self.leaderboard``.
+        """
+        if n_jobs == 0:
+            raise ValueError("n_jobs must be a positive number of processes or negative (-1: one per core), not 0")
+        if self.is_large_data(len(X_train)):
+            print(f"{len(X_train)} training rows: using the large-data model tier")
+        model_names = list(self._model_factories(len(X_train)))
+        if n_jobs == 1:
+            results = self._train_sequentially(model_names, X_train, y_train, X_test, y_test)
+        else:
+            results = self._train_in_processes(model_names, X_train, y_train, X_test, y_test,
+                                               n_jobs, time_budget, memory_budget_mb)
         
-        return model, metrics
-    
-    def train_all_models(self, X_train, y_train, X_test, y_test):
-        """Train all available models and find the best one"""
-        models = self.get_models()
-        best_score = -np.inf
-        best_model_name = None
+        score_key = self.score_key()
+        self.leaderboard = sorted(
+            results, key=lambda result: result['metrics'][score_key] if result['status'] == 'ok' else -np.inf,
+            reverse=True)
+        print_leaderboard(self.leaderboard, score_key)
         
-        for model_name in models:
+        best = self.leaderboard[0] if self.leaderboard and self.leaderboard[0]['status'] == 'ok' else None
+        if best is None:
+            raise RuntimeError("No model finished training; see the leaderboard")
+        self.best_model = best.pop('model')
+        for result in self.leaderboard:
+            result.pop('model', None)
+        
+        print(f"\n✅ Best Model: {best['model_name']} with score: {best['metrics'][score_key]:.4f}")
+        return self.best_model, best['model_name'], self.training_history
+    
+    def _train_sequentially(self, model_names, X_train, y_train, X_test, y_test):
+        results = []
+        for model_name in model_names:
             print(f"\n--- Training {model_name} ---")
-            model, metrics = self.train_model(model_name, X_train, y_train, X_test, y_test)
-            
-            # Determine best model based on appropriate metric
-            if self.problem_type == 'regression':
-                current_score = metrics['test_r2']
-            else:
-                current_score = metrics['test_accuracy']
+            start = time.perf_counter()
+            try:
+                model, metrics = self.train_model(model_name, X_train, y_train, X_test, y_test)
+            except Exception as e:
+                results.append({'model_name': model_name, 'status': 'failed', 'error': f"{type(e).__name__}: {e}",
+                                'seconds': time.perf_counter() - start})
+                continue
+            results.append({'model_name': model_name, 'status': 'ok', 'metrics': metrics, 'model': model,
+                            'seconds': time.perf_counter() - start, 'peak_rss_mb': _peak_rss_mb()})
+        return results
+    
+    def _train_in_processes(self, model_names, X_train, y_train, X_test, y_test, n_jobs, time_budget,
+                            memory_budget_mb):
+        cores = os.cpu_count() or 1
+        # Negative values count back from the core count, as in joblib (-1: all cores)
+        if n_jobs is None or n_jobs < 0:
+            n_jobs = cores + 1 + (n_jobs or -1)
+        workers = max(1, min(len(model_names), n_jobs))
+        # Split the cores between workers so BLAS/OpenMP threads don't oversubscribe them
+        threads = max(1, cores // workers)
+        data_dir = tempfile.mkdtemp(prefix='train_all_models_')
+        context = multiprocessing.get_context('spawn')
+        try:
+            for name, data in (('X_train', X_train), ('y_train', y_train), ('X_test', X_test), ('y_test', y_test)):
+                np.save(os.path.join(data_dir, f'{name}.npy'), np.asarray(data))
             
-            if current_score > best_score:
-                best_score = current_score
-                best_model_name = model_name
-                self.best_model = model
-        
-        print(f"\n✅ Best Model: {best_model_name} with score: {best_score:.4f}")
-        return self.best_model, best_model_name, self.training_history
+            pending = list(enumerate(model_names))
+            running = {}
+            results = []
+            while pending or running:
+                while pending and len(running) < workers:
+                    index, model_name = pending.pop(0)
+                    receiver, sender = context.Pipe(duplex=False)
+                    process = context.Process(
+                        target=_train_candidate, name=f'train-{index}',
+                        args=(self._settings(), model_name, index, data_dir, memory_budget_mb, threads, sender))
+                    process.start()
+                    sender.close()
+                    print(f"\n--- Training {model_name} (pid {process.pid}) ---")
+                    running[receiver] = (model_name, process, time.perf_counter())
+                
+                now = time.perf_counter()
+                timeout = 1.0
+                if time_budget and running:
+                    timeout = max(0.0, min(timeout, min(start + time_budget - now for _, _, start in running.values())))
+                for receiver in wait(list(running), timeout=timeout):
+                    model_name, process, start = running.pop(receiver)
+                    try:
+                        result = receiver.recv()
+                    except EOFError:
+                        # Died without reporting, e.g. killed by the OS for memory
+                        result = {'status': 'failed', 'error': f"exited with code {process.exitcode}"}
+                    process.join()
+                    results.append(self._collect_result(model_name, result, time.perf_counter() - start))
+                
+                if time_budget:
+                    now = time.perf_counter()
+                    for receiver, (model_name, process, start) in list(running.items()):
+                        if now - start > time_budget:
+                            process.terminate()
+                            process.join()
+                            del running[receiver]
+                            results.append({'model_name': model_name, 'status': 'timeout', 'seconds': now - start,
+                                            'error': f"exceeded the {time_budget}s budget"})
+                            print(f"\n--- {model_name} stopped after {time_budget}s ---")
+            return results
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
     
-    def hyperparameter_tuning(self, X_train, y_train, X_test, y_test, model_name='Random Forest'):
-        """Simple hyperparameter tuning"""
-        from sklearn.model_selection import GridSearchCV
-        
-        if self.problem_type == 'regression':
-            if model_name == 'Random Forest':
-                param_grid = {
-                    'n_estimators': [50, 100, 200],
-                    'max_depth': [None, 10, 20, 30],
-                    'min_samples_split': [2, 5, 10]
-                }
-                base_model = RandomForestRegressor(random_state=42)
-            elif model_name == 'Gradient Boosting':
-                param_grid = {
-                    'n_estimators': [50, 100, 200],
-                    'learning_rate': [0.01, 0.1, 0.3],
-                    'max_depth': [3, 5, 7]
-                }
-                base_model = GradientBoostingRegressor(random_state=42)
-        else:  # classification
-            if model_name == 'Random Forest':
-                param_grid = {
-                    'n_estimators': [50, 100, 200],
-                    'max_depth': [None, 10, 20],
-                    'min_samples_split': [2, 5, 10]
-                }
-                base_model = RandomForestClassifier(random_state=42)
+    def _settings(self):
+        # What a child process needs to rebuild an equivalent trainer
+        return {'problem_type': self.problem_type, 'large_data_rows': self.large_data_rows,
+                'categorical_features': self.categorical_features}
+    
+    def _collect_result(self, model_name, result, seconds):
+        result = {'model_name': model_name, 'seconds': seconds, **result}
+        if result['status'] == 'ok':
+            result['model'] = joblib.load(result.pop('model_path'))
+            self.training_history[model_name] = result['metrics']
+            print(f"\n=== {model_name} Results ({seconds:.1f}s) ===")
+            for key, value in result['metrics'].items():
+                print(f"{key}: {value:.4f}")
+        else:
+            print(f"\n=== {model_name} {result['status']}: {result.get('error')} ===")
+        return result
+    
+    def hyperparameter_tuning(self, X_train, y_train, X_test, y_test, model_name='Random Forest',
+                              n_candidates=32, cv=5, n_jobs=-1, time_budget=None):
+        """Successive-halving search over the model's search space (see SuccessiveHalvingSearch)"""
+        spaces = self.search_spaces()
+        if model_name not in spaces:
+            raise ValueError(f"Model {model_name} not available")
         
-        # Perform grid search
-        grid_search = GridSearchCV(base_model, param_grid, cv=5, scoring='r2' if self.problem_type == 'regression' else 'accuracy')
-        grid_search.fit(X_train, y_train)
+        print(f"\n=== Tuning {model_name}: {n_candidates} candidates, {cv}-fold CV ===")
+        base_model = self.get_model(model_name, len(X_train))
+        space = spaces[model_name]
+        if isinstance(base_model, RowSubsample):
+            # Same space, addressed through the wrapper and its scaling pipeline
+            prefix = f"estimator__{base_model.estimator.steps[-1][0]}__"
+            space = {prefix + key: values for key, values in space.items()}
+        # Ensembles are cheapest to compare with fewer trees; everything else on fewer rows
+        resource = 'n_estimators' if 'n_estimators' in base_model.get_params() else 'n_samples'
+        search = SuccessiveHalvingSearch(
+            base_model, space,
+            scoring='r2' if self.problem_type == 'regression' else 'accuracy',
+            n_candidates=n_candidates, cv=cv, resource=resource,
+            max_resources=MAX_ESTIMATORS if resource == 'n_estimators' else None,
+            n_jobs=n_jobs, time_budget=time_budget, classification=self.problem_type != 'regression')
+        search.fit(X_train, y_train)
+        self.tuning_history = search.history_
         
         print(f"\n=== Best Parameters for {model_name} ===")
-        print(grid_search.best_params_)
-        print(f"Best Score: {grid_search.best_score_:.4f}")
+        print(search.best_params_)
+        print(f"Best Score: {search.best_score_:.4f}")
         
         # Evaluate on test set
-        y_pred = grid_search.predict(X_test)
+        y_pred = search.predict(X_test)
         if self.problem_type == 'regression':
             test_score = r2_score(y_test, y_pred)
             print(f"Test R2 Score: {test_score:.4f}")
@@ -154,7 +351,58 @@ class ModelTrainer:
             test_score = accuracy_score(y_test, y_pred)
             print(f"Test Accuracy: {test_score:.4f}")
         
-        return grid_search.best_estimator_, grid_search.best_params_
+        return search.best_estimator_, search.best_params_
+    
+    def search_spaces(self):
+        """Hyperparameter search space for every model in get_models
+        
+        Ensembles have no n_estimators here: tuning uses it as the halving budget.
+        """
+        if self.problem_type == 'regression':
+            return {
+                'Linear Regression': {'fit_intercept': [True, False], 'positive': [False, True]},
+                'Random Forest': {
+                    'max_depth': [None, 10, 20, 30],
+                    'min_samples_split': [2, 5, 10],
+                    'min_samples_leaf': [1, 2, 4],
+                    'max_features': [1.0, 'sqrt', 0.5]
+                },
+                'Gradient Boosting': {
+                    'learning_rate': loguniform(0.01, 0.3),
+                    'max_depth': [2, 3, 5, 7],
+                    'subsample': [0.6, 0.8, 1.0]
+                },
+                'Hist Gradient Boosting': {
+                    'learning_rate': loguniform(0.01, 0.3),
+                    'max_leaf_nodes': [15, 31, 63, 127],
+                    'min_samples_leaf': [10, 20, 50, 100],
+                    'l2_regularization': loguniform(1e-3, 10)
+                },
+                'SVR': {
+                    'C': loguniform(0.1, 100),
+                    'gamma': ['scale', 'auto', 0.01, 0.1, 1.0],
+                    'epsilon': [0.01, 0.1, 0.5]
+                }
+            }
+        else:  # classification
+            return {
+                'Logistic Regression': {'C': loguniform(1e-3, 100), 'max_iter': [1000]},
+                'Random Forest': {
+                    'max_depth': [None, 10, 20],
+                    'min_samples_split': [2, 5, 10],
+                    'max_features': ['sqrt', 0.5, 1.0]
+                },
+                'Hist Gradient Boosting': {
+                    'learning_rate': loguniform(0.01, 0.3),
+                    'max_leaf_nodes': [15, 31, 63, 127],
+                    'min_samples_leaf': [10, 20, 50, 100],
+                    'l2_regularization': loguniform(1e-3, 10)
+                },
+                'SVC': {
+                    'C': loguniform(0.1, 100),
+                    'gamma': ['scale', 'auto', 0.01, 0.1, 1.0]
+                }
+            }
     
     def save_model(self, model, path='models/best_model.pkl'):
         """Save trained model"""
@@ -165,4 +413,95 @@ class ModelTrainer:
         """Load trained model"""
         self.model = joblib.load(path)
         print(f"Model loaded from {path}")
-        return self.model
\ No newline at end of file
+        return self.model
+
+
+class RowSubsample(BaseEstimator):
+    """Fits ``estimator`` on at most ``max_rows`` randomly drawn rows; predicts as it does"""
+    
+    def __init__(self, estimator, max_rows=KERNEL_MAX_ROWS, random_state=42):
+        self.estimator = estimator
+        self.max_rows = max_rows
+        self.random_state = random_state
+    
+    def fit(self, X, y):
+        X_sample, y_sample = sample_rows(X, y, self.max_rows, self.random_state)
+        self.estimator_ = clone(self.estimator).fit(X_sample, y_sample)
+        return self
+    
+    def predict(self, X):
+        return self.estimator_.predict(X)
+
+
+def sample_rows(X, y, max_rows, seed=42):
+    """At most ``max_rows`` rows of ``X``/``y``, drawn without replacement"""
+    if len(X) <= max_rows:
+        return X, y
+    rows = np.sort(np.random.default_rng(seed).choice(len(X), max_rows, replace=False))
+    take = lambda data: data.iloc[rows] if hasattr(data, 'iloc') else data[rows]
+    return take(X), take(y)
+
+
+def print_leaderboard(leaderboard, score_key):
+    print("\n=== Leaderboard ===")
+    print(f"{'rank':<6}{'model':<26}{'status':<9}{score_key:>10}{'seconds':>10}{'peak MB':>10}")
+    for rank, result in enumerate(leaderboard, start=1):
+        score = f"{result['metrics'][score_key]:.4f}" if result['status'] == 'ok' else '-'
+        peak = result.get('peak_rss_mb')
+        print(f"{rank:<6}{result['model_name']:<26}{result['status']:<9}{score:>10}{result['seconds']:>10.1f}"
+              f"{peak if peak is not None else '-':>10}")
+
+
+def _peak_rss_mb():
+    """peak_rss_mb from VmHWM on Linux, which restarts at exec; ru_maxrss is inherited by spawned children"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def _load_array(path):
+    try:
+        return np.load(path, mmap_mode='r')
+    except ValueError:
+        # Object arrays (e.g. string class labels) cannot be memory-mapped
+        return np.load(path, allow_pickle=True)
+
+
+def _train_candidate(settings, model_name, index, data_dir, memory_budget_mb, threads, connection):
+    """Child process body of train_all_models: fit one model and report over ``connection``"""
+    try:
+        if memory_budget_mb:
+            try:
+                import resource
+                limit = int(memory_budget_mb * 2**20)
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+            except (ImportError, ValueError, OSError):
+                pass
+        from threadpoolctl import threadpool_limits
+        
+        data = {name: _load_array(os.path.join(data_dir, f'{name}.npy'))
+                for name in ('X_train', 'y_train', 'X_test', 'y_test')}
+        trainer = ModelTrainer(**settings)
+        with threadpool_limits(threads):
+            model = trainer.get_model(model_name, len(data['X_train']))
+            trainer.check_complexity(model_name, model, len(data['X_train']))
+            start = time.perf_counter()
+            model.fit(data['X_train'], data['y_train'])
+            fit_seconds = time.perf_counter() - start
+            metrics = trainer.evaluate(model, data['X_train'], data['y_train'], data['X_test'], data['y_test'])
+        model_path = os.path.join(data_dir, f'model_{index}.pkl')
+        joblib.dump(model, model_path)
+        connection.send({'status': 'ok', 'metrics': metrics, 'model_path': model_path,
+                         'fit_seconds': fit_seconds, 'peak_rss_mb': _peak_rss_mb()})
+    except MemoryError:
+        connection.send({'status': 'memory', 'error': f"exceeded the {memory_budget_mb} MB budget",
+                         'peak_rss_mb': _peak_rss_mb()})
+    except Exception as e:
+        connection.send({'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
@@ -1,11 +1,81 @@
 import pandas as pd
 import numpy as np
 import joblib
+import math
+import threading
+
+from src.preprocessing_pipeline import PreprocessingPipeline
+
+class RowVectorizer:
+    """Turns one input dict into a model-ready row without pandas
+
+    Compiled once from a fitted preprocessor: a fixed column order, a dict per
+    categorical column (value -> code), and scaling folded into one multiply-add
+    (``x * multiplier + offset``). Each thread reuses its own preallocated row.
+    """
+    
+    def __init__(self, columns, category_codes, fill_values, multiplier, offset):
+        self.columns = list(columns)
+        self.category_codes = category_codes
+        # Missing, invalid and unseen values take these (the training fill values/mode)
+        self.fill_values = fill_values
+        self.multiplier = np.asarray(multiplier, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self._plan = [(j, column, category_codes.get(column)) for j, column in enumerate(self.columns)]
+        self._local = threading.local()
+    
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        category_codes = {column: {value: code for code, value in enumerate(vocabulary)}
+                          for column, vocabulary in pipeline.vocabularies.items()}
+        multiplier = 1.0 / pipeline.scale
+        return cls(pipeline.feature_columns, category_codes, dict(pipeline.fill_values),
+                   multiplier, -pipeline.center * multiplier)
+    
+    def transform(self, record):
+        """Return a (1, n_features) row for ``record``; valid until this thread's next call"""
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(self.columns)), dtype=np.float64)
+        self._fill_row(row[0], record)
+        row *= self.multiplier
+        row += self.offset
+        return row
+    
+    def transform_many(self, records):
+        """Return a new (len(records), n_features) matrix"""
+        matrix = np.empty((len(records), len(self.columns)), dtype=np.float64)
+        for values, record in zip(matrix, records):
+            self._fill_row(values, record)
+        matrix *= self.multiplier
+        matrix += self.offset
+        return matrix
+    
+    def _fill_row(self, values, record):
+        for j, column, codes in self._plan:
+            value = record.get(column)
+            if codes is not None:
+                code = codes.get(value if isinstance(value, str) else str(value)) if value is not None else None
+                values[j] = self.fill_values[column] if code is None else code
+            else:
+                try:
+                    number = float(value)
+                except (TypeError, ValueError):
+                    number = math.nan
+                values[j] = self.fill_values[column] if math.isnan(number) else number
 
 class Predictor:
-    def __init__(self, model_path=None, preprocessor_path=None):
+    def __init__(self, model_path=None, preprocessor_path=None, mmap_mode=None):
+        """
+        mmap_mode: passed to joblib.load; 'r' maps the arrays of uncompressed
+            artifacts read-only instead of copying them into this process
+        """
         self.model = None
         self.preprocessor = None
+        self.row_vectorizer = None
+        self.mmap_mode = mmap_mode
+        # Registry version this predictor was loaded from (see ModelRegistry)
+        self.version = None
         
         if model_path:
             self.load_model(model_path)
@@ -14,14 +84,24 @@ class Predictor:
     
     def load_model(self, path):
         """Load trained model"""
-        self.model = joblib.load(path)
+        self.model = joblib.load(path, mmap_mode=self.mmap_mode)
         print(f"Model loaded from {path}")
     
     def load_preprocessor(self, path):
         """Load preprocessor objects"""
-        self.preprocessor = joblib.load(path)
+        self.preprocessor = joblib.load(path, mmap_mode=self.mmap_mode)
+        if isinstance(self.preprocessor, PreprocessingPipeline):
+            self.row_vectorizer = RowVectorizer.from_pipeline(self.preprocessor)
         print(f"Preprocessor loaded from {path}")
     
+    def get_feature_names(self):
+        """Input features the preprocessor expects, in order"""
+        if isinstance(self.preprocessor, PreprocessingPipeline):
+            return list(self.preprocessor.feature_columns)
+        if self.preprocessor and self.preprocessor.get('scaler') is not None:
+            return self.preprocessor['scaler'].feature_names_in_.tolist()
+        return None
+    
     def preprocess_input(self, input_data):
         """Preprocess single input or batch of inputs"""
         if isinstance(input_data, dict):
@@ -40,6 +120,10 @@ class Predictor:
             raise ValueError("Input format not supported")
         
         # Apply preprocessing
+        if isinstance(self.preprocessor, PreprocessingPipeline):
+            return self.preprocessor.transform(df)
+        
+        # Older artifacts: dict of label encoders and scaler saved by DataPreprocessor
         if self.preprocessor:
             # Apply label encoding if needed
             if 'label_encoders' in self.preprocessor:
@@ -59,6 +143,10 @@ class Predictor:
         if self.model is None:
             raise ValueError("Model not loaded")
         
+        # Fast path: dict straight to a NumPy row
+        if isinstance(input_data, dict) and self._can_vectorize():
+            return self.model.predict(self.row_vectorizer.transform(input_data))[0]
+        
         # Preprocess input
         processed_data = self.preprocess_input(input_data)
         
@@ -67,6 +155,18 @@ class Predictor:
         
         return prediction[0]
     
+    def predict_records(self, records):
+        """Predictions for a list of input dicts, through the NumPy path when possible"""
+        if self.model is None:
+            raise ValueError("Model not loaded")
+        if self._can_vectorize():
+            return self.model.predict(self.row_vectorizer.transform_many(records))
+        return self.predict_batch(records)
+    
+    def _can_vectorize(self):
+        # Models fitted on a DataFrame check feature names, so they keep the DataFrame path
+        return self.row_vectorizer is not None and not hasattr(self.model, 'feature_names_in_')
+    
     def predict_batch(self, input_data):
         """Make predictions for batch of inputs"""
         if self.model is None:
@@ -0,0 +1,142 @@
+import pandas as pd
+import numpy as np
+import joblib
+
+class PreprocessingPipeline:
+    """Imputation, categorical encoding and scaling as one fitted, saved object
+
+    Fit on the training split only; every statistic it applies (fill values,
+    category vocabularies, centers and scales) comes from that split, and the
+    same object is saved and used by Predictor, so inference reproduces training
+    exactly. transform writes each input column once into a preallocated float64
+    matrix and scales it in place; no intermediate DataFrames are built.
+    
+    With ``scale_categoricals=False`` categorical columns keep their integer codes,
+    as models with native categorical support (HistGradientBoosting) require.
+    """
+    
+    def __init__(self, strategy='mean', scaler_type='standard', scale_categoricals=True):
+        if strategy not in ('mean', 'median', 'mode'):
+            raise ValueError(f"Unknown imputation strategy: {strategy}")
+        if scaler_type not in ('standard', 'minmax'):
+            raise ValueError(f"Unknown scaler type: {scaler_type}")
+        self.strategy = strategy
+        self.scaler_type = scaler_type
+        self.scale_categoricals = scale_categoricals
+        self.feature_columns = None
+        self.fill_values = {}
+        self.vocabularies = {}
+        self.center = None
+        self.scale = None
+    
+    def fit(self, X):
+        """Learn all preprocessing statistics from the training features"""
+        self.fit_transform(X)
+        return self
+    
+    def fit_transform(self, X):
+        """Fit on ``X`` and return it transformed"""
+        self.feature_columns = list(X.columns)
+        self.fill_values = {}
+        self.vocabularies = {}
+        
+        for column in self.feature_columns:
+            series = X[column]
+            if is_numeric_feature(series):
+                if self.strategy == 'mean':
+                    fill = series.mean()
+                elif self.strategy == 'median':
+                    fill = series.median()
+                else:
+                    fill = series.mode().iloc[0] if series.notna().any() else np.nan
+                # An all-missing column has no statistic; 0 keeps the matrix finite
+                self.fill_values[column] = 0.0 if pd.isna(fill) else float(fill)
+            else:
+                # Compared as strings and sorted, like LabelEncoder on astype(str)
+                counts = series.value_counts()
+                vocabulary = sorted(set(counts.index.astype(str)))
+                self.vocabularies[column] = vocabulary
+                # Missing values get the most frequent category
+                self.fill_values[column] = vocabulary.index(str(counts.index[0])) if len(counts) else 0
+        
+        matrix = self._impute_and_encode(X)
+        if self.scaler_type == 'standard':
+            self.center = matrix.mean(axis=0)
+            scale = matrix.std(axis=0)
+        else:
+            self.center = matrix.min(axis=0)
+            scale = matrix.max(axis=0) - self.center
+        # Constant columns are left unscaled, as sklearn's scalers do
+        scale[scale == 0] = 1.0
+        if not self.scale_categoricals:
+            categorical = [j for j, column in enumerate(self.feature_columns) if column in self.vocabularies]
+            self.center[categorical] = 0.0
+            scale[categorical] = 1.0
+        self.scale = scale
+        
+        matrix -= self.center
+        matrix /= self.scale
+        print(f"Preprocessing pipeline fitted on {matrix.shape[0]} rows, {matrix.shape[1]} features "
+              f"({len(self.vocabularies)} categorical, {self.strategy} imputation, {self.scaler_type} scaling"
+              f"{'' if self.scale_categoricals else ' of numeric columns'})")
+        return matrix
+    
+    def transform(self, X):
+        """Apply the fitted imputation, encoding and scaling; returns a float64 array"""
+        if self.feature_columns is None:
+            raise ValueError("Preprocessing pipeline is not fitted")
+        matrix = self._impute_and_encode(X)
+        matrix -= self.center
+        matrix /= self.scale
+        return matrix
+    
+    def categorical_mask(self, max_categories=None):
+        """Boolean mask of the categorical columns, for ``categorical_features``
+        
+        Columns with more than ``max_categories`` categories are left out (they stay
+        ordinal codes). Only valid when the codes are not scaled.
+        """
+        if self.scale_categoricals:
+            raise ValueError("Categorical codes are scaled; fit with scale_categoricals=False")
+        return np.array([column in self.vocabularies
+                         and (max_categories is None or len(self.vocabularies[column]) <= max_categories)
+                         for column in self.feature_columns])
+    
+    def _impute_and_encode(self, X):
+        missing = [column for column in self.feature_columns if column not in X.columns]
+        if missing:
+            raise ValueError(f"Missing input features: {missing}")
+        
+        # Column-major, so filling one feature writes contiguous memory
+        matrix = np.empty((len(X), len(self.feature_columns)), dtype=np.float64, order='F')
+        for j, column in enumerate(self.feature_columns):
+            series = X[column]
+            out = matrix[:, j]
+            if column in self.vocabularies:
+                # Each distinct value is looked up once, then gathered through a mapping array
+                codes, uniques = pd.factorize(series)
+                lookup = pd.Index(self.vocabularies[column]).get_indexer(pd.Index(uniques).astype(str))
+                # Unseen categories (-1 in lookup) and missing values (code -1) take the training mode
+                lookup = np.append(lookup, -1)
+                lookup[lookup == -1] = self.fill_values[column]
+                out[:] = lookup[codes]
+            else:
+                out[:] = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                np.putmask(out, np.isnan(out), self.fill_values[column])
+        return matrix
+    
+    def save(self, path='models/preprocessor.pkl'):
+        """Save the fitted pipeline as a single artifact"""
+        joblib.dump(self, path)
+        print(f"Preprocessing pipeline saved to {path}")
+    
+    @staticmethod
+    def load(path='models/preprocessor.pkl'):
+        """Load a pipeline saved with save()"""
+        pipeline = joblib.load(path)
+        print(f"Preprocessing pipeline loaded from {path}")
+        return pipeline
+
+
+def is_numeric_feature(series):
+    return pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
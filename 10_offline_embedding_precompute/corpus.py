@@ -0,0 +1,105 @@
+"""Readers that turn the project's corpora into ``(text, metadata)`` chunks.
+
+Supported inputs:
+  - PDFs (05-08): one section per page,
+  - plain text such as oracle_knowledge.txt (03): one section per blank-line paragraph,
+  - SQL such as all_sql_files_combined.sql or sql_files/*.sql (01): one section per
+    script, using the "Start of <file>" markers written by 01's combiner.
+Sections are packed into chunks of whole sentences (or lines for SQL), the same way
+the 05-07 bots chunk their PDFs.
+"""
+import glob
+import os
+import re
+
+CHUNK_WORDS = 100
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_PARAGRAPH_SPLIT = re.compile(r'\n\s*\n')
+_SQL_START_MARKER = re.compile(r'^-- #+ Start of (?P<name>.+?) #+--\s*$', re.MULTILINE)
+_SQL_END_MARKER = re.compile(r'^-- End of .+ --\s*$', re.MULTILINE)
+
+
+def pack(units, chunk_words=CHUNK_WORDS, joiner=" "):
+    """Greedily pack units (sentences, lines) into chunks of at most ``chunk_words`` words"""
+    chunks, current, current_words = [], [], 0
+    for unit in units:
+        words = len(unit.split())
+        if not words:
+            continue
+        if current and current_words + words > chunk_words:
+            chunks.append(joiner.join(current))
+            current, current_words = [], 0
+        current.append(unit.strip() if joiner == " " else unit.rstrip())
+        current_words += words
+    if current:
+        chunks.append(joiner.join(current))
+    return chunks
+
+
+def read_pdf(path):
+    from pypdf import PdfReader
+
+    for page_number, page in enumerate(PdfReader(path).pages):
+        yield {"page": page_number}, page.extract_text() or ""
+
+
+def read_text(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    for paragraph_number, paragraph in enumerate(_PARAGRAPH_SPLIT.split(text)):
+        if paragraph.strip():
+            yield {"paragraph": paragraph_number}, paragraph
+
+
+def read_sql(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    starts = list(_SQL_START_MARKER.finditer(text))
+    if not starts:
+        yield {"script": os.path.basename(path)}, text
+        return
+    for match, following in zip(starts, starts[1:] + [None]):
+        body = text[match.end():following.start() if following else len(text)]
+        yield {"script": match.group("name").strip()}, _SQL_END_MARKER.sub("", body)
+
+
+READERS = {".pdf": read_pdf, ".txt": read_text, ".sql": read_sql}
+
+
+def expand_inputs(inputs):
+    """Files, directories (searched recursively) and glob patterns -> supported files"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = glob.glob(os.path.join(item, "**", "*"), recursive=True)
+        else:
+            candidates = glob.glob(item) or [item]
+        files.extend(sorted(path for path in candidates
+                            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in READERS))
+    return list(dict.fromkeys(files))
+
+
+def common_root(files):
+    """Deepest directory containing every file, for naming sources relative to it"""
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+
+
+def iter_chunks(path, chunk_words=CHUNK_WORDS, root=None):
+    """Yield ``(text, metadata)`` for every chunk of one input file
+
+    ``source`` is the path relative to ``root`` (the file name when no root is
+    given), so same-named files in different directories stay distinct.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    source = os.path.relpath(os.path.abspath(path), root) if root else os.path.basename(path)
+    chunk_number = 0
+    for location, text in READERS[extension](path):
+        if extension == ".sql":
+            # SQL keeps its line structure; sentences mean nothing there
+            chunks = pack(text.splitlines(), chunk_words, joiner="\n")
+        else:
+            chunks = pack(_SENTENCE_SPLIT.split(" ".join(text.split())), chunk_words)
+        for chunk in chunks:
+            yield chunk, {"source": source, "chunk": chunk_number, **location}
+            chunk_number += 1
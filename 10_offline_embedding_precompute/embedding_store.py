@@ -0,0 +1,110 @@
+"""On-disk format and zero-copy loader for precomputed corpus embeddings.
+
+A store is a directory:
+    manifest.json          model, dimension, dtype, row counts, input fingerprints
+    vectors_00000.npy ...  row-major vector shards (plain .npy, memory-mappable)
+    metadata.sqlite        table ``chunks(row, source, location, text)``, row = global index,
+                           source = file path relative to the inputs' common directory
+
+Shards are opened with ``np.load(mmap_mode="r")``: nothing is copied into the process,
+and every worker that opens the same store shares the OS page cache.
+"""
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+METADATA_FILE = "metadata.sqlite"
+SHARD_PATTERN = "vectors_{:05d}.npy"
+
+
+def create_metadata_table(path):
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE chunks (row INTEGER PRIMARY KEY, source TEXT, location TEXT, text TEXT)")
+    return connection
+
+
+class EmbeddingStore:
+    """Read-only view of a precomputed store"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.shards = [np.load(os.path.join(path, shard["file"]), mmap_mode="r")
+                       for shard in self.manifest["shards"]]
+        # offsets[i] is the global row of shard i's first vector
+        self.offsets = np.cumsum([0] + [len(shard) for shard in self.shards])
+        self._connection = None
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    @property
+    def dimension(self):
+        return self.manifest["dimension"]
+
+    @property
+    def model_name(self):
+        return self.manifest["model"]
+
+    @property
+    def normalized(self):
+        return self.manifest["normalized"]
+
+    def _db(self):
+        # Opened lazily and read-only, so forked/spawned workers each get their own handle
+        if self._connection is None:
+            uri = f"file:{os.path.abspath(os.path.join(self.path, METADATA_FILE))}?mode=ro"
+            self._connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return self._connection
+
+    def vector(self, row):
+        shard = int(np.searchsorted(self.offsets, row, side="right")) - 1
+        return self.shards[shard][row - self.offsets[shard]]
+
+    def iter_shards(self):
+        """Yield ``(first_row, vectors)`` per shard; ``vectors`` is a read-only memmap"""
+        for offset, shard in zip(self.offsets, self.shards):
+            yield int(offset), shard
+
+    def metadata(self, rows):
+        """Return ``{"row", "source", "location", "text"}`` dicts in the order of ``rows``"""
+        rows = [int(row) for row in rows]
+        if not rows:
+            return []
+        placeholders = ",".join("?" * len(rows))
+        records = self._db().execute(
+            f"SELECT row, source, location, text FROM chunks WHERE row IN ({placeholders})", rows).fetchall()
+        by_row = {row: {"row": row, "source": source, "location": json.loads(location), "text": text}
+                  for row, source, location, text in records}
+        return [by_row[row] for row in rows if row in by_row]
+
+    def search(self, query_vector, k=5):
+        """Exact top-k by inner product (cosine for a normalized store), shard by shard"""
+        if k <= 0:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        if self.normalized:
+            norm = np.linalg.norm(query)
+            query = query / norm if norm > 0 else query
+        best_rows, best_scores = [], []
+        for offset, shard in self.iter_shards():
+            if not len(shard):
+                continue
+            scores = shard @ query.astype(shard.dtype, copy=False)
+            top = min(k, len(scores))
+            candidates = np.argpartition(-scores, top - 1)[:top]
+            best_rows.extend(offset + candidates)
+            best_scores.extend(scores[candidates].astype(np.float32))
+        order = np.argsort(best_scores)[::-1][:k]
+        return [(int(best_rows[i]), float(best_scores[i])) for i in order]
+
+    def load_model(self):
+        """The query encoder matching the stored vectors (queries still need embedding)"""
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(self.model_name)
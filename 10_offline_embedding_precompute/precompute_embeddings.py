@@ -0,0 +1,201 @@
+"""Embed a corpus once, offline, into a sharded memory-mappable store.
+
+Examples (from the repository root):
+    python 10_offline_embedding_precompute/precompute_embeddings.py \\
+        08_wit_fstspi_fr_mul_pdf/*.pdf --output embeddings/pdfs_mpnet \\
+        --model sentence-transformers/all-mpnet-base-v2
+    python 10_offline_embedding_precompute/precompute_embeddings.py \\
+        03_scraping_the_data_from_dif_web/oracle_knowledge.txt \\
+        01_fetching_the_sql_files_from_oracle/sql_files --output embeddings/oracle_minilm
+
+Chunks are embedded in large batches by a pool of worker processes (each loads the
+model once and gets an equal share of the CPU threads) and written in order into
+``.npy`` shards. See embedding_store.py for the format and the loader.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from corpus import CHUNK_WORDS, common_root, expand_inputs, iter_chunks
+from embedding_store import MANIFEST_FILE, METADATA_FILE, SHARD_PATTERN, create_metadata_table
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+BATCH_SIZE = 256
+SHARD_ROWS = 100_000
+WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+
+# Set in each worker process by _init_worker
+_model = None
+
+
+def _init_worker(model_name, threads):
+    global _model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Workers split the cores instead of each starting one thread per core
+    torch.set_num_threads(threads)
+    _model = SentenceTransformer(model_name, device="cpu")
+
+
+def _embed_batch(texts, normalize, dtype):
+    vectors = _model.encode(texts, batch_size=len(texts), normalize_embeddings=normalize,
+                            convert_to_numpy=True, show_progress_bar=False)
+    return vectors.astype(dtype, copy=False)
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ShardWriter:
+    """Writes vectors in arrival order into fixed-size ``.npy`` shards"""
+
+    def __init__(self, directory, shard_rows, dtype):
+        self.directory = directory
+        self.shard_rows = shard_rows
+        self.dtype = dtype
+        self.shards = []
+        self.current = None
+        self.filled = 0
+
+    def _open_shard(self, rows, dimension):
+        file_name = SHARD_PATTERN.format(len(self.shards))
+        self.current = np.lib.format.open_memmap(
+            os.path.join(self.directory, file_name), mode="w+", dtype=self.dtype, shape=(rows, dimension))
+        self.shards.append({"file": file_name, "rows": rows})
+        self.filled = 0
+
+    def write(self, vectors, remaining_rows):
+        """``remaining_rows`` counts every row not yet written, including ``vectors``"""
+        while len(vectors):
+            if self.current is None or self.filled == len(self.current):
+                self.close()
+                self._open_shard(min(self.shard_rows, remaining_rows), vectors.shape[1])
+            take = min(len(vectors), len(self.current) - self.filled)
+            self.current[self.filled:self.filled + take] = vectors[:take]
+            self.filled += take
+            remaining_rows -= take
+            vectors = vectors[take:]
+
+    def close(self):
+        if self.current is not None:
+            self.current.flush()
+            self.current = None
+
+
+def fingerprint(path):
+    stat = os.stat(path)
+    return {"path": path, "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def precompute(inputs, output, model_name=DEFAULT_MODEL, workers=WORKERS, batch_size=BATCH_SIZE,
+               shard_rows=SHARD_ROWS, chunk_words=CHUNK_WORDS, normalize=True, dtype="float32"):
+    files = expand_inputs(inputs)
+    if not files:
+        raise SystemExit("No supported input files (.pdf, .txt, .sql) found")
+
+    start = time.perf_counter()
+    texts, records = [], []
+    root = common_root(files)
+    for path in files:
+        for text, metadata in iter_chunks(path, chunk_words, root):
+            source = metadata.pop("source")
+            records.append((len(texts), source, json.dumps(metadata)))
+            texts.append(text)
+    chunk_seconds = time.perf_counter() - start
+    print(f"{len(files)} files -> {len(texts)} chunks in {chunk_seconds:.1f}s")
+    if not texts:
+        raise SystemExit("The inputs produced no text to embed")
+
+    # An earlier run stopped mid-swap: put its previous store back first
+    previous = f"{output.rstrip(os.sep)}.old"
+    if not os.path.exists(output) and os.path.exists(os.path.join(previous, MANIFEST_FILE)):
+        os.replace(previous, output)
+
+    # Build next to the target and swap in at the end, so readers never see a partial store
+    staging = f"{output.rstrip(os.sep)}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    connection = create_metadata_table(os.path.join(staging, METADATA_FILE))
+    with connection:
+        connection.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)",
+                               [(row, source, location, text) for (row, source, location), text
+                                in zip(records, texts)])
+    connection.close()
+
+    writer = ShardWriter(staging, shard_rows, dtype)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    start = time.perf_counter()
+    written = 0
+    # spawn: torch does not survive fork safely once its thread pool exists
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(model_name, threads)) as pool:
+        batches = list(_batches(texts, batch_size))
+        # map() yields in submission order, so rows stay aligned with the metadata table
+        for vectors in pool.map(_embed_batch, batches, [normalize] * len(batches), [dtype] * len(batches)):
+            writer.write(vectors, len(texts) - written)
+            written += len(vectors)
+            print(f"\rEmbedded {written}/{len(texts)} chunks", end="", flush=True)
+    writer.close()
+    embed_seconds = time.perf_counter() - start
+    print(f"\nEmbedded in {embed_seconds:.1f}s ({len(texts) / embed_seconds:.1f} chunks/sec, {workers} workers)")
+
+    manifest = {
+        "model": model_name,
+        "dimension": int(np.load(os.path.join(staging, writer.shards[0]["file"]), mmap_mode="r").shape[1]),
+        "dtype": dtype,
+        "normalized": normalize,
+        "rows": len(texts),
+        "chunk_words": chunk_words,
+        "shards": writer.shards,
+        "inputs": [fingerprint(path) for path in files],
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "embed_seconds": round(embed_seconds, 2),
+        "chunks_per_sec": round(len(texts) / embed_seconds, 1),
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Move the old store aside rather than deleting it first: the only moment with
+    # no store at ``output`` is between two renames, and a crash there leaves the
+    # old one in ``previous`` (restored on the next run)
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(os.path.join(output, MANIFEST_FILE)):
+        os.replace(output, previous)
+    os.replace(staging, output)
+    shutil.rmtree(previous, ignore_errors=True)
+    print(f"Wrote {output}: {len(writer.shards)} shard(s), {manifest['dimension']}-dim {dtype}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("inputs", nargs="+", help="files, directories or glob patterns (.pdf, .txt, .sql)")
+    parser.add_argument("--output", required=True, help="store directory to (re)create")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS)
+    parser.add_argument("--chunk-words", type=int, default=CHUNK_WORDS)
+    parser.add_argument("--dtype", choices=("float32", "float16"), default="float32")
+    parser.add_argument("--no-normalize", action="store_true", help="keep raw (unnormalized) vectors")
+    args = parser.parse_args()
+
+    if os.path.exists(args.output) and not os.path.exists(os.path.join(args.output, MANIFEST_FILE)):
+        parser.error(f"{args.output} exists and is not an embedding store; refusing to overwrite it")
+    precompute(args.inputs, args.output, model_name=args.model, workers=args.workers,
+               batch_size=args.batch_size, shard_rows=args.shard_rows, chunk_words=args.chunk_words,
+               normalize=not args.no_normalize, dtype=args.dtype)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Offline re-creations of the chatbot retrieval pipelines, for the benchmark harness.
+
+The 05-07 apps build their index at import time and talk to live servers, so their
+chunking and search logic is reproduced here with identical parameters (LLM call
+excluded). 08 is assembled from its own modules, so changes there are benchmarked
+as-is. Every pipeline exposes:
+
+    build(pdf_files) -> {step: seconds}
+    retrieve(question, k) -> ([chunk texts, best first], {stage: seconds})
+"""
+import asyncio
+import os
+import re
+import sys
+import time
+import uuid
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_08_DIR = os.path.join(REPO_DIR, "08_wit_fstspi_fr_mul_pdf")
+MINILM_MODEL = "all-MiniLM-L6-v2"
+
+
+class Timer:
+    """Accumulates ``{stage: seconds}`` for one build or one query"""
+
+    def __init__(self):
+        self.timings = {}
+
+    def stage(self, name):
+        return _Stage(self.timings, name)
+
+
+class _Stage:
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings[self.name] = self.timings.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+def split_sentences_into_chunks(text, chunk_size=100):
+    """Sentence-packing chunker shared by 05 and 06/07 (chunks of up to ~100 words)"""
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    chunks, current = [], ""
+    for sentence in sentences:
+        if len((current + sentence).split()) <= chunk_size:
+            current += " " + sentence
+        else:
+            chunks.append(current.strip())
+            current = sentence
+    if current:
+        chunks.append(current.strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+class FaissPipeline:
+    """05: whole-PDF text, sentence chunks, MiniLM embeddings, exact L2 FAISS index"""
+
+    name = "05_faiss"
+
+    def __init__(self):
+        self.chunks = []
+        self.model = None
+        self.index = None
+
+    def build(self, pdf_files):
+        import faiss
+        from PyPDF2 import PdfReader
+        from sentence_transformers import SentenceTransformer
+
+        timer = Timer()
+        with timer.stage("load_model"):
+            self.model = SentenceTransformer(MINILM_MODEL)
+        with timer.stage("extract_and_chunk"):
+            for pdf_file in pdf_files:
+                text = "".join(page.extract_text() or "" for page in PdfReader(pdf_file).pages)
+                self.chunks.extend(split_sentences_into_chunks(text))
+        with timer.stage("embed_corpus"):
+            embeddings = self.model.encode(self.chunks)
+        with timer.stage("index"):
+            self.index = faiss.IndexFlatL2(embeddings.shape[1])
+            self.index.add(embeddings)
+        return timer.timings
+
+    def retrieve(self, question, k):
+        timer = Timer()
+        with timer.stage("embed_query"):
+            query_embedding = self.model.encode([question])
+        with timer.stage("vector_search"):
+            _, indices = self.index.search(query_embedding, k)
+        return [self.chunks[i] for i in indices[0] if i >= 0], timer.timings
+
+
+class QdrantPipeline:
+    """06/07: per-page sentence chunks, MiniLM embeddings, cosine search in Qdrant (in-memory)"""
+
+    name = "06_07_qdrant"
+    collection_name = "pdf_chunks"
+
+    def __init__(self):
+        self.model = None
+        self.client = None
+
+    def build(self, pdf_files):
+        from PyPDF2 import PdfReader
+        from qdrant_client import QdrantClient
+        from qdrant_client.models import Distance, PointStruct, VectorParams
+        from sentence_transformers import SentenceTransformer
+
+        timer = Timer()
+        with timer.stage("load_model"):
+            self.model = SentenceTransformer(MINILM_MODEL)
+        documents = []
+        with timer.stage("extract_and_chunk"):
+            for pdf_file in pdf_files:
+                for page_no, page in enumerate(PdfReader(pdf_file).pages, start=1):
+                    for chunk in split_sentences_into_chunks(page.extract_text() or ""):
+                        documents.append({"text": chunk, "page": page_no})
+        with timer.stage("embed_corpus"):
+            embeddings = self.model.encode([doc["text"] for doc in documents])
+        with timer.stage("index"):
+            self.client = QdrantClient(":memory:")
+            self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config=VectorParams(size=embeddings.shape[1], distance=Distance.COSINE),
+            )
+            self.client.upsert(collection_name=self.collection_name, points=[
+                PointStruct(id=str(uuid.uuid4()), vector=embedding.tolist(), payload=doc)
+                for doc, embedding in zip(documents, embeddings)
+            ])
+        return timer.timings
+
+    def retrieve(self, question, k):
+        timer = Timer()
+        with timer.stage("embed_query"):
+            query_vector = self.model.encode(question).tolist()
+        with timer.stage("vector_search"):
+            points = self.client.query_points(
+                collection_name=self.collection_name, query=query_vector, limit=k).points
+        return [point.payload["text"] for point in points], timer.timings
+
+
+class HybridPipeline:
+    """08: cleaned 500-char chunks, mpnet + BM25 fused by RRF, cross-encoder rerank, dedup.
+
+    Runs ``hybrid_retrieval.retrieve``, as ``app.retrieve_documents`` does, on a sync
+    in-memory Qdrant client.
+    """
+
+    name = "08_hybrid"
+    collection_name = "pdf_chunks"
+
+    def __init__(self):
+        if APP_08_DIR not in sys.path:
+            sys.path.insert(0, APP_08_DIR)
+        self.embeddings = None
+        self.reranker = None
+        self.client = None
+        self.keyword_index = None
+        self.doc_store = None
+        self.embedding_cache = None
+
+    def build(self, pdf_files):
+        from qdrant_client import QdrantClient
+        from qdrant_client.http import models
+
+        from bm25_index import BM25Index
+        from document_store import DocumentStore
+        from embedding_cache import EmbeddingCache
+        from ingestion import iter_chunk_batches, load_and_clean_pdf, make_splitter, upsert_batch
+        from startup import ensure_nltk_data, load_embeddings, load_reranker
+
+        timer = Timer()
+        with timer.stage("load_model"):
+            ensure_nltk_data()
+            self.embeddings = load_embeddings()
+            self.reranker = load_reranker()
+        self.client = QdrantClient(":memory:")
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE),
+        )
+        self.keyword_index = BM25Index()
+        self.doc_store = DocumentStore()
+        self.embedding_cache = EmbeddingCache(self.client, self.collection_name)
+
+        splitter = make_splitter()
+        for pdf_file in pdf_files:
+            with timer.stage("extract_and_chunk"):
+                _, pages = load_and_clean_pdf(pdf_file)
+                batches = list(iter_chunk_batches(pdf_file, pages, splitter, batch_size=64))
+            for ids, texts, metadatas in batches:
+                with timer.stage("embed_corpus"):
+                    vectors = self.embeddings.embed_documents(texts)
+                with timer.stage("index"):
+                    upsert_batch(self.client, self.collection_name, ids, texts, metadatas, vectors)
+                    self.doc_store.add(ids, texts, metadatas)
+                    self.keyword_index.add_documents(ids, texts)
+        return timer.timings
+
+    def retrieve(self, question, k):
+        import hybrid_retrieval
+
+        timings = {}
+        result = asyncio.run(hybrid_retrieval.retrieve(
+            question,
+            semantic_search=self._semantic_search,
+            keyword_search=self._keyword_search,
+            rerank=self._rerank,
+            chunk_vectors=self._chunk_vectors,
+            timings=timings,
+        ))
+        return [doc.page_content for doc, _ in result["unique_docs"][:k]], timings
+
+    # Sync counterparts of the app's search callables; they run inline on the event loop
+    async def _semantic_search(self, queries, timings, k):
+        from qdrant_client.http import models
+
+        import metrics
+
+        with metrics.stage("embed", timings):
+            query_vectors = self.embeddings.embed_documents(queries)
+        with metrics.stage("vector_search", timings):
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[models.QueryRequest(query=vector, limit=k, with_payload=True)
+                          for vector in query_vectors],
+            )
+        return [response.points for response in responses]
+
+    async def _keyword_search(self, question, timings, k):
+        import metrics
+
+        with metrics.stage("keyword_search", timings):
+            return [(self.doc_store.get_by_id(chunk_id), score)
+                    for chunk_id, score in self.keyword_index.search(question, k=k)]
+
+    async def _rerank(self, question, candidates, top_k):
+        return self.reranker.rerank(question, candidates, top_k=top_k)
+
+    async def _chunk_vectors(self, chunk_ids):
+        return self.embedding_cache.get_many(chunk_ids)
+
+
+class StubLLM:
+    """Stands in for Ollama: builds the same kind of prompt and echoes the top chunk"""
+
+    def generate(self, question, contexts):
+        prompt = (
+            "Answer the question using ONLY the context.\n"
+            f"Context:\n{' '.join(contexts)}\n\nQuestion: {question}\nAnswer:"
+        )
+        return contexts[0][:200] if contexts else "Data not found in PDF.", len(prompt)
+
+
+PIPELINES = {pipeline.name: pipeline for pipeline in (FaissPipeline, QdrantPipeline, HybridPipeline)}
+
+
+def normalize_for_match(text):
+    """Lowercase and drop punctuation so evidence matches regardless of PDF cleaning"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def first_relevant_rank(chunks, evidence):
+    """1-based rank of the first chunk containing any evidence phrase, or None"""
+    phrases = [normalize_for_match(phrase) for phrase in evidence]
+    for rank, chunk in enumerate(chunks, start=1):
+        normalized = normalize_for_match(chunk)
+        if any(phrase in normalized for phrase in phrases):
+            return rank
+    return None
+
+
+def percentiles(seconds):
+    values = np.asarray(seconds, dtype=float) * 1000
+    return {"p50_ms": round(float(np.percentile(values, 50)), 3),
+            "p95_ms": round(float(np.percentile(values, 95)), 3),
+            "mean_ms": round(float(values.mean()), 3)}
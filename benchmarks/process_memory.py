@@ -0,0 +1,21 @@
+"""Peak memory of the current process, for the benchmark reports."""
+import sys
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MiB (None where it cannot be read)"""
+    # Linux: VmHWM restarts at exec, unlike ru_maxrss, which a spawned child inherits
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB on Linux
+    return round(peak / 2**20 if sys.platform == "darwin" else peak / 1024, 1)
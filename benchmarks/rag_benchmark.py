@@ -0,0 +1,188 @@
+"""End-to-end retrieval benchmark and regression check for the PDF chatbots.
+
+Runs the 05 (FAISS), 06/07 (Qdrant) and 08 (hybrid) retrieval pipelines offline over
+the bundled PDFs (in-memory indexes, a stub in place of Ollama) and scores them on
+the labelled questions in questions.json. A chunk is relevant when it contains one of
+the question's evidence phrases (compared without case or punctuation).
+
+Run from the repository root (same packages as the apps, no servers needed):
+    python benchmarks/rag_benchmark.py
+    python benchmarks/rag_benchmark.py --pipeline 08_hybrid --repeat 5
+    python benchmarks/rag_benchmark.py --baseline benchmarks/results/rag_<earlier>.json
+
+Each pipeline runs in its own spawned process, so peak RSS is measured per pipeline.
+Results go to benchmarks/results/ as JSON; with --baseline the run exits with status 1
+if recall/MRR dropped or p50 latency grew beyond the allowed margins.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from pipelines import APP_08_DIR, PIPELINES, REPO_DIR, StubLLM, Timer, first_relevant_rank, percentiles
+from process_memory import peak_rss_mb
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+QUESTIONS_PATH = os.path.join(BENCHMARK_DIR, "questions.json")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+
+def run_pipeline(name, pdf_files, questions, k_values, repeat):
+    """Build one pipeline, answer every question ``repeat`` times and return its report"""
+    pipeline = PIPELINES[name]()
+    build_timings = pipeline.build(pdf_files)
+    max_k = max(k_values)
+    llm = StubLLM()
+
+    # First query initializes lazy kernels/threads; keep it out of the latency numbers
+    pipeline.retrieve(questions[0]["question"], max_k)
+
+    latencies, ranks = [], []
+    stage_samples = defaultdict(list)
+    start = time.perf_counter()
+    for iteration in range(repeat):
+        for item in questions:
+            query_start = time.perf_counter()
+            chunks, timings = pipeline.retrieve(item["question"], max_k)
+            timer = Timer()
+            with timer.stage("generate"):
+                llm.generate(item["question"], chunks)
+            latencies.append(time.perf_counter() - query_start)
+            for stage_name, seconds in {**timings, **timer.timings}.items():
+                stage_samples[stage_name].append(seconds)
+            if iteration == 0:
+                ranks.append(first_relevant_rank(chunks, item["evidence"]))
+    wall = time.perf_counter() - start
+
+    quality = {f"recall@{k}": round(sum(1 for rank in ranks if rank and rank <= k) / len(ranks), 4)
+               for k in k_values}
+    quality["mrr"] = round(sum(1.0 / rank for rank in ranks if rank) / len(ranks), 4)
+    return {
+        "quality": quality,
+        "latency": percentiles(latencies),
+        "stages": {stage_name: percentiles(samples) for stage_name, samples in stage_samples.items()},
+        "qps": round(len(latencies) / wall, 2),
+        # This process's own peak: ru_maxrss would carry over the parent's from before the spawn
+        "peak_rss_mb": peak_rss_mb(),
+        "build_seconds": {step: round(seconds, 3) for step, seconds in build_timings.items()},
+        "missed_questions": [item["question"] for item, rank in zip(questions, ranks) if rank is None],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_quality_drop, max_latency_increase):
+    """Print changes against a baseline run; return the list of regressions"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or "quality" not in result or "quality" not in previous:
+            continue
+        for metric, value in result["quality"].items():
+            before = previous["quality"].get(metric)
+            if before is None:
+                continue
+            print(f"  {name:14s} {metric:10s} {before:8.3f} -> {value:8.3f}")
+            if before - value > max_quality_drop:
+                regressions.append(f"{name} {metric} dropped from {before} to {value}")
+        before, after = previous["latency"]["p50_ms"], result["latency"]["p50_ms"]
+        print(f"  {name:14s} {'p50 ms':10s} {before:8.1f} -> {after:8.1f}")
+        if before and (after - before) / before > max_latency_increase:
+            regressions.append(f"{name} p50 latency grew from {before}ms to {after}ms")
+    return regressions
+
+
+def print_summary(results, k_values):
+    header = f"{'pipeline':14s}" + "".join(f"{f'R@{k}':>8s}" for k in k_values)
+    print(header + f"{'MRR':>8s}{'p50 ms':>10s}{'p95 ms':>10s}{'QPS':>8s}{'peak MB':>9s}")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:14s}  failed: {result['error']}")
+            continue
+        quality = result["quality"]
+        print(f"{name:14s}" + "".join(f"{quality[f'recall@{k}']:8.3f}" for k in k_values)
+              + f"{quality['mrr']:8.3f}{result['latency']['p50_ms']:10.1f}{result['latency']['p95_ms']:10.1f}"
+              + f"{result['qps']:8.2f}" + (f"{result['peak_rss_mb']:9.1f}" if result["peak_rss_mb"] else f"{'-':>9s}"))
+        slowest = sorted(result["stages"].items(), key=lambda item: item[1]["p50_ms"], reverse=True)
+        print(" " * 14 + "  stages p50: " + ", ".join(
+            f"{stage_name} {stats['p50_ms']:.1f}ms" for stage_name, stats in slowest))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pipeline", action="append", choices=sorted(PIPELINES),
+                        help="pipeline to run (repeatable); default: all")
+    parser.add_argument("--pdf", action="append", help="PDF to index (repeatable); default: the 08 PDFs")
+    parser.add_argument("--questions", default=QUESTIONS_PATH)
+    parser.add_argument("--k", default="1,3,5", help="comma-separated cutoffs for recall@k")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the question set for timing")
+    parser.add_argument("--output", help="result file; default: benchmarks/results/rag_<timestamp>.json")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--max-quality-drop", type=float, default=0.0,
+                        help="allowed absolute drop in recall@k/MRR before failing")
+    parser.add_argument("--max-latency-increase", type=float, default=0.25,
+                        help="allowed relative p50 latency increase before failing")
+    args = parser.parse_args()
+
+    names = args.pipeline or list(PIPELINES)
+    pdf_files = sorted(args.pdf or glob.glob(os.path.join(APP_08_DIR, "*.pdf")))
+    k_values = sorted(int(k) for k in args.k.split(","))
+    with open(args.questions, encoding="utf-8") as f:
+        questions = json.load(f)
+
+    results = {}
+    for name in names:
+        print(f"Running {name} on {len(pdf_files)} PDFs, {len(questions)} questions x {args.repeat}...")
+        # A fresh process per pipeline: isolated peak memory, no shared model caches
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            try:
+                results[name] = pool.submit(run_pipeline, name, pdf_files, questions,
+                                            k_values, args.repeat).result()
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "pdf_files": [os.path.basename(pdf_file) for pdf_file in pdf_files],
+        "questions": len(questions),
+        "k": k_values,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"rag_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print()
+    print_summary(results, k_values)
+    print(f"\nSaved {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} ({baseline.get('git_commit')}):")
+        regressions = compare(results, baseline, args.max_quality_drop, args.max_latency_increase)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()